@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""Stand-in for the claude CLI: answers dimension prompts after a configurable delay
+
+FAKE_CLAUDE_STARTUP_MS    CLI startup time, spent before the prompt is read (default: 0)
+FAKE_CLAUDE_LATENCY_MS    base latency per invocation (default: 500)
+FAKE_CLAUDE_PER_IMAGE_MS  extra latency per image in a batch prompt (default: 200)
+FAKE_CLAUDE_ERROR_RATE    fraction of invocations answering with prose instead of JSON
+"""
+
+import json
+import os
+import random
+import re
+import stat
+import sys
+import time
+from pathlib import Path
+
+ANSWER = {
+    "width_cm": 55, "height_cm": 82, "floor_to_chair_height_cm": 46, "depth_cm": 58,
+    "weight_kg": 6.5, "box_width_cm": 56, "box_height_cm": 60, "box_depth_cm": 110, "qty_per_box": 2
+}
+
+
+def install(directory: Path) -> Path:
+    """Write an executable named claude into directory; put directory first on PATH to use it."""
+    directory.mkdir(parents=True, exist_ok=True)
+    wrapper = directory / "claude"
+    wrapper.write_text(f'#!/bin/sh\nexec "{sys.executable}" "{Path(__file__).resolve()}" "$@"\n')
+    wrapper.chmod(wrapper.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return wrapper
+
+
+def main():
+    time.sleep(float(os.environ.get('FAKE_CLAUDE_STARTUP_MS', 0)) / 1000)
+    # `claude -p` without a prompt argument reads the prompt from stdin
+    if len(sys.argv) > 1 and sys.argv[-1] != '-p':
+        prompt = sys.argv[-1]
+    else:
+        prompt = sys.stdin.read()
+    batch_paths = re.findall(r'^- (.+)$', prompt, re.MULTILINE)
+
+    latency = float(os.environ.get('FAKE_CLAUDE_LATENCY_MS', 500))
+    per_image = float(os.environ.get('FAKE_CLAUDE_PER_IMAGE_MS', 200))
+    time.sleep((latency + per_image * max(1, len(batch_paths))) / 1000)
+
+    if random.random() < float(os.environ.get('FAKE_CLAUDE_ERROR_RATE', 0)):
+        print("I could not read the dimensions in this image.")
+        return
+
+    if batch_paths:
+        print(json.dumps([dict(ANSWER, image_path=path.strip()) for path in batch_paths]))
+    else:
+        print(json.dumps(ANSWER))
+
+
+if __name__ == '__main__':
+    main()
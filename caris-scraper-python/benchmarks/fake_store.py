@@ -0,0 +1,224 @@
+"""Local stand-in for the Caris OpenCart storefront: product pages, category pages and images"""
+
+import random
+import re
+import struct
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+CATEGORY_PAGE_SIZE = 20
+
+# Recorded pages point at the real storefront; rewritten to the local server on load
+CARIS_HOST_PATTERN = re.compile(r'https?://(?:www\.)?caris\.com\.tr')
+
+PRODUCT_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<title>{name}</title>
+<link rel="stylesheet" href="/catalog/view/theme/caris/stylesheet.css">
+<script src="/catalog/view/javascript/common.js"></script>
+</head>
+<body>
+<div id="product-product" class="container">
+  <h1>{name}</h1>
+  <div class="thumbnails">
+    {gallery}
+  </div>
+  <div class="olcu"><img class="olcthumb" src="/image/catalog/olculer/{product_id}-olcu.png" alt="Dimensions"></div>
+</div>
+</body>
+</html>
+"""
+
+GALLERY_IMAGE = '<a href="/image/cache/catalog/uruns/{product_id}-{index}-1000x1000.jpg"><img src="/image/cache/catalog/uruns/{product_id}-{index}-550x550.jpg"></a>'
+
+CATEGORY_TEMPLATE = """<!DOCTYPE html>
+<html>
+<body>
+<h1 class="title page-title">{name}</h1>
+<div class="row">
+{products}
+</div>
+<div class="row">
+  <div class="col-sm-6 text-left"><ul class="pagination">{pagination}</ul></div>
+  <div class="col-sm-6 text-right">{showing}</div>
+</div>
+{empty}
+</body>
+</html>
+"""
+
+PAGINATION_LINK = '<li><a href="/index.php?route=product/category&amp;path={path}&amp;limit={limit}&amp;page={page}">{label}</a></li>'
+CATEGORY_PRODUCT = '<div class="product-layout"><a href="/index.php?route=product/product&amp;path={path}&amp;product_id={product_id}">Product {product_id}</a></div>'
+
+
+def noise_png(width: int, height: int, seed: int) -> bytes:
+    """Incompressible RGB PNG, so transfer sizes resemble real photos."""
+    rng = random.Random(seed)
+    rows = b''.join(b'\x00' + rng.randbytes(width * 3) for _ in range(height))
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+    header = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    return b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', header) + chunk(b'IDAT', zlib.compress(rows, 1)) + chunk(b'IEND', b'')
+
+
+@dataclass
+class StoreOptions:
+    products: int = 100
+    categories: int = 3
+    gallery_size: int = 4
+    image_size: int = 200
+    latency_ms: float = 50
+    jitter_ms: float = 25
+    error_rate: float = 0.0
+    seed: int = 1
+
+
+class FakeStore:
+    """Threaded HTTP server with per-request latency and injected 429/503 responses."""
+
+    def __init__(self, options: StoreOptions, port: int = 0):
+        self.options = options
+        self.recorded = self._load_recorded()
+        self.image = noise_png(options.image_size, options.image_size, options.seed)
+        self.requests = 0
+        self.errors_injected = 0
+        self._rng = random.Random(options.seed)
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), self._handler())
+        self.server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    @property
+    def product_url(self) -> str:
+        return self.url + "/index.php?route=product/product&path=38&product_id="
+
+    def product_ids(self) -> List[str]:
+        return [str(product_id) for product_id in range(1, self.options.products + 1)]
+
+    def start(self) -> 'FakeStore':
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _load_recorded(self) -> List[str]:
+        pages_dir = FIXTURES_DIR / "pages"
+        if not pages_dir.exists():
+            return []
+        return [path.read_text(encoding='utf-8') for path in sorted(pages_dir.glob('*.html'))]
+
+    def _delay_and_maybe_fail(self) -> Optional[int]:
+        with self._lock:
+            self.requests += 1
+            delay = max(0.0, self.options.latency_ms + self._rng.uniform(-1, 1) * self.options.jitter_ms)
+            fail = self._rng.random() < self.options.error_rate
+            status = self._rng.choice([429, 503]) if fail else None
+            if fail:
+                self.errors_injected += 1
+        time.sleep(delay / 1000)
+        return status
+
+    def product_page(self, product_id: str) -> str:
+        if self.recorded:
+            # Recorded pages are served round-robin with the local host swapped in
+            page = self.recorded[int(product_id) % len(self.recorded)]
+            return CARIS_HOST_PATTERN.sub(self.url, page)
+
+        gallery = "\n    ".join(
+            GALLERY_IMAGE.format(product_id=product_id, index=index)
+            for index in range(1, self.options.gallery_size + 1)
+        )
+        return PRODUCT_TEMPLATE.format(name=f"Benchmark Chair {product_id}", gallery=gallery, product_id=product_id)
+
+    def category_page(self, path: str, page: int, limit: int = CATEGORY_PAGE_SIZE) -> str:
+        category = int(path) if path.isdigit() else 0
+        ids = [
+            product_id for product_id in range(1, self.options.products + 1)
+            if product_id % max(1, self.options.categories) == category % max(1, self.options.categories)
+        ]
+        page_ids = ids[(page - 1) * limit:page * limit]
+        products = "\n".join(CATEGORY_PRODUCT.format(path=path, product_id=product_id) for product_id in page_ids)
+        page_count = max(1, -(-len(ids) // limit))
+        pagination = ''.join(
+            PAGINATION_LINK.format(path=path, limit=limit, page=number, label=number)
+            for number in range(1, page_count + 1) if number != page
+        )
+        showing = ''
+        if page_ids:
+            first = (page - 1) * limit + 1
+            showing = f"Showing {first} to {first + len(page_ids) - 1} of {len(ids)} ({page_count} Pages)"
+        # OpenCart shows the mini-cart text on pages past the end of a category
+        empty = '' if page_ids else '<p>Your shopping cart is empty!</p>'
+        return CATEGORY_TEMPLATE.format(
+            name=f"Category {path}", products=products, pagination=pagination, showing=showing, empty=empty
+        )
+
+    def _handler(self):
+        store = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                status = store._delay_and_maybe_fail()
+                if status:
+                    self._send(status, b'', 'text/plain', {'Retry-After': '1'})
+                    return
+
+                parsed = urlparse(self.path)
+                query = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+                route = query.get('route', '')
+
+                if route == 'product/product' and query.get('product_id', '').isdigit():
+                    self._send(200, store.product_page(query['product_id']).encode(), 'text/html; charset=utf-8')
+                elif route == 'product/category':
+                    page = int(query.get('page', '1') or 1)
+                    limit = int(query.get('limit', CATEGORY_PAGE_SIZE) or CATEGORY_PAGE_SIZE)
+                    html = store.category_page(query.get('path', '0'), page, limit)
+                    self._send(200, html.encode(), 'text/html; charset=utf-8')
+                elif parsed.path.startswith('/image/'):
+                    content_type = 'image/png' if parsed.path.endswith('.png') else 'image/jpeg'
+                    self._send(200, store.image, content_type)
+                elif parsed.path.endswith('.css'):
+                    self._send(200, b'body { margin: 0; }', 'text/css')
+                elif parsed.path.endswith('.js'):
+                    self._send(200, b'window.loaded = true;', 'application/javascript')
+                else:
+                    self._send(404, b'', 'text/plain')
+
+            def _send(self, status: int, body: bytes, content_type: str, headers: Optional[Dict[str, str]] = None):
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
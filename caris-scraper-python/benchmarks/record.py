@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""Save live product pages as fixtures for the fake storefront"""
+
+import argparse
+import sys
+import requests
+from benchmarks.fake_store import FIXTURES_DIR
+from src.http_extractor import USER_AGENT
+from src.types import ScraperConfig
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Record Caris product pages for offline benchmarks')
+    parser.add_argument('product_ids', nargs='+', help='Product IDs to record')
+    args = parser.parse_args()
+
+    pages_dir = FIXTURES_DIR / "pages"
+    pages_dir.mkdir(parents=True, exist_ok=True)
+    session = requests.Session()
+    session.headers.update({'User-Agent': USER_AGENT, 'Accept-Language': 'en-US,en;q=0.9'})
+
+    for product_id in args.product_ids:
+        response = session.get(ScraperConfig.base_url + product_id, timeout=30)
+        response.raise_for_status()
+        path = pages_dir / f"{product_id}.html"
+        path.write_text(response.text, encoding='utf-8')
+        print(f"Recorded {product_id} -> {path}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""Offline throughput benchmark against a local fake storefront and a fake claude CLI"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from benchmarks import fake_claude
+from benchmarks.fake_store import FakeStore, StoreOptions
+from src.tracing import percentile
+
+ROOT = Path(__file__).parent.parent
+
+TARGETS = ['scraper', 'ai', 'parallel']
+
+
+def run_case_in_process(case: dict):
+    """Run one target in this process; called in a fresh interpreter per case so RSS is isolated."""
+    from src.output import product_to_dict
+    from src.scraper import CarisScraper
+    from src.scraper_with_ai import CarisScraperWithAI
+    from src.tracing import Tracer
+    from src.types import ProductInput, ScraperConfig
+
+    config = ScraperConfig(
+        base_url=case['base_url'],
+        storage_dir=case['storage_dir'],
+        workers=case['workers'],
+        engine=case['engine'],
+        rate_limit_per_host=case['rate_limit'],
+        rate_burst=max(10, int(case['rate_limit'])),
+        dimension_cache=False
+    )
+    tracer = Tracer()
+    inputs = [ProductInput(product_id=product_id) for product_id in case['product_ids']]
+
+    if case['target'] == 'scraper':
+        scraper = CarisScraper(config, tracer)
+        try:
+            scraper.init()
+            products = scraper.scrape_products(inputs).data
+        finally:
+            scraper.close()
+    else:
+        scraper = CarisScraperWithAI(config, tracer=tracer)
+        try:
+            scraper.init()
+            products = scraper.scrape_products_with_ai(inputs)
+        finally:
+            scraper.close()
+
+    with open(case['output'], 'w') as f:
+        json.dump([product_to_dict(product) for product in products], f)
+    tracer.write(case['trace'])
+
+
+def run_case(case: dict, env: Dict[str, str]) -> dict:
+    """Run one case as a child process and measure wall time, peak RSS and latencies."""
+    if case['target'] == 'parallel':
+        cmd = [
+            sys.executable, str(ROOT / "parallel_scraper.py"), *case['product_ids'],
+            '--workers', str(case['workers']), '--engine', case['engine'],
+            '--base-url', case['base_url'], '--storage-dir', case['storage_dir'],
+            '--rate-limit', str(case['rate_limit']), '--no-dimension-cache',
+            '--trace', case['trace'], '--output', case['output']
+        ]
+    else:
+        cmd = [sys.executable, '-m', 'benchmarks.run', '--case', json.dumps(case)]
+
+    started_at = time.perf_counter()
+    process = subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    # wait4 gives the child's own peak RSS; the browser processes it spawns are not included
+    stderr = process.stderr.read()
+    _, status, usage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    elapsed = time.perf_counter() - started_at
+
+    result = {
+        'target': case['target'],
+        'engine': case['engine'],
+        'workers': case['workers'],
+        'products': len(case['product_ids']),
+        'elapsedSeconds': round(elapsed, 3),
+        'peakRssMb': round((usage.ru_maxrss // 1024 if sys.platform == 'darwin' else usage.ru_maxrss) / 1024, 1),
+        'exitCode': process.returncode
+    }
+
+    if process.returncode != 0:
+        result['error'] = stderr.decode(errors='replace').strip().splitlines()[-1:] or ['unknown error']
+        return result
+
+    with open(case['output']) as f:
+        products = json.load(f)
+    result['succeeded'] = len([product for product in products if not product.get('error')])
+    result['productsPerSecond'] = round(len(products) / elapsed, 2)
+
+    # Product latency: page extraction plus, for the AI targets, download and parse
+    latency_by_product: Dict[str, float] = {}
+    with open(case['trace']) as f:
+        for line in f:
+            span = json.loads(line)
+            if span['stage'] in ('page_total', 'after_page') and span['productId']:
+                latency_by_product[span['productId']] = latency_by_product.get(span['productId'], 0) + span['durationMs']
+
+    latencies = sorted(latency_by_product.values())
+    for p in (50, 95, 99):
+        result[f'p{p}Ms'] = round(percentile(latencies, p), 1)
+
+    return result
+
+
+def format_table(results: List[dict]) -> str:
+    lines = [f"{'target':<10}{'engine':<9}{'workers':>8}{'ok':>9}{'prod/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'RSS MB':>9}"]
+    for result in results:
+        if result.get('exitCode'):
+            lines.append(f"{result['target']:<10}{result['engine']:<9}{result['workers']:>8}  failed: {result['error'][0]}")
+            continue
+        lines.append(
+            f"{result['target']:<10}{result['engine']:<9}{result['workers']:>8}"
+            f"{str(result['succeeded']) + '/' + str(result['products']):>9}{result['productsPerSecond']:>9.2f}"
+            f"{result['p50Ms']:>9.0f}{result['p95Ms']:>9.0f}{result['p99Ms']:>9.0f}{result['peakRssMb']:>9.0f}"
+        )
+    return "\n".join(lines)
+
+
+def find_regressions(results: List[dict], baseline_path: str, tolerance: float) -> List[str]:
+    with open(baseline_path) as f:
+        baseline = {(r['target'], r['engine'], r['workers']): r for r in json.load(f)['results']}
+
+    regressions = []
+    for result in results:
+        previous = baseline.get((result['target'], result['engine'], result['workers']))
+        if not previous or 'productsPerSecond' not in previous:
+            continue
+        if 'productsPerSecond' not in result:
+            regressions.append(f"{result['target']}/{result['engine']}/{result['workers']}: run failed")
+        elif result['productsPerSecond'] < previous['productsPerSecond'] * (1 - tolerance):
+            regressions.append(
+                f"{result['target']}/{result['engine']}/{result['workers']}: "
+                f"{result['productsPerSecond']:.2f} prod/s vs {previous['productsPerSecond']:.2f} in baseline"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline Caris scraper benchmark')
+    parser.add_argument('--products', type=int, default=40, help='Products per case (default: 40)')
+    parser.add_argument('--workers', default='1,4', help='Comma-separated worker counts (default: 1,4)')
+    parser.add_argument('--engines', default='browser,http', help='Comma-separated engines (default: browser,http)')
+    parser.add_argument('--targets', default=','.join(TARGETS),
+                        help='Comma-separated targets: scraper (CarisScraper), ai (CarisScraperWithAI), parallel (parallel_scraper.py)')
+    parser.add_argument('--latency-ms', type=float, default=50, help='Fake store latency per request (default: 50)')
+    parser.add_argument('--jitter-ms', type=float, default=25, help='Random latency added or removed (default: 25)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered 429/503')
+    parser.add_argument('--claude-latency-ms', type=float, default=500, help='Fake claude latency per call (default: 500)')
+    parser.add_argument('--rate-limit', type=float, default=1000,
+                        help='Scraper rate limit per host; high by default so the store latency dominates')
+    parser.add_argument('--output', '-o', help='Save results as JSON')
+    parser.add_argument('--baseline', help='Earlier --output file to compare throughput against')
+    parser.add_argument('--tolerance', type=float, default=0.15,
+                        help='Allowed throughput drop against the baseline (default: 0.15)')
+    parser.add_argument('--case', help=argparse.SUPPRESS)
+
+    args = parser.parse_args()
+
+    if args.case:
+        run_case_in_process(json.loads(args.case))
+        return
+
+    options = StoreOptions(
+        products=args.products,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate
+    )
+    results = []
+
+    with tempfile.TemporaryDirectory(prefix='caris-bench-') as temp_dir, FakeStore(options) as store:
+        temp = Path(temp_dir)
+        fake_claude.install(temp / "bin")
+        env = dict(
+            os.environ,
+            PATH=f"{temp / 'bin'}{os.pathsep}{os.environ.get('PATH', '')}",
+            FAKE_CLAUDE_LATENCY_MS=str(args.claude_latency_ms)
+        )
+
+        for target in args.targets.split(','):
+            for engine in args.engines.split(','):
+                for workers in [int(value) for value in args.workers.split(',')]:
+                    name = f"{target}-{engine}-{workers}"
+                    print(f"Running {name}...", file=sys.stderr)
+                    case = {
+                        'target': target,
+                        'engine': engine,
+                        'workers': workers,
+                        'product_ids': store.product_ids(),
+                        'base_url': store.product_url,
+                        'storage_dir': str(temp / name),
+                        'rate_limit': args.rate_limit,
+                        'output': str(temp / f"{name}.json"),
+                        'trace': str(temp / f"{name}.jsonl")
+                    }
+                    results.append(run_case(case, env))
+
+        print(f"Fake store served {store.requests} requests, {store.errors_injected} injected errors", file=sys.stderr)
+
+    print(format_table(results))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'options': vars(options), 'results': results}, f, indent=2)
+        print(f"Results saved to {args.output}", file=sys.stderr)
+
+    if args.baseline:
+        regressions = find_regressions(results, args.baseline, args.tolerance)
+        for regression in regressions:
+            print(f"Regression: {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -4,6 +4,7 @@ import json
 import argparse
 from pathlib import Path
 from src.scraper_with_ai import CarisScraperWithAI
+from src.output import NdjsonWriter, compact_ndjson, completed_ids, product_to_dict, summarize_page_stats
 from src.types import ProductInput, ScraperConfig
 
 
@@ -16,6 +17,8 @@ Examples:
   python cli.py 822 820 633
   python cli.py --output results.json 822 820
   python cli.py --no-headless 822
+  python cli.py --workers 4 822 820 633 641
+  python cli.py --output results.json --resume 822 820 633
         """
     )
     
@@ -25,52 +28,96 @@ Examples:
     parser.add_argument('--no-headless', action='store_false', dest='headless',
                        help='Run browser with visible window')
     parser.add_argument('--output', '-o', help='Output file path (default: stdout)')
+    parser.add_argument('--workers', '-w', type=int, default=1,
+                       help='Number of concurrent browser workers (default: 1)')
+    parser.add_argument('--engine', choices=['browser', 'http'], default='browser',
+                       help='Page extraction engine; http falls back to the browser for incomplete pages')
+    parser.add_argument('--parse-batch-size', type=int, default=1,
+                       help='Dimension images parsed per Claude invocation (default: 1)')
+    parser.add_argument('--parser-workers', type=int, default=4,
+                       help='Pre-warmed Claude processes parsing dimension images; 0 starts one per image (default: 4)')
+    parser.add_argument('--parse-timeout', type=float, default=60,
+                       help='Seconds a single Claude parse may take once a worker picks it up (default: 60)')
+    parser.add_argument('--ocr', action='store_true',
+                       help='Try local OCR on dimension images before calling Claude')
+    parser.add_argument('--no-dimension-cache', action='store_false', dest='dimension_cache',
+                       help='Always re-parse dimension images instead of reusing cached results')
+    parser.add_argument('--clear-dimension-cache', action='store_true',
+                       help='Drop all cached dimension parses before scraping')
+    parser.add_argument('--block-resources', action='store_true',
+                       help='Drop images, fonts, CSS and third-party scripts while loading pages')
+    parser.add_argument('--wait-until', default='networkidle',
+                       choices=['networkidle', 'load', 'domcontentloaded'],
+                       help='Navigation event to wait for (default: networkidle)')
+    parser.add_argument('--wait-for-selector', help='CSS selector that must be attached before extracting')
+    parser.add_argument('--context-max-pages', type=int, default=100,
+                       help='Products per browser context before it is replaced; 0 keeps it (default: 100)')
+    parser.add_argument('--browser-max-rss-mb', type=int, default=1536,
+                       help='Recycle a worker\'s context, then its browser, above this memory use; 0 disables (default: 1536)')
+    parser.add_argument('--stream', action='store_true',
+                       help='Append each product to <output>.ndjson as it completes, then compact into --output')
+    parser.add_argument('--resume', action='store_true',
+                       help='Skip products already completed in <output>.ndjson (implies --stream)')
     
-    return parser.parse_args()
+    args = parser.parse_args()
+    if (args.stream or args.resume) and not args.output:
+        parser.error('--stream and --resume need --output')
+    
+    return args
 
 
 def main():
     args = parse_arguments()
     
-    product_inputs = [ProductInput(product_id=pid) for pid in args.product_ids]
+    stream = args.stream or args.resume
+    checkpoint = f"{args.output}.ndjson" if stream else None
+    product_ids = args.product_ids
+    
+    if args.resume:
+        done = completed_ids(checkpoint)
+        product_ids = [pid for pid in product_ids if pid not in done]
     
-    config = ScraperConfig(headless=args.headless)
+    product_inputs = [ProductInput(product_id=pid) for pid in product_ids]
+    
+    config = ScraperConfig(
+        headless=args.headless,
+        workers=args.workers,
+        engine=args.engine,
+        dimension_cache=args.dimension_cache,
+        parse_batch_size=args.parse_batch_size,
+        parser_workers=args.parser_workers,
+        parse_timeout=args.parse_timeout,
+        ocr_tier=args.ocr,
+        block_resources=args.block_resources,
+        wait_until=args.wait_until,
+        wait_for_selector=args.wait_for_selector,
+        context_max_pages=args.context_max_pages,
+        browser_max_rss_mb=args.browser_max_rss_mb
+    )
     scraper = CarisScraperWithAI(config)
+    writer = NdjsonWriter(checkpoint, append=args.resume) if stream else None
     
     try:
+        if args.clear_dimension_cache and scraper.dimension_cache:
+            scraper.dimension_cache.clear()
+        
         print("Initializing scraper...", file=sys.stderr)
         scraper.init()
         
         print(f"Scraping {len(product_inputs)} products...", file=sys.stderr)
-        results = scraper.scrape_products_with_ai(product_inputs)
+        results = scraper.scrape_products_with_ai(
+            product_inputs, on_result=writer.write if writer else None, collect=not stream
+        )
         
-        # Convert dataclasses to dict for JSON serialization
-        results_dict = []
-        for product in results:
-            product_dict = {
-                'productId': product.product_id,
-                'url': product.url,
-                'productName': product.product_name,
-                'images': product.images,
-                'dimensionsImage': product.dimensions_image,
-                'error': product.error
-            }
-            
-            if product.dimensions:
-                product_dict['dimensions'] = {
-                    'width': product.dimensions.width,
-                    'height': product.dimensions.height,
-                    'floor_to_chair_height_cm': product.dimensions.floor_to_chair_height_cm,
-                    'depth': product.dimensions.depth,
-                    'weight': product.dimensions.weight,
-                    'boxWidth': product.dimensions.box_width,
-                    'boxHeight': product.dimensions.box_height,
-                    'boxDepth': product.dimensions.box_depth,
-                    'qtyPerBox': product.dimensions.qty_per_box,
-                    'rawText': product.dimensions.raw_text
-                }
-            
-            results_dict.append(product_dict)
+        if writer:
+            writer.close()
+            writer = None
+            count = compact_ndjson(checkpoint, args.output)
+            print(f"Compacted {count} products from {checkpoint} into {args.output}", file=sys.stderr)
+            return
+        
+        print(summarize_page_stats([product.page_stats for product in results]), file=sys.stderr)
+        results_dict = [product_to_dict(product) for product in results]
         
         output = json.dumps(results_dict, indent=2)
         
@@ -86,6 +133,8 @@ def main():
         sys.exit(1)
     finally:
         scraper.close()
+        if writer:
+            writer.close()
 
 
 if __name__ == '__main__':
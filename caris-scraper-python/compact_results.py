@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+"""Compact a streamed NDJSON checkpoint into the JSON array format used by update_browser.py"""
+
+import sys
+import argparse
+from pathlib import Path
+from src.output import compact_ndjson
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compact NDJSON scrape results into a JSON array')
+    parser.add_argument('ndjson_file', help='Streamed NDJSON checkpoint file')
+    parser.add_argument('--output', '-o', required=True, help='Output JSON file path')
+    
+    args = parser.parse_args()
+    
+    if not Path(args.ndjson_file).exists():
+        print(f"Error: NDJSON file '{args.ndjson_file}' not found", file=sys.stderr)
+        sys.exit(1)
+    
+    count = compact_ndjson(args.ndjson_file, args.output)
+    print(f"Compacted {count} products into {args.output}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""Compare two product snapshots and write a changelog of added, changed and removed products"""
+
+import json
+import sys
+import argparse
+import time
+from src.snapshot_diff import diff_snapshots
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Diff two scrape snapshots into a compact changelog')
+    parser.add_argument('previous',
+                        help='Previous snapshot: result.json, an NDJSON checkpoint or a saved .index.json')
+    parser.add_argument('current', help='Current snapshot: result.json or an NDJSON checkpoint')
+    parser.add_argument('--output', '-o', help='Write the changelog here (default: stdout)')
+    parser.add_argument('--save-index', metavar='PATH',
+                        help='Save the current snapshot\'s hashes (name it *.index.json) to diff the next run against')
+
+    args = parser.parse_args()
+
+    if args.save_index and not args.save_index.endswith('.index.json'):
+        print("Error: --save-index must end in .index.json so the next diff recognizes it", file=sys.stderr)
+        sys.exit(1)
+
+    started_at = time.perf_counter()
+    try:
+        changelog = diff_snapshots(args.previous, args.current, index_path=args.save_index)
+    except Exception as e:
+        print(f"Error: {str(e)}", file=sys.stderr)
+        sys.exit(1)
+
+    summary = changelog['summary']
+    print(f"{summary['added']} added, {summary['changed']} changed, {summary['removed']} removed, "
+          f"{summary['unchanged']} unchanged ({(time.perf_counter() - started_at) * 1000:.0f} ms)", file=sys.stderr)
+    for name, count in summary['fields'].items():
+        print(f"  {name}: {count} products", file=sys.stderr)
+
+    output = json.dumps(changelog, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+        print(f"Changelog saved to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
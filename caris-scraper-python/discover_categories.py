@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""Crawl Caris category pages and write the consolidated product-to-categories mapping"""
+
+import json
+import sys
+import argparse
+from pathlib import Path
+from src.category_crawler import CategoryCrawler, consolidate
+from src.types import ScraperConfig
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Discover product IDs from Caris category pages')
+    parser.add_argument('categories', nargs='+',
+                        help='Category paths (e.g. 38 39) or full category URLs')
+    parser.add_argument('--output', '-o', default='consolidated-products.json',
+                        help='Consolidated mapping output path (default: consolidated-products.json)')
+    parser.add_argument('--category-dir',
+                        help='Also write one <category>_products.json per category, like categories/output/')
+    parser.add_argument('--concurrency', '-c', type=int, default=8, help='Concurrent page fetches (default: 8)')
+    parser.add_argument('--page-limit', type=int, default=100,
+                        help='Products requested per category page (default: 100)')
+    parser.add_argument('--category-url', default=ScraperConfig.category_url,
+                        help='URL prefix category paths are appended to')
+
+    args = parser.parse_args()
+
+    config = ScraperConfig(
+        concurrency=args.concurrency,
+        category_page_limit=args.page_limit,
+        category_url=args.category_url,
+        rate_limit_per_host=max(5.0, float(args.concurrency))
+    )
+    crawler = CategoryCrawler(config)
+    try:
+        categories = crawler.crawl(args.categories)
+    finally:
+        crawler.close()
+
+    for category in categories:
+        if category.error:
+            print(f"Failed: {category.url} - {category.error}", file=sys.stderr)
+        else:
+            print(f"{category.category_name}: {len(category.product_ids)} products on {category.pages} pages", file=sys.stderr)
+
+    if args.category_dir:
+        category_dir = Path(args.category_dir)
+        category_dir.mkdir(parents=True, exist_ok=True)
+        for category in categories:
+            if not category.category_name:
+                continue
+            with open(category_dir / f"{category.category_name}_products.json", 'w') as f:
+                json.dump({'category_name': category.category_name, 'product_ids': category.product_ids}, f, indent=2)
+
+    consolidated = consolidate(categories)
+    with open(args.output, 'w') as f:
+        json.dump(consolidated, f, indent=2)
+
+    print(f"{consolidated['statistics']['total_products']} products in "
+          f"{consolidated['statistics']['total_categories']} categories saved to {args.output}", file=sys.stderr)
+
+    if any(category.error for category in categories):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
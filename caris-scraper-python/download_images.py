@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Bulk-download product gallery images and fabric swatches into a content-addressed store"""
+
+import json
+import sys
+import argparse
+from pathlib import Path
+from src.downloader import ImageDownloader
+from src.types import resolve_storage_dir
+
+
+def collect_urls(products_path: str = None, fabrics_path: str = None) -> list:
+    """Gallery URLs from scraped products and high-res URLs from fabrics.json"""
+    urls = []
+    
+    if products_path:
+        with open(products_path, 'r', encoding='utf-8') as f:
+            for product in json.load(f):
+                urls.extend(product.get('images') or [])
+    
+    if fabrics_path:
+        with open(fabrics_path, 'r', encoding='utf-8') as f:
+            for fabric in json.load(f):
+                if fabric.get('high_res_url'):
+                    urls.append(fabric['high_res_url'])
+    
+    return urls
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Download product and fabric images')
+    parser.add_argument('--products', help='Scraped products JSON file (downloads every gallery image)')
+    parser.add_argument('--fabrics', help='fabrics.json file (downloads every high_res_url)')
+    parser.add_argument('--storage-dir', help='Directory for downloaded images and caches (default: storage/)')
+    parser.add_argument('--output-dir', help='Image store directory (default: <storage-dir>/images)')
+    parser.add_argument('--workers', '-w', type=int, default=8, help='Concurrent downloads (default: 8)')
+    parser.add_argument('--manifest', help='Write a url -> local file JSON manifest to this path')
+    parser.add_argument('--prune-days', type=float,
+                        help='Afterwards, drop images not fetched within this many days')
+    
+    args = parser.parse_args()
+    
+    if not args.products and not args.fabrics:
+        parser.error('nothing to download: pass --products and/or --fabrics')
+    
+    urls = collect_urls(args.products, args.fabrics)
+    print(f"Downloading {len(set(urls))} unique images with {args.workers} workers...", file=sys.stderr)
+    
+    output_dir = Path(args.output_dir) if args.output_dir else resolve_storage_dir(args.storage_dir) / 'images'
+    downloader = ImageDownloader(output_dir, workers=args.workers)
+    
+    try:
+        results = downloader.fetch_many(urls)
+        
+        if args.prune_days is not None:
+            removed = downloader.prune(args.prune_days)
+            print(f"Pruned {removed} unused files", file=sys.stderr)
+    finally:
+        downloader.close()
+    
+    failed = [r for r in results.values() if r.error]
+    reused = [r for r in results.values() if r.not_modified]
+    downloaded_bytes = sum(r.bytes_downloaded for r in results.values())
+    
+    for result in failed:
+        print(f"Failed: {result.url} - {result.error}", file=sys.stderr)
+    
+    print(f"Downloaded {downloaded_bytes / 1024 / 1024:.1f} MB, {len(reused)} unchanged, "
+          f"{len(failed)} failed out of {len(results)} images", file=sys.stderr)
+    
+    if args.manifest:
+        manifest = {url: r.path for url, r in results.items() if not r.error}
+        with open(args.manifest, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        print(f"Manifest saved to {args.manifest}", file=sys.stderr)
+    
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
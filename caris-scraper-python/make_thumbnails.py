@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""Download product and fabric images once and derive WebP/AVIF thumbnails stored by content hash"""
+
+import json
+import os
+import sys
+import argparse
+from pathlib import Path
+from src.downloader import ImageDownloader
+from src.thumbnails import DEFAULT_FORMATS, DEFAULT_SIZES, ThumbnailGenerator, derivative_record
+from src.types import resolve_storage_dir
+from download_images import collect_urls
+
+# Width the fabric picker's thumbnail_url should cover; the swatches render at 80px on HiDPI screens
+FABRIC_THUMBNAIL_WIDTH = 160
+
+
+def parse_list(value: str) -> list:
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+def rewrite_products(products: list, records: dict) -> int:
+    """Add a thumbnails list parallel to each product's images; returns the number of images covered"""
+    covered = 0
+    for product in products:
+        thumbnails = [records.get(url) for url in product.get('images') or []]
+        if any(thumbnails):
+            product['thumbnails'] = thumbnails
+            covered += len([record for record in thumbnails if record])
+        else:
+            product.pop('thumbnails', None)
+    return covered
+
+
+def rewrite_fabrics(fabrics: list, records: dict) -> int:
+    """Point each fabric's thumbnail_url at a local derivative; the remote URL is kept alongside"""
+    covered = 0
+    for fabric in fabrics:
+        record = records.get(fabric.get('high_res_url'))
+        if not record:
+            continue
+
+        variants = [v for v in record['variants'] if v['format'] == 'webp'] or record['variants']
+        wide_enough = [v for v in variants if v['width'] >= FABRIC_THUMBNAIL_WIDTH]
+        thumbnail = min(wide_enough, key=lambda v: v['width']) if wide_enough else max(variants, key=lambda v: v['width'])
+
+        fabric.setdefault('remote_thumbnail_url', fabric.get('thumbnail_url'))
+        fabric['thumbnail_url'] = thumbnail['path']
+        fabric['thumbnail_width'] = thumbnail['width']
+        fabric['thumbnail_height'] = thumbnail['height']
+        fabric['thumbnails'] = record
+        covered += 1
+    return covered
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate local thumbnails for product and fabric images')
+    parser.add_argument('--products', help='Scraped products JSON file (every gallery image)')
+    parser.add_argument('--fabrics', help='fabrics.json file (every high_res_url)')
+    parser.add_argument('--products-output', help='Rewritten products JSON (default: updates --products in place)')
+    parser.add_argument('--fabrics-output', help='Rewritten fabrics JSON (default: updates --fabrics in place)')
+    parser.add_argument('--storage-dir', help='Directory for downloaded images and caches (default: storage/)')
+    parser.add_argument('--image-dir', help='Downloaded image store (default: <storage-dir>/images)')
+    parser.add_argument('--output-dir', help='Thumbnail store directory (default: <storage-dir>/thumbnails)')
+    parser.add_argument('--sizes', default=','.join(str(size) for size in DEFAULT_SIZES),
+                        help='Comma-separated thumbnail widths (default: 160,320,640)')
+    parser.add_argument('--formats', default=','.join(DEFAULT_FORMATS),
+                        help='Comma-separated output formats, webp and/or avif (default: webp,avif)')
+    parser.add_argument('--quality', type=int, default=75, help='Encoder quality 1-100 (default: 75)')
+    parser.add_argument('--processes', '-p', type=int, help='Encoder processes (default: CPU count)')
+    parser.add_argument('--workers', '-w', type=int, default=8, help='Concurrent downloads (default: 8)')
+    parser.add_argument('--url-root', default='.',
+                        help='Directory the product browser is served from; thumbnail URLs are relative to it')
+
+    args = parser.parse_args()
+
+    if not args.products and not args.fabrics:
+        parser.error('nothing to do: pass --products and/or --fabrics')
+
+    storage_dir = resolve_storage_dir(args.storage_dir)
+    image_dir = Path(args.image_dir) if args.image_dir else storage_dir / 'images'
+    output_dir = Path(args.output_dir) if args.output_dir else storage_dir / 'thumbnails'
+
+    sizes = [int(size) for size in parse_list(args.sizes)]
+    try:
+        generator = ThumbnailGenerator(
+            output_dir, sizes=sizes, formats=parse_list(args.formats),
+            quality=args.quality, processes=args.processes
+        )
+    except Exception as e:
+        print(f"Error: {str(e)}", file=sys.stderr)
+        sys.exit(1)
+    if generator.skipped_formats:
+        print(f"Skipping formats this Pillow build can't encode: {', '.join(generator.skipped_formats)}", file=sys.stderr)
+
+    urls = collect_urls(args.products, args.fabrics)
+    print(f"Fetching {len(set(urls))} unique images with {args.workers} workers...", file=sys.stderr)
+
+    # Downloads are revalidated with conditional GETs, so unchanged images aren't transferred again
+    downloader = ImageDownloader(image_dir, workers=args.workers)
+    try:
+        downloads = downloader.fetch_many(urls)
+    finally:
+        downloader.close()
+
+    failed = [r for r in downloads.values() if r.error]
+    for result in failed:
+        print(f"Failed: {result.url} - {result.error}", file=sys.stderr)
+
+    # Identical images behind different URLs are rendered once
+    sources = {r.content_hash: r.path for r in downloads.values() if not r.error}
+    print(f"Rendering thumbnails for {len(sources)} images with {generator.processes} processes...", file=sys.stderr)
+    derivatives = generator.generate_many(sources)
+
+    for result in derivatives.values():
+        if result.error:
+            print(f"Failed: {result.content_hash} - {result.error}", file=sys.stderr)
+
+    url_root = Path(args.url_root).resolve()
+
+    def url_for(path: str) -> str:
+        return Path(os.path.relpath(Path(path).resolve(), url_root)).as_posix()
+
+    records = {}
+    for url, download in downloads.items():
+        result = derivatives.get(download.content_hash)
+        if result and not result.error:
+            records[url] = derivative_record(result, url_for)
+
+    if args.products:
+        with open(args.products, 'r', encoding='utf-8') as f:
+            products = json.load(f)
+        covered = rewrite_products(products, records)
+        output = args.products_output or args.products
+        with open(output, 'w') as f:
+            json.dump(products, f, indent=2)
+        print(f"Added thumbnails for {covered} product images to {output}", file=sys.stderr)
+
+    if args.fabrics:
+        with open(args.fabrics, 'r', encoding='utf-8') as f:
+            fabrics = json.load(f)
+        covered = rewrite_fabrics(fabrics, records)
+        output = args.fabrics_output or args.fabrics
+        with open(output, 'w') as f:
+            json.dump(fabrics, f, indent=2)
+        print(f"Pointed {covered} of {len(fabrics)} fabrics at local thumbnails in {output}", file=sys.stderr)
+
+    rendered = [r for r in derivatives.values() if not r.error and not r.reused]
+    reused = [r for r in derivatives.values() if r.reused]
+    render_failures = [r for r in derivatives.values() if r.error]
+    print(f"Rendered {len(rendered)}, reused {len(reused)}, {len(failed) + len(render_failures)} failed "
+          f"out of {len(downloads)} images", file=sys.stderr)
+
+    if failed or render_failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
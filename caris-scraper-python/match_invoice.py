@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Match invoice lines to scraped products and write the invoice01.json mapping"""
+
+import json
+import sys
+import argparse
+import time
+from src.invoice_matcher import InvoiceMatch, InvoiceMatcher, invoice_entry, match_report
+from src.record_store import open_table
+from src.snapshot_diff import load_changelog, touched_ids
+
+
+def kept_match(entry: dict) -> InvoiceMatch:
+    """An existing mapping entry carried over unchanged"""
+    return InvoiceMatch(entry, product_id=str(entry['productId']), product_name=entry.get('productName'),
+                        confidence=entry.get('confidence', 1.0))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Map invoice lines (invoiceCode, invoiceName) to scraped product IDs')
+    parser.add_argument('invoice', help='JSON array of invoice lines with invoiceCode, invoiceName and price fields')
+    parser.add_argument('--products', '-p', default='result.json',
+                        help='Product catalog: result.json, .parquet or a product_store.py file (default: result.json)')
+    parser.add_argument('--output', '-o', help='Write the invoice01.json-style mapping here (default: stdout)')
+    parser.add_argument('--report', help='Write match statistics with the unmatched and to-review lines here')
+    parser.add_argument('--min-confidence', type=float, default=0.6,
+                        help='Lowest score accepted as a match (default: 0.6)')
+    parser.add_argument('--review-confidence', type=float, default=0.8,
+                        help='Matches scoring below this are listed for review (default: 0.8)')
+    parser.add_argument('--changes', metavar='CHANGELOG',
+                        help='Treat the invoice file as an existing mapping and only re-match unmatched lines and '
+                             'lines whose product was removed or renamed in this diff_snapshots.py changelog')
+
+    args = parser.parse_args()
+
+    try:
+        with open(args.invoice, 'r', encoding='utf-8') as f:
+            lines = json.load(f)
+        table = open_table(args.products)
+        changelog = load_changelog(args.changes) if args.changes else None
+    except Exception as e:
+        print(f"Error: {str(e)}", file=sys.stderr)
+        sys.exit(1)
+
+    started_at = time.perf_counter()
+    matcher = InvoiceMatcher.from_table(
+        table, min_confidence=args.min_confidence, review_confidence=args.review_confidence
+    )
+    indexed_at = time.perf_counter()
+    if changelog is None:
+        results = matcher.match_all(lines)
+    else:
+        stale = touched_ids(changelog, {'productName'})
+        rematch = [not line.get('productId') or str(line['productId']) in stale for line in lines]
+        results = [matcher.match(line) if again else kept_match(line) for line, again in zip(lines, rematch)]
+        print(f"Re-matched {sum(rematch)} of {len(lines)} lines affected by {args.changes}", file=sys.stderr)
+    finished_at = time.perf_counter()
+
+    report = match_report(matcher, results)
+    print(f"Matched {report['matched']} of {report['lines']} lines against {len(matcher.entries)} products "
+          f"(index {(indexed_at - started_at) * 1000:.1f} ms, match {(finished_at - indexed_at) * 1000:.1f} ms)",
+          file=sys.stderr)
+    for line in report['unmatched']:
+        best = line['candidates'][0] if line['candidates'] else None
+        hint = f", best candidate {best['productId']} {best['productName']} ({best['confidence']})" if best else ''
+        print(f"Unmatched: {line['invoiceCode']} {line['invoiceName']}{hint}", file=sys.stderr)
+    for line in report['review']:
+        print(f"Review: {line['invoiceCode']} {line['invoiceName']} -> {line['productId']} "
+              f"({line['confidence']})", file=sys.stderr)
+
+    output = json.dumps([invoice_entry(result) for result in results], indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+        print(f"Mapping saved to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"Report saved to {args.report}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,47 +1,22 @@
 #!/usr/bin/env python3
 """Parallel wrapper for scraping multiple products"""
 
-import subprocess
 import json
 import sys
 import argparse
-from concurrent.futures import ProcessPoolExecutor, as_completed
-from pathlib import Path
+from src.scraper_with_ai import CarisScraperWithAI
+from src.state_store import ProductStateStore, default_state_path
+from src.tracing import Tracer
+from src.output import NdjsonWriter, compact_ndjson, completed_ids, product_to_dict, summarize_page_stats
+from src.types import ProductInput, ProductData, ScraperConfig
 
 
-def scrape_single_product(product_id: str, headless: bool = True) -> dict:
-    """Scrape a single product using the CLI"""
-    cmd = ['uv', 'run', 'python', 'cli.py']
-    
-    if headless:
-        cmd.append('--headless')
+def report_progress(product: ProductData):
+    """Print per-product progress as each page finishes"""
+    if product.error:
+        print(f"Failed: {product.product_id} - {product.error}", file=sys.stderr)
     else:
-        cmd.append('--no-headless')
-    
-    cmd.append(product_id)
-    
-    try:
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=60,
-            cwd=Path(__file__).parent
-        )
-        
-        if result.returncode == 0:
-            # Parse JSON output
-            data = json.loads(result.stdout)
-            return data[0] if data else {"error": "No data returned"}
-        else:
-            return {"error": f"CLI failed: {result.stderr}"}
-            
-    except subprocess.TimeoutExpired:
-        return {"error": "Timeout scraping product"}
-    except json.JSONDecodeError:
-        return {"error": "Invalid JSON response"}
-    except Exception as e:
-        return {"error": f"Unexpected error: {str(e)}"}
+        print(f"Completed: {product.product_id}", file=sys.stderr)
 
 
 def main():
@@ -49,36 +24,125 @@ def main():
     parser.add_argument('product_ids', nargs='+', help='Product IDs to scrape')
     parser.add_argument('--workers', '-w', type=int, default=4, help='Number of parallel workers (default: 4)')
     parser.add_argument('--no-headless', action='store_true', help='Run with visible browser')
+    parser.add_argument('--engine', choices=['browser', 'http'], default='browser',
+                        help='Page extraction engine; http falls back to the browser for incomplete pages')
+    parser.add_argument('--parse-batch-size', type=int, default=1,
+                        help='Dimension images parsed per Claude invocation (default: 1)')
+    parser.add_argument('--parser-workers', type=int, default=4,
+                        help='Pre-warmed Claude processes parsing dimension images; 0 starts one per image (default: 4)')
+    parser.add_argument('--parse-timeout', type=float, default=60,
+                        help='Seconds a single Claude parse may take once a worker picks it up (default: 60)')
+    parser.add_argument('--ocr', action='store_true',
+                        help='Try local OCR on dimension images before calling Claude')
+    parser.add_argument('--no-dimension-cache', action='store_false', dest='dimension_cache',
+                        help='Always re-parse dimension images instead of reusing cached results')
+    parser.add_argument('--block-resources', action='store_true', help='Drop images, fonts, CSS and third-party scripts')
+    parser.add_argument('--wait-until', default='networkidle', choices=['networkidle', 'load', 'domcontentloaded'],
+                        help='Navigation event to wait for (default: networkidle)')
+    parser.add_argument('--wait-for-selector', help='CSS selector that must be attached before extracting')
+    parser.add_argument('--context-max-pages', type=int, default=100,
+                        help='Products per browser context before it is replaced; 0 keeps it (default: 100)')
+    parser.add_argument('--browser-max-rss-mb', type=int, default=1536,
+                        help='Recycle a worker\'s context, then its browser, above this memory use; 0 disables (default: 1536)')
+    parser.add_argument('--rate-limit', type=float, default=5.0,
+                        help='Requests per second per host shared by all workers (default: 5)')
+    parser.add_argument('--max-retries', type=int, default=3,
+                        help='Retries for timeouts, 429 and 5xx responses before giving up (default: 3)')
+    parser.add_argument('--trace', help='Write per-stage timings: Chrome trace for .json, JSON lines otherwise')
+    parser.add_argument('--base-url', default=ScraperConfig.base_url,
+                        help='Product URL prefix the product ID is appended to')
+    parser.add_argument('--storage-dir', help='Directory for downloaded images and caches (default: storage/)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Only re-scrape products that are new, stale, previously failed or changed')
+    parser.add_argument('--ttl-hours', type=float, default=24,
+                        help='Age after which a stored product is re-scraped in incremental mode (default: 24)')
+    parser.add_argument('--state-db',
+                        help='Product state store used by incremental mode (default: <storage-dir>/product-state.sqlite)')
     parser.add_argument('--output', '-o', required=True, help='Output JSON file path to save combined results')
+    parser.add_argument('--stream', action='store_true',
+                        help='Append each product to an NDJSON checkpoint as it completes, then compact into --output')
+    parser.add_argument('--checkpoint', help='NDJSON checkpoint path (default: <output>.ndjson)')
+    parser.add_argument('--resume', action='store_true',
+                        help='Skip products already completed in the checkpoint (implies --stream)')
     
     args = parser.parse_args()
     
-    print(f"Scraping {len(args.product_ids)} products with {args.workers} workers...", file=sys.stderr)
+    stream = args.stream or args.resume
+    checkpoint = args.checkpoint or f"{args.output}.ndjson"
+    product_ids = args.product_ids
+    
+    if args.resume:
+        done = completed_ids(checkpoint)
+        product_ids = [pid for pid in product_ids if pid not in done]
+        print(f"Resuming: {len(args.product_ids) - len(product_ids)} products already in {checkpoint}", file=sys.stderr)
     
-    results = []
-    headless = not args.no_headless
+    print(f"Scraping {len(product_ids)} products with {args.workers} workers...", file=sys.stderr)
     
-    with ProcessPoolExecutor(max_workers=args.workers) as executor:
-        # Submit all tasks
-        future_to_product = {
-            executor.submit(scrape_single_product, product_id, headless): product_id 
-            for product_id in args.product_ids
-        }
-        
-        # Collect results as they complete
-        for future in as_completed(future_to_product):
-            product_id = future_to_product[future]
-            try:
-                result = future.result()
-                results.append(result)
-                print(f"Completed: {product_id}", file=sys.stderr)
-            except Exception as e:
-                error_result = {
-                    "productId": product_id,
-                    "error": f"Process error: {str(e)}"
-                }
-                results.append(error_result)
-                print(f"Failed: {product_id} - {str(e)}", file=sys.stderr)
+    product_inputs = [ProductInput(product_id=pid) for pid in product_ids]
+    config = ScraperConfig(
+        base_url=args.base_url,
+        storage_dir=args.storage_dir,
+        headless=not args.no_headless,
+        workers=args.workers,
+        engine=args.engine,
+        dimension_cache=args.dimension_cache,
+        parse_batch_size=args.parse_batch_size,
+        parser_workers=args.parser_workers,
+        parse_timeout=args.parse_timeout,
+        ocr_tier=args.ocr,
+        block_resources=args.block_resources,
+        wait_until=args.wait_until,
+        wait_for_selector=args.wait_for_selector,
+        context_max_pages=args.context_max_pages,
+        browser_max_rss_mb=args.browser_max_rss_mb,
+        rate_limit_per_host=args.rate_limit,
+        max_retries=args.max_retries
+    )
+    state_store = ProductStateStore(args.state_db or default_state_path(config)) if args.incremental else None
+    tracer = Tracer()
+    scraper = CarisScraperWithAI(config, state_store=state_store, tracer=tracer)
+    writer = NdjsonWriter(checkpoint, append=args.resume) if stream else None
+    page_stats = []
+    
+    def on_result(product: ProductData):
+        report_progress(product)
+        page_stats.append(product.page_stats)
+        if writer:
+            writer.write(product)
+    
+    try:
+        scraper.init()
+        if state_store:
+            products = scraper.scrape_products_incremental(
+                product_inputs, args.ttl_hours * 3600, on_result=on_result, collect=not stream
+            )
+        else:
+            products = scraper.scrape_products_with_ai(product_inputs, on_result=on_result, collect=not stream)
+    finally:
+        scraper.close()
+        if writer:
+            writer.close()
+    
+    print(summarize_page_stats(page_stats), file=sys.stderr)
+    print(tracer.summary(), file=sys.stderr)
+    if args.trace:
+        tracer.write(args.trace)
+        print(f"Trace saved to {args.trace}", file=sys.stderr)
+    print(scraper.session_summary(), file=sys.stderr)
+    print(f"Retried {scraper.scheduler.retries} requests, {len(scraper.scheduler.dead_letters)} gave up", file=sys.stderr)
+    
+    if scraper.scheduler.dead_letters:
+        dead_letter_path = f"{args.output}.dead-letter.json"
+        with open(dead_letter_path, 'w') as f:
+            json.dump([vars(letter) for letter in scraper.scheduler.dead_letters], f, indent=2)
+        print(f"Failed requests saved to {dead_letter_path}", file=sys.stderr)
+    
+    if stream:
+        count = compact_ndjson(checkpoint, args.output)
+        print(f"Compacted {count} products from {checkpoint} into {args.output}", file=sys.stderr)
+        return
+    
+    results = [product_to_dict(product) for product in products]
     
     # Save combined results to JSON file
     output = json.dumps(results, indent=2)
@@ -87,8 +151,7 @@ def main():
         f.write(output)
     
     print(f"Combined results saved to {args.output}", file=sys.stderr)
-    print(f"Successfully scraped {len([r for r in results if 'error' not in r])} out of {len(results)} products", file=sys.stderr)
-
+    print(f"Successfully scraped {len([r for r in results if not r.get('error')])} out of {len(results)} products", file=sys.stderr)
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
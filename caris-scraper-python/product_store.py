@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""Convert scraped products to the columnar record store and query it"""
+
+import sys
+import argparse
+import math
+import time
+from src.record_store import DIMENSION_COLUMNS, open_table, save_table
+
+
+def parse_range(value: str) -> tuple:
+    """'width:50:60' -> ('width', 50.0, 60.0); either bound may be left empty"""
+    parts = value.split(':')
+    if len(parts) != 3:
+        raise argparse.ArgumentTypeError(f"expected COLUMN:MIN:MAX, got {value!r}")
+    column, low, high = parts
+    if column not in [name for name, _ in DIMENSION_COLUMNS]:
+        raise argparse.ArgumentTypeError(f"unknown numeric column {column!r}")
+    try:
+        return column, float(low) if low else None, float(high) if high else None
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"bounds must be numbers: {value!r}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Columnar product record store')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    convert = commands.add_parser('convert', help='Convert between .json, .parquet and the binary record format')
+    convert.add_argument('input', help='Products file: result.json, .parquet or a record store file')
+    convert.add_argument('output', help='Output file; the extension picks the format (anything else is binary)')
+
+    query = commands.add_parser('query', help='Filter products by dimensions and name')
+    query.add_argument('input', help='Products file: record store file, .parquet or .json')
+    query.add_argument('--where', action='append', type=parse_range, default=[], metavar='COLUMN:MIN:MAX',
+                       help='Numeric range filter, repeatable, e.g. width:50:60 or weight::10')
+    query.add_argument('--name', help='Only products whose name contains this text')
+    query.add_argument('--output', '-o', help='Write the matches as JSON or any other supported format')
+
+    args = parser.parse_args()
+
+    started_at = time.perf_counter()
+    try:
+        table = open_table(args.input)
+    except Exception as e:
+        print(f"Error: {str(e)}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.command == 'convert':
+        save_table(table, args.output)
+        print(f"Converted {len(table)} products to {args.output} in {time.perf_counter() - started_at:.2f}s",
+              file=sys.stderr)
+        return
+
+    rows = None
+    for column, low, high in args.where:
+        rows = table.where(column, low, high, rows)
+    if args.name:
+        rows = table.contains('product_name', args.name, rows)
+    if rows is None:
+        rows = list(range(len(table)))
+
+    print(f"{len(rows)} of {len(table)} products match ({(time.perf_counter() - started_at) * 1000:.1f} ms)",
+          file=sys.stderr)
+
+    if args.output:
+        save_table(table.take(rows), args.output)
+        print(f"Matches saved to {args.output}", file=sys.stderr)
+        return
+
+    for index in rows:
+        record = table.record(index)
+        dimensions = ' x '.join(
+            '?' if math.isnan(value) else f"{value:g}" for value in (record.width, record.depth, record.height)
+        )
+        print(f"{record.product_id}\t{record.product_name}\t{dimensions}")
+
+
+if __name__ == '__main__':
+    main()
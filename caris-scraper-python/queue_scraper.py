@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""Share one catalog scrape between any number of worker processes through a SQLite job queue"""
+
+import json
+import sys
+import argparse
+import time
+from src.scraper_with_ai import CarisScraperWithAI
+from src.tracing import Tracer
+from src.types import DEFAULT_STORAGE_DIR, ProductInput, ProductData, ScraperConfig
+from src.work_queue import LeaseKeeper, WorkQueue, default_worker_id
+from refresh import DEFAULT_CONSOLIDATED, load_product_ids
+
+# Coordinator and workers must agree on it, so it doesn't follow a worker's --storage-dir
+DEFAULT_QUEUE = DEFAULT_STORAGE_DIR / 'scrape-queue.sqlite'
+
+
+def read_ids(args) -> list:
+    """Product IDs from the command line, an ID file (one per line, - for stdin) or a consolidated mapping"""
+    product_ids = list(args.product_ids)
+    if args.ids_file:
+        handle = sys.stdin if args.ids_file == '-' else open(args.ids_file, 'r', encoding='utf-8')
+        with handle:
+            product_ids.extend(line.strip() for line in handle if line.strip())
+    if args.consolidated:
+        product_ids.extend(load_product_ids(args.consolidated))
+    return product_ids
+
+
+def enqueue(args, work_queue: WorkQueue):
+    """Coordinator side: add product IDs to the queue"""
+    product_ids = read_ids(args)
+    if not product_ids:
+        print("Nothing to enqueue: pass product IDs, --ids-file or --consolidated", file=sys.stderr)
+        sys.exit(1)
+    added = work_queue.enqueue(product_ids, reset=args.reset)
+    print(f"Queued {added} of {len(set(product_ids))} products in {args.queue}", file=sys.stderr)
+
+
+def status(args, work_queue: WorkQueue):
+    """Print job counts and the jobs each worker holds"""
+    counts = work_queue.counts()
+    print(', '.join(f"{count} {name}" for name, count in counts.items()))
+    for worker, leased in sorted(work_queue.workers().items()):
+        print(f"  {worker}: {leased} leased")
+
+
+def collect(args, work_queue: WorkQueue):
+    """Write every finished product to a result.json-style array"""
+    results = list(work_queue.results())
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    counts = work_queue.counts()
+    print(f"Collected {len(results)} products into {args.output} "
+          f"({counts['pending'] + counts['leased']} still queued)", file=sys.stderr)
+
+
+def work(args, work_queue: WorkQueue):
+    """Worker side: claim batches of jobs, scrape them and write the results back until the queue drains"""
+    worker_id = args.worker_id or default_worker_id()
+    config = ScraperConfig(
+        base_url=args.base_url,
+        storage_dir=args.storage_dir,
+        headless=not args.no_headless,
+        workers=args.workers,
+        engine=args.engine,
+        parse_batch_size=args.parse_batch_size,
+        parser_workers=args.parser_workers,
+        parse_timeout=args.parse_timeout,
+        context_max_pages=args.context_max_pages,
+        browser_max_rss_mb=args.browser_max_rss_mb,
+        rate_limit_per_host=args.rate_limit
+    )
+    tracer = Tracer()
+    scraper = CarisScraperWithAI(config, tracer=tracer)
+    keeper = LeaseKeeper(work_queue).start()
+    finished = {'done': 0, 'lost': 0}
+
+    def on_result(product: ProductData):
+        lease = keeper.pop(product.product_id)
+        if lease and work_queue.complete(lease, product):
+            finished['done'] += 1
+            if product.error:
+                print(f"Failed: {product.product_id} (attempt {lease.attempts}) - {product.error}", file=sys.stderr)
+            else:
+                print(f"Completed: {product.product_id}", file=sys.stderr)
+        else:
+            # The lease expired and the job went to another worker; its result wins
+            finished['lost'] += 1
+            print(f"Discarded: {product.product_id} - lease lost", file=sys.stderr)
+
+    batch_size = args.batch_size or max(1, args.workers) * 4
+    print(f"Worker {worker_id} claiming up to {batch_size} jobs at a time from {args.queue}", file=sys.stderr)
+
+    try:
+        scraper.init()
+        while True:
+            leases = work_queue.claim(worker_id, batch_size)
+            if not leases:
+                counts = work_queue.counts()
+                # Leases held elsewhere may still expire and come back, so keep polling until they finish
+                if not args.wait and counts['pending'] == 0 and counts['leased'] == 0:
+                    break
+                time.sleep(args.poll_interval)
+                continue
+
+            keeper.add(leases)
+            scraper.scrape_products_with_ai(
+                [ProductInput(product_id=lease.product_id) for lease in leases], on_result=on_result, collect=False
+            )
+    except KeyboardInterrupt:
+        print("Interrupted, handing unfinished jobs back", file=sys.stderr)
+    finally:
+        keeper.stop()
+        released = work_queue.release(keeper.held())
+        scraper.close()
+
+    print(tracer.summary(), file=sys.stderr)
+    print(scraper.session_summary(), file=sys.stderr)
+    print(f"Worker {worker_id}: {finished['done']} finished, {finished['lost']} discarded, "
+          f"{released} handed back", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Queue-backed Caris scrape shared by many worker processes')
+    parser.add_argument('--queue', '-q', default=str(DEFAULT_QUEUE),
+                        help='Queue database shared by the coordinator and all workers '
+                             '(default: storage/scrape-queue.sqlite next to src/)')
+    parser.add_argument('--lease-seconds', type=float, default=300,
+                        help='How long a claimed job stays with a worker without a heartbeat (default: 300)')
+    parser.add_argument('--max-attempts', type=int, default=3,
+                        help='Attempts per product before it is left failed (default: 3)')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    enqueue_parser = commands.add_parser('enqueue', help='Add product IDs to the queue')
+    enqueue_parser.add_argument('product_ids', nargs='*', help='Product IDs')
+    enqueue_parser.add_argument('--ids-file', help='File with one product ID per line, or - for stdin')
+    enqueue_parser.add_argument('--consolidated', nargs='?', const=str(DEFAULT_CONSOLIDATED),
+                                help='Queue every product in a consolidated-products.json')
+    enqueue_parser.add_argument('--reset', action='store_true', help='Queue IDs again even if already done')
+
+    work_parser = commands.add_parser('work', help='Claim and scrape jobs until the queue is empty')
+    work_parser.add_argument('--worker-id', help='Name shown in status output (default: host-pid-random)')
+    work_parser.add_argument('--batch-size', type=int, help='Jobs claimed at a time (default: 4 x --workers)')
+    work_parser.add_argument('--wait', action='store_true', help='Keep polling for new jobs instead of exiting')
+    work_parser.add_argument('--poll-interval', type=float, default=5, help='Seconds between empty polls (default: 5)')
+    work_parser.add_argument('--workers', '-w', type=int, default=4, help='Parallel page workers (default: 4)')
+    work_parser.add_argument('--no-headless', action='store_true', help='Run with visible browser')
+    work_parser.add_argument('--engine', choices=['browser', 'http'], default='browser',
+                             help='Page extraction engine; http falls back to the browser for incomplete pages')
+    work_parser.add_argument('--parse-batch-size', type=int, default=1,
+                             help='Dimension images parsed per Claude invocation (default: 1)')
+    work_parser.add_argument('--parser-workers', type=int, default=4,
+                             help='Pre-warmed Claude processes parsing dimension images (default: 4)')
+    work_parser.add_argument('--parse-timeout', type=float, default=60,
+                             help='Seconds a single Claude parse may take (default: 60)')
+    work_parser.add_argument('--context-max-pages', type=int, default=100,
+                             help='Products per browser context before it is replaced; 0 keeps it (default: 100)')
+    work_parser.add_argument('--browser-max-rss-mb', type=int, default=1536,
+                             help='Recycle a worker\'s context, then its browser, above this memory use; 0 disables (default: 1536)')
+    work_parser.add_argument('--rate-limit', type=float, default=5.0,
+                             help='Requests per second per host for this worker process (default: 5)')
+    work_parser.add_argument('--base-url', default=ScraperConfig.base_url,
+                             help='Product URL prefix the product ID is appended to')
+    work_parser.add_argument('--storage-dir', help='Directory for downloaded images and caches (default: storage/)')
+
+    commands.add_parser('status', help='Show job counts and per-worker leases')
+
+    collect_parser = commands.add_parser('collect', help='Write finished products to a JSON array')
+    collect_parser.add_argument('--output', '-o', default='result.json', help='Output JSON (default: result.json)')
+
+    commands.add_parser('requeue-failed', help='Give products that ran out of attempts another round')
+
+    args = parser.parse_args()
+
+    work_queue = WorkQueue(args.queue, lease_seconds=args.lease_seconds, max_attempts=args.max_attempts)
+    try:
+        if args.command == 'enqueue':
+            enqueue(args, work_queue)
+        elif args.command == 'work':
+            work(args, work_queue)
+        elif args.command == 'status':
+            status(args, work_queue)
+        elif args.command == 'collect':
+            collect(args, work_queue)
+        elif args.command == 'requeue-failed':
+            print(f"Requeued {work_queue.requeue_failed()} failed products", file=sys.stderr)
+    finally:
+        work_queue.close()
+
+
+if __name__ == '__main__':
+    main()
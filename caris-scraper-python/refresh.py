@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""Discover, scrape, parse and publish Caris products in one process"""
+
+import json
+import sys
+import argparse
+import time
+from pathlib import Path
+from src.category_crawler import CategoryCrawler, consolidate
+from src.output import dimensions_failed, product_from_dict, product_to_dict, summarize_page_stats
+from src.scraper_with_ai import CarisScraperWithAI
+from src.snapshot_diff import SnapshotDiff, load_baseline
+from src.state_store import ProductStateStore, default_state_path
+from src.tracing import Tracer
+from src.types import ProductInput, ProductData, ScraperConfig
+from update_browser import publish_external, update_html_with_data
+
+STAGES = ['discover', 'scrape', 'parse', 'publish']
+DEFAULT_CONSOLIDATED = Path(__file__).parent.parent / "categories" / "consolidated-products.json"
+
+
+def load_product_ids(consolidated_path: str) -> list:
+    """Product IDs from an existing consolidated-products.json, sorted numerically"""
+    with open(consolidated_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if not isinstance(data.get('products'), dict):
+        raise Exception(f"Invalid consolidated products file: {consolidated_path}")
+    return sorted((pid for pid in data['products'] if pid.isdigit()), key=int)
+
+
+def discover(crawler: CategoryCrawler, categories: list, consolidated_path: str, category_dir: str = None) -> list:
+    """Crawl categories, write the consolidated mapping and return its product IDs"""
+    results = crawler.crawl(categories)
+    for category in results:
+        if category.error:
+            print(f"Failed: {category.url} - {category.error}", file=sys.stderr)
+        else:
+            print(f"{category.category_name}: {len(category.product_ids)} products", file=sys.stderr)
+
+    if category_dir:
+        Path(category_dir).mkdir(parents=True, exist_ok=True)
+        for category in results:
+            if category.category_name:
+                with open(Path(category_dir) / f"{category.category_name}_products.json", 'w') as f:
+                    json.dump({'category_name': category.category_name, 'product_ids': category.product_ids}, f, indent=2)
+
+    consolidated = consolidate(results)
+    with open(consolidated_path, 'w') as f:
+        json.dump(consolidated, f, indent=2)
+    print(f"Discovered {len(consolidated['products'])} products, saved to {consolidated_path}", file=sys.stderr)
+
+    return list(consolidated['products'].keys())
+
+
+def report_progress(product: ProductData):
+    """Print per-product progress as each product finishes"""
+    if product.error:
+        print(f"Failed: {product.product_id} - {product.error}", file=sys.stderr)
+    else:
+        print(f"Completed: {product.product_id}", file=sys.stderr)
+
+
+def needs_parse(record: dict) -> bool:
+    """Scraped, but its dimensions image was never parsed or the parse failed"""
+    if record.get('error') or not record.get('dimensionsImage'):
+        return False
+    return not record.get('dimensions') or dimensions_failed(record['dimensions'])
+
+
+def write_changelog(previous_path: str, records: list, output_path: str, changelog_path: str):
+    """Diff fresh records against the previous result.json before output_path replaces it"""
+    previous = Path(previous_path)
+    if not previous.exists():
+        print(f"No previous {previous_path} to diff against, skipping the changelog", file=sys.stderr)
+        return
+    changelog = SnapshotDiff(load_baseline(str(previous))).feed_all(records).changelog(
+        source=previous.name, target=Path(output_path).name
+    )
+    with open(changelog_path, 'w', encoding='utf-8') as f:
+        json.dump(changelog, f, indent=2, ensure_ascii=False)
+    summary = changelog['summary']
+    print(f"Changelog: {summary['added']} added, {summary['changed']} changed, {summary['removed']} removed, "
+          f"saved to {changelog_path}", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Full Caris refresh: discover -> scrape -> parse -> publish')
+    parser.add_argument('categories', nargs='*', help='Category paths (e.g. 38 39) or URLs for the discover stage')
+    parser.add_argument('--stages', default=','.join(STAGES),
+                        help='Comma-separated stages to run (default: discover,scrape,parse,publish); '
+                             'skipped stages are read from their artifacts. parse without scrape parses the '
+                             'dimension images missing or failed in --output')
+    parser.add_argument('--consolidated', default=str(DEFAULT_CONSOLIDATED),
+                        help='Consolidated product-to-categories mapping written by discover')
+    parser.add_argument('--category-dir', help='Also write per-category <name>_products.json files')
+    parser.add_argument('--output', '-o', default='result.json', help='Scraped products JSON (default: result.json)')
+    parser.add_argument('--html', default='product_browser.html', help='Product browser template to publish into')
+    parser.add_argument('--html-output', help='Published HTML path (default: updates --html in place)')
+    parser.add_argument('--external', metavar='DATA_DIR',
+                        help='Publish the data as chunk files in DATA_DIR loaded by the page instead of inlining it')
+    parser.add_argument('--gzip', action='store_true', help='Gzip chunk files in --external mode')
+    parser.add_argument('--limit', type=int, help='Only scrape the first N discovered products')
+    parser.add_argument('--workers', '-w', type=int, default=4, help='Parallel page workers (default: 4)')
+    parser.add_argument('--engine', choices=['browser', 'http'], default='http',
+                        help='Page extraction engine (default: http, falling back to the browser)')
+    parser.add_argument('--parse-batch-size', type=int, default=1,
+                        help='Dimension images parsed per Claude invocation (default: 1)')
+    parser.add_argument('--parser-workers', type=int, default=4,
+                        help='Pre-warmed Claude processes parsing dimension images; 0 starts one per image (default: 4)')
+    parser.add_argument('--parse-timeout', type=float, default=60,
+                        help='Seconds a single Claude parse may take once a worker picks it up (default: 60)')
+    parser.add_argument('--ocr', action='store_true', help='Try local OCR on dimension images before calling Claude')
+    parser.add_argument('--rate-limit', type=float, default=5.0,
+                        help='Requests per second per host shared by every stage (default: 5)')
+    parser.add_argument('--base-url', default=ScraperConfig.base_url,
+                        help='Product URL prefix the product ID is appended to')
+    parser.add_argument('--category-url', default=ScraperConfig.category_url,
+                        help='URL prefix category paths are appended to')
+    parser.add_argument('--storage-dir', help='Directory for downloaded images and caches (default: storage/)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Only re-scrape products that are new, stale, previously failed or changed')
+    parser.add_argument('--ttl-hours', type=float, default=24,
+                        help='Age after which a stored product is re-scraped in incremental mode (default: 24)')
+    parser.add_argument('--state-db',
+                        help='Product state store for incremental mode (default: <storage-dir>/product-state.sqlite)')
+    parser.add_argument('--changelog', metavar='PATH',
+                        help='Before overwriting --output, write a changelog against the previous run to PATH')
+    parser.add_argument('--trace', help='Write per-stage timings: Chrome trace for .json, JSON lines otherwise')
+
+    args = parser.parse_args()
+
+    stages = [stage.strip() for stage in args.stages.split(',') if stage.strip()]
+    unknown = [stage for stage in stages if stage not in STAGES]
+    if unknown:
+        parser.error(f"Unknown stages: {', '.join(unknown)}")
+    if 'discover' in stages and not args.categories:
+        parser.error('The discover stage needs category paths or URLs')
+    if args.incremental and 'scrape' in stages and 'parse' not in stages:
+        parser.error('--incremental stores parsed products, so the scrape stage needs the parse stage with it')
+
+    config = ScraperConfig(
+        base_url=args.base_url,
+        category_url=args.category_url,
+        storage_dir=args.storage_dir,
+        workers=args.workers,
+        engine=args.engine,
+        parse_batch_size=args.parse_batch_size,
+        parser_workers=args.parser_workers,
+        parse_timeout=args.parse_timeout,
+        ocr_tier=args.ocr,
+        rate_limit_per_host=args.rate_limit
+    )
+    tracer = Tracer()
+    state_store = ProductStateStore(args.state_db or default_state_path(config)) if args.incremental else None
+    # One scraper, and so one rate limiter and connection pools, for every stage
+    scraper = CarisScraperWithAI(config, state_store=state_store, tracer=tracer)
+    started_at = time.monotonic()
+    published_data = None
+
+    try:
+        if 'discover' in stages:
+            crawler = CategoryCrawler(config, scheduler=scraper.scheduler)
+            try:
+                with tracer.span('discover'):
+                    product_ids = discover(crawler, args.categories, args.consolidated, args.category_dir)
+            finally:
+                crawler.close()
+        elif 'scrape' in stages:
+            product_ids = load_product_ids(args.consolidated)
+            print(f"Loaded {len(product_ids)} product IDs from {args.consolidated}", file=sys.stderr)
+
+        if 'scrape' in stages:
+            if args.limit:
+                product_ids = product_ids[:args.limit]
+            product_inputs = [ProductInput(product_id=pid) for pid in product_ids]
+            print(f"Scraping {len(product_inputs)} products with {args.workers} workers...", file=sys.stderr)
+
+            scraper.init()
+            with tracer.span('scrape'):
+                if 'parse' not in stages:
+                    # Dimension images are left for a later --stages parse run
+                    products = scraper.scrape_products(product_inputs, on_result=report_progress).data
+                elif state_store:
+                    products = scraper.scrape_products_incremental(
+                        product_inputs, args.ttl_hours * 3600, on_result=report_progress
+                    )
+                else:
+                    products = scraper.scrape_products_with_ai(product_inputs, on_result=report_progress)
+
+            published_data = [product_to_dict(product) for product in products]
+            print(f"Scraped {len([p for p in products if not p.error])} of {len(products)} products", file=sys.stderr)
+            print(summarize_page_stats([product.page_stats for product in products]), file=sys.stderr)
+        elif 'parse' in stages:
+            with open(args.output, 'r', encoding='utf-8') as f:
+                published_data = json.load(f)
+            pending = [product_from_dict(record) for record in published_data if needs_parse(record)]
+            print(f"Parsing {len(pending)} of {len(published_data)} products' dimension images from {args.output}",
+                  file=sys.stderr)
+
+            with tracer.span('parse'):
+                parsed = {product.product_id: product
+                          for product in scraper.parse_products(pending, on_result=report_progress)}
+            # Fields other stages added to the records (e.g. thumbnails) are kept
+            published_data = [
+                {**record, **product_to_dict(parsed[str(record.get('productId'))])}
+                if str(record.get('productId')) in parsed else record
+                for record in published_data
+            ]
+
+        if 'scrape' in stages or 'parse' in stages:
+            if args.changelog:
+                write_changelog(args.output, published_data, args.output, args.changelog)
+            with open(args.output, 'w') as f:
+                json.dump(published_data, f, indent=2)
+            print(f"Saved {len(published_data)} products to {args.output}", file=sys.stderr)
+    finally:
+        scraper.close()
+
+    if 'publish' in stages:
+        if published_data is None:
+            with open(args.output, 'r', encoding='utf-8') as f:
+                published_data = json.load(f)
+        with tracer.span('publish'):
+            if args.external:
+                published = publish_external(
+                    args.html, published_data, args.external, args.html_output, compress=args.gzip
+                )
+            else:
+                published = update_html_with_data(args.html, published_data, args.html_output)
+        if not published:
+            sys.exit(1)
+
+    print(tracer.summary(), file=sys.stderr)
+    if args.trace:
+        tracer.write(args.trace)
+    print(f"Refresh finished in {time.monotonic() - started_at:.1f}s", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,15 +1,36 @@
 from .scraper import CarisScraper
+from .async_scraper import AsyncCarisScraper
 from .scraper_with_ai import CarisScraperWithAI
+from .category_crawler import CategoryCrawler
 from .claude_parser import ClaudeImageParser
-from .types import ProductInput, ProductData, ProductDimensions, ScraperConfig, ScraperResult
+from .dimension_cache import DimensionCache
+from .downloader import ImageDownloader
+from .output import product_to_dict
+from .parser_service import FakeParserWorker, ParserService, PrewarmedClaudeWorker
+from .record_store import ProductRecord, ProductTable
+from .snapshot_diff import SnapshotDiff, SnapshotIndex
+from .types import CategoryProducts, ProductInput, ProductData, ProductDimensions, ScraperConfig, ScraperResult
 
 __all__ = [
     'CarisScraper',
+    'AsyncCarisScraper',
     'CarisScraperWithAI', 
+    'CategoryCrawler',
+    'CategoryProducts',
     'ClaudeImageParser',
+    'DimensionCache',
+    'FakeParserWorker',
+    'ImageDownloader',
+    'ParserService',
+    'PrewarmedClaudeWorker',
     'ProductInput',
     'ProductData',
     'ProductDimensions',
+    'ProductRecord',
+    'ProductTable',
     'ScraperConfig',
-    'ScraperResult'
+    'ScraperResult',
+    'SnapshotDiff',
+    'SnapshotIndex',
+    'product_to_dict'
 ]
\ No newline at end of file
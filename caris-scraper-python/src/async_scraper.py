@@ -0,0 +1,140 @@
+import asyncio
+from playwright.async_api import async_playwright, Browser
+from typing import AsyncIterator, List, Optional
+from .http_extractor import HttpProductExtractor
+from .rate_limiter import RequestScheduler, TransientError, TRANSIENT_STATUSES, parse_retry_after
+from .resources import ResourceFilter, PageStatsCollector, install_async
+from .scraper import PRODUCT_NAME_SCRIPT, IMAGES_SCRIPT, DIMENSIONS_IMAGE_SCRIPT
+from .types import ProductInput, ProductData, ScraperConfig, ScraperResult
+
+
+class AsyncCarisScraper:
+    def __init__(self, config: Optional[ScraperConfig] = None):
+        self.config = config or ScraperConfig()
+        self.browser: Optional[Browser] = None
+        self.playwright = None
+        self.resource_filter = ResourceFilter(self.config)
+        self.scheduler = RequestScheduler.from_config(self.config)
+        self.http_extractor = None
+        if self.config.engine == 'http':
+            self.http_extractor = HttpProductExtractor(self.config, self.scheduler)
+    
+    async def init(self):
+        self.playwright = await async_playwright().start()
+        self.browser = await self.playwright.chromium.launch(
+            headless=self.config.headless,
+            args=['--no-sandbox', '--disable-setuid-sandbox']
+        )
+    
+    async def close(self):
+        if self.browser:
+            await self.browser.close()
+        if self.playwright:
+            await self.playwright.stop()
+        if self.http_extractor:
+            self.http_extractor.close()
+    
+    async def __aenter__(self):
+        await self.init()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+    
+    async def scrape_products(self, product_inputs: List[ProductInput]) -> ScraperResult:
+        results = []
+        errors = []
+        
+        async for product_data in self.iter_products(product_inputs):
+            results.append(product_data)
+            if product_data.error:
+                errors.append(product_data.error)
+        
+        # Keep the input order, like CarisScraper.scrape_products
+        order = {product_input.product_id: index for index, product_input in enumerate(product_inputs)}
+        results.sort(key=lambda product: order[product.product_id])
+        
+        return ScraperResult(
+            success=len(errors) == 0,
+            data=results,
+            errors=errors
+        )
+    
+    async def iter_products(self, product_inputs: List[ProductInput]) -> AsyncIterator[ProductData]:
+        """Yield products in completion order with at most `config.concurrency` pages in flight."""
+        if not self.browser:
+            raise Exception("Browser not initialized. Call init() first.")
+        
+        semaphore = asyncio.Semaphore(max(1, self.config.concurrency))
+        tasks = [
+            asyncio.create_task(self._scrape_bounded(semaphore, product_input.product_id))
+            for product_input in product_inputs
+        ]
+        
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    async def _scrape_bounded(self, semaphore: asyncio.Semaphore, product_id: str) -> ProductData:
+        async with semaphore:
+            if self.http_extractor:
+                product_data = await asyncio.to_thread(self.http_extractor.extract_complete, product_id)
+                if product_data:
+                    return product_data
+            
+            try:
+                return await self._scrape_product(product_id)
+            except Exception as e:
+                error_message = f"Error scraping product {product_id}: {str(e)}"
+                return ProductData(
+                    product_id=product_id,
+                    url=self.config.base_url + product_id,
+                    product_name='',
+                    images=[],
+                    error=error_message
+                )
+    
+    async def _navigate(self, page, url: str):
+        response = await page.goto(url, wait_until=self.config.wait_until, timeout=self.config.timeout)
+        if response and response.status in TRANSIENT_STATUSES:
+            raise TransientError(
+                f"HTTP {response.status} for {url}",
+                status=response.status,
+                retry_after=parse_retry_after(response.headers.get('retry-after'))
+            )
+        
+        if self.config.wait_for_selector:
+            await page.wait_for_selector(
+                self.config.wait_for_selector, state='attached', timeout=self.config.timeout
+            )
+    
+    async def _scrape_product(self, product_id: str) -> ProductData:
+        if not self.browser:
+            raise Exception("Browser not initialized")
+        
+        page = await self.browser.new_page()
+        collector = PageStatsCollector()
+        await install_async(page, self.resource_filter, collector)
+        url = self.config.base_url + product_id
+        
+        try:
+            await self.scheduler.call_async(url, lambda: self._navigate(page, url))
+            
+            product_name = await page.evaluate(PRODUCT_NAME_SCRIPT)
+            images = await page.evaluate(IMAGES_SCRIPT)
+            dimensions_image = await page.evaluate(DIMENSIONS_IMAGE_SCRIPT)
+            
+            return ProductData(
+                product_id=product_id,
+                url=url,
+                product_name=product_name,
+                images=images,
+                dimensions_image=dimensions_image,
+                page_stats=collector.finish()
+            )
+            
+        finally:
+            await page.close()
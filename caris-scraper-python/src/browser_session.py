@@ -0,0 +1,282 @@
+import os
+import sys
+import threading
+from typing import Dict, List, Optional, Tuple
+from playwright.sync_api import sync_playwright, Browser, BrowserContext, Page
+from .resources import ResourceFilter, PageStatsCollector, install_sync
+from .tracing import Tracer
+from .types import ScraperConfig
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+# Browser memory is sampled every this many pages; walking the process tree isn't free
+RSS_CHECK_PAGES = 10
+
+# Serializes driver startup so each session can tell which new child process is its own
+_LAUNCH_LOCK = threading.Lock()
+
+
+def _child_pids(pid: int) -> List[int]:
+    if psutil is not None:
+        try:
+            return [child.pid for child in psutil.Process(pid).children()]
+        except psutil.Error:
+            return []
+    children = []
+    try:
+        entries = os.listdir('/proc')
+    except OSError:
+        return []
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat', 'rb') as f:
+                # The command name may contain spaces and parentheses; fields resume after the last ')'
+                fields = f.read().rsplit(b')', 1)[1].split()
+        except (OSError, IndexError):
+            continue
+        if int(fields[1]) == pid:
+            children.append(int(entry))
+    return children
+
+
+def _is_playwright_driver(pid: int) -> bool:
+    try:
+        if psutil is not None:
+            return any('playwright' in part for part in psutil.Process(pid).cmdline())
+        with open(f'/proc/{pid}/cmdline', 'rb') as f:
+            return b'playwright' in f.read()
+    except Exception:
+        return False
+
+
+def process_tree_rss(pid: int) -> Optional[int]:
+    """Resident bytes of pid and all its descendants, or None where that can't be measured."""
+    if psutil is not None:
+        try:
+            root = psutil.Process(pid)
+            processes = [root] + root.children(recursive=True)
+        except psutil.Error:
+            return None
+        total = 0
+        for process in processes:
+            try:
+                total += process.memory_info().rss
+            except psutil.Error:
+                continue
+        return total
+
+    if not os.path.exists(f'/proc/{pid}/statm'):
+        return None
+    page_size = os.sysconf('SC_PAGE_SIZE')
+    total = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        try:
+            with open(f'/proc/{current}/statm', 'rb') as f:
+                total += int(f.read().split()[1]) * page_size
+        except (OSError, IndexError, ValueError):
+            continue
+        pending.extend(_child_pids(current))
+    return total
+
+
+class _Slot:
+    """An isolated browser context with the one page products are loaded into."""
+
+    def __init__(self, context: BrowserContext):
+        self.context = context
+        self.page: Optional[Page] = None
+        self.collector: Optional[PageStatsCollector] = None
+        self.pages = 0
+        self.crashed = False
+
+
+class BrowserSession:
+    """One worker thread's Chromium, with its pages kept in an isolated context that is thrown
+    away after context_max_pages products or when the browser's processes grow past
+    browser_max_rss_mb. The next context is opened ahead of time so a swap doesn't wait on it.
+    A browser that crashes or disconnects is relaunched on the next page() call, at most
+    browser_max_relaunches times. Sync Playwright is bound to the thread that started it, so a
+    session must only be used from that thread."""
+
+    def __init__(self, config: ScraperConfig, resource_filter: ResourceFilter, tracer: Optional[Tracer] = None):
+        self.config = config
+        self.resource_filter = resource_filter
+        self.tracer = tracer or Tracer(enabled=False)
+        self.playwright = None
+        self.browser: Optional[Browser] = None
+        self.driver_pid: Optional[int] = None
+        self.active: Optional[_Slot] = None
+        self.spare: Optional[_Slot] = None
+        self.pages_since_check = 0
+        self.over_limit = False
+        self.stats: Dict[str, int] = {'pages': 0, 'contexts': 0, 'recycled': 0, 'restarted': 0, 'relaunched': 0}
+
+    def start(self) -> 'BrowserSession':
+        if self.browser is None:
+            self._launch()
+        return self
+
+    def page(self) -> Tuple[Page, PageStatsCollector]:
+        """The page to load the next product into, relaunching the browser first if it died."""
+        if self.browser is None:
+            self._launch()
+        elif not self.browser.is_connected():
+            self.relaunch()
+
+        if self.active is None:
+            self.active = self.spare or self._new_slot()
+            self.spare = None
+        if self.active.page is None:
+            self.active.page, self.active.collector = self._new_page(self.active)
+        return self.active.page, self.active.collector
+
+    def crashed(self) -> bool:
+        """Whether the browser or the current page died, as opposed to a navigation failing."""
+        if self.browser is None or not self.browser.is_connected():
+            return True
+        return bool(self.active and self.active.crashed)
+
+    def page_done(self):
+        """Count a finished product and recycle the context or browser when a cap is reached."""
+        self.stats['pages'] += 1
+        self.active.pages += 1
+        self.pages_since_check += 1
+
+        if self.config.browser_max_rss_mb and self.pages_since_check >= RSS_CHECK_PAGES:
+            self.pages_since_check = 0
+            if self._check_memory():
+                return
+        if self.config.context_max_pages and self.active.pages >= self.config.context_max_pages:
+            self.recycle()
+
+    def discard_page(self):
+        """Drop a page a failed product may have left unusable; a crashed browser is relaunched later."""
+        if self.active is None or self.active.page is None:
+            return
+        if self.browser is not None and self.browser.is_connected():
+            if self.active.crashed:
+                # A crashed renderer can take the context's other state with it
+                _close_quietly(self.active.context)
+                self.active = None
+                return
+            _close_quietly(self.active.page)
+        self.active.page = None
+
+    def recycle(self):
+        """Replace the current context with the pre-warmed one and open the next spare."""
+        with self.tracer.span('context_recycle'):
+            old, self.active = self.active, self.spare
+            self.spare = None
+            if old is not None:
+                _close_quietly(old.context)
+                self.stats['recycled'] += 1
+            if self.config.prewarm_contexts:
+                self.spare = self._new_slot()
+
+    def relaunch(self):
+        """Start a fresh browser after a crash; gives up once browser_max_relaunches is used up."""
+        if self.stats['relaunched'] >= self.config.browser_max_relaunches:
+            raise Exception(f"Browser crashed {self.stats['relaunched'] + 1} times, not relaunching again")
+        self.stats['relaunched'] += 1
+        print(f"Browser disconnected, relaunching ({self.stats['relaunched']} of "
+              f"{self.config.browser_max_relaunches})", file=sys.stderr)
+        self._shutdown()
+        self._launch()
+
+    def restart(self):
+        """Planned browser restart, e.g. when recycling contexts no longer brings memory down."""
+        self.stats['restarted'] += 1
+        self._shutdown()
+        self._launch()
+
+    def memory_mb(self) -> Optional[float]:
+        if self.driver_pid is None:
+            return None
+        rss = process_tree_rss(self.driver_pid)
+        return rss / (1024 * 1024) if rss is not None else None
+
+    def close(self):
+        self._shutdown()
+
+    def _check_memory(self) -> bool:
+        memory = self.memory_mb()
+        if memory is None or memory <= self.config.browser_max_rss_mb:
+            self.over_limit = False
+            return False
+
+        if self.over_limit:
+            # Still above the cap right after a fresh context: the browser itself holds the memory
+            print(f"Browser using {memory:.0f} MB after a context recycle, restarting it", file=sys.stderr)
+            self.restart()
+            self.over_limit = False
+        else:
+            print(f"Browser using {memory:.0f} MB (cap {self.config.browser_max_rss_mb} MB), recycling its context", file=sys.stderr)
+            self.recycle()
+            self.over_limit = True
+        return True
+
+    def _launch(self):
+        with self.tracer.span('browser_launch'):
+            with _LAUNCH_LOCK:
+                before = set(_child_pids(os.getpid()))
+                self.playwright = sync_playwright().start()
+                drivers = [pid for pid in _child_pids(os.getpid())
+                           if pid not in before and _is_playwright_driver(pid)]
+            # Chromium runs under this session's driver process, so its tree is the browser's memory
+            self.driver_pid = drivers[0] if len(drivers) == 1 else None
+            self.browser = self.playwright.chromium.launch(
+                headless=self.config.headless,
+                args=['--no-sandbox', '--disable-setuid-sandbox']
+            )
+            self.active = self._new_slot()
+            if self.config.prewarm_contexts:
+                self.spare = self._new_slot()
+        self.pages_since_check = 0
+        self.over_limit = False
+
+    def _new_slot(self) -> _Slot:
+        slot = _Slot(self.browser.new_context())
+        slot.page, slot.collector = self._new_page(slot)
+        self.stats['contexts'] += 1
+        return slot
+
+    def _new_page(self, slot: _Slot) -> Tuple[Page, PageStatsCollector]:
+        page = slot.context.new_page()
+        collector = PageStatsCollector()
+        install_sync(page, self.resource_filter, collector)
+
+        def on_crash(_page):
+            slot.crashed = True
+        page.on('crash', on_crash)
+        return page, collector
+
+    def _shutdown(self):
+        for slot in (self.active, self.spare):
+            if slot is not None and self.browser is not None and self.browser.is_connected():
+                _close_quietly(slot.context)
+        self.active = self.spare = None
+        if self.browser is not None:
+            _close_quietly(self.browser)
+        if self.playwright is not None:
+            try:
+                self.playwright.stop()
+            except Exception as e:
+                print(f"Failed to stop Playwright: {e}", file=sys.stderr)
+        self.browser = self.playwright = None
+        self.driver_pid = None
+
+
+def _close_quietly(target):
+    # Closing after a crash raises "Target closed"; the resources are gone either way
+    try:
+        target.close()
+    except Exception:
+        pass
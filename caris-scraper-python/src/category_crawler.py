@@ -0,0 +1,213 @@
+import re
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urljoin, urlparse
+from requests.adapters import HTTPAdapter
+from .http_extractor import USER_AGENT, VOID_ELEMENTS
+from .rate_limiter import RequestScheduler, TransientError, TRANSIENT_STATUSES, parse_retry_after
+from .types import CategoryProducts, ScraperConfig
+
+
+# OpenCart's "Showing 1 to 20 of 592 (30 Pages)" line
+RESULTS_PAGES_PATTERN = re.compile(r'\bof\s+\d+\s*\((\d+)\s+\w+\)', re.IGNORECASE)
+
+CONSOLIDATED_DESCRIPTION = "Consolidated product-to-categories mapping from Caris scraper"
+
+
+class CategoryPageParser(HTMLParser):
+    """Category name, product IDs and the page count advertised by the pagination markup."""
+
+    def __init__(self, page_url: str):
+        super().__init__(convert_charrefs=True)
+        self.page_url = page_url
+        self.category_name: Optional[str] = None
+        self.product_ids: List[int] = []
+        self.page_count = 0
+        self._title_depth = 0
+        self._title_text: List[str] = []
+        self._text: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        attributes = dict(attrs)
+        classes = (attributes.get('class') or '').split()
+
+        if tag == 'h1' and self.category_name is None and 'page-title' in classes:
+            self._title_depth += 1
+        elif self._title_depth and tag not in VOID_ELEMENTS:
+            self._title_depth += 1
+
+        if tag != 'a' or not attributes.get('href'):
+            return
+
+        query = parse_qs(urlparse(urljoin(self.page_url, attributes['href'])).query)
+        product_id = query.get('product_id', [''])[0]
+        if product_id.isdigit() and int(product_id) not in self.product_ids:
+            self.product_ids.append(int(product_id))
+
+        # Pagination links, including the "last page" one
+        page = query.get('page', [''])[0]
+        if query.get('route', [''])[0] == 'product/category' and page.isdigit():
+            self.page_count = max(self.page_count, int(page))
+
+    def handle_endtag(self, tag):
+        if not self._title_depth:
+            return
+
+        self._title_depth -= 1
+        if self._title_depth == 0:
+            self.category_name = ''.join(self._title_text).strip()
+
+    def handle_data(self, data):
+        if self._title_depth:
+            self._title_text.append(data)
+        self._text.append(data)
+
+    def close(self):
+        super().close()
+        match = RESULTS_PAGES_PATTERN.search(' '.join(self._text))
+        if match:
+            self.page_count = max(self.page_count, int(match.group(1)))
+
+
+class CategoryCrawler:
+    """Collects product IDs per category over plain HTTP; every page after the first is
+    fetched concurrently once the first page has given away the page count."""
+
+    def __init__(self, config: Optional[ScraperConfig] = None, scheduler: Optional[RequestScheduler] = None):
+        self.config = config or ScraperConfig()
+        self.scheduler = scheduler or RequestScheduler.from_config(self.config)
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': USER_AGENT,
+            'Accept-Language': 'en-US,en;q=0.9'
+        })
+
+        pool_size = max(self.config.concurrency, 1)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def close(self):
+        self.session.close()
+
+    def category_url(self, category: str) -> str:
+        """Accept a full category URL or just its path, e.g. '38' or '38_41'."""
+        if category.startswith('http://') or category.startswith('https://'):
+            return category
+        return self.config.category_url + category
+
+    def crawl(self, categories: List[str]) -> List[CategoryProducts]:
+        urls = [self.category_url(category) for category in categories]
+
+        with ThreadPoolExecutor(max_workers=max(1, self.config.concurrency)) as executor:
+            first_pages = list(executor.map(self._fetch_first_page, urls))
+
+            # Second round: every remaining page of every category at once
+            remaining = {}
+            for url, (result, parser) in zip(urls, first_pages):
+                if result.error or parser is None:
+                    continue
+                for page in range(2, result.pages + 1):
+                    remaining[(url, page)] = executor.submit(self._fetch_page, url, page)
+
+            for (url, page), future in remaining.items():
+                result, _ = first_pages[urls.index(url)]
+                try:
+                    page_ids = future.result().product_ids
+                except Exception as e:
+                    result.error = f"Error fetching page {page} of {url}: {str(e)}"
+                    continue
+                result.product_ids.extend(page_ids)
+
+        results = []
+        for url, (result, parser) in zip(urls, first_pages):
+            # No pagination markup at all: walk pages until one comes back empty
+            if parser is not None and not result.error and parser.page_count == 0 and parser.product_ids:
+                self._walk_remaining(url, result)
+            result.product_ids = sorted(set(result.product_ids))
+            results.append(result)
+        return results
+
+    def _fetch_first_page(self, url: str) -> Tuple[CategoryProducts, Optional[CategoryPageParser]]:
+        try:
+            parser = self._fetch_page(url, 1)
+        except Exception as e:
+            return CategoryProducts('', url, [], error=f"Error fetching {url}: {str(e)}"), None
+
+        if not parser.category_name:
+            return CategoryProducts('', url, [], error=f"Could not extract category name from {url}"), None
+
+        return CategoryProducts(parser.category_name, url, list(parser.product_ids), max(1, parser.page_count)), parser
+
+    def _walk_remaining(self, url: str, result: CategoryProducts):
+        seen = set(result.product_ids)
+        page = 1
+        while True:
+            page += 1
+            try:
+                page_ids = self._fetch_page(url, page).product_ids
+            except Exception as e:
+                result.error = f"Error fetching page {page} of {url}: {str(e)}"
+                return
+            new_ids = [product_id for product_id in page_ids if product_id not in seen]
+            if not new_ids:
+                return
+            seen.update(new_ids)
+            result.product_ids.extend(new_ids)
+            result.pages = page
+
+    def _fetch_page(self, url: str, page: int) -> CategoryPageParser:
+        page_url = f"{url}&limit={self.config.category_page_limit}"
+        if page > 1:
+            page_url += f"&page={page}"
+
+        response = self.scheduler.call(page_url, lambda: self._get(page_url))
+        parser = CategoryPageParser(response.url)
+        parser.feed(response.text)
+        parser.close()
+        return parser
+
+    def _get(self, url: str) -> requests.Response:
+        response = self.session.get(url, timeout=self.config.timeout / 1000)
+        if response.status_code in TRANSIENT_STATUSES:
+            raise TransientError(
+                f"HTTP {response.status_code} for {url}",
+                status=response.status_code,
+                retry_after=parse_retry_after(response.headers.get('Retry-After'))
+            )
+        response.raise_for_status()
+        return response
+
+
+def consolidate(categories: List[CategoryProducts]) -> Dict:
+    """Build the consolidated-products.json structure written by categories/consolidate-products.js."""
+    product_categories: Dict[int, set] = {}
+    category_counts: Dict[str, int] = {}
+
+    for category in sorted(categories, key=lambda c: c.category_name):
+        if not category.category_name:
+            continue
+        category_counts[category.category_name] = len(category.product_ids)
+        for product_id in category.product_ids:
+            product_categories.setdefault(product_id, set()).add(category.category_name)
+
+    products = {
+        str(product_id): sorted(names)
+        for product_id, names in sorted(product_categories.items())
+    }
+
+    return {
+        'products': products,
+        'statistics': {
+            'total_products': len(products),
+            'total_categories': len(category_counts),
+            'category_product_counts': category_counts,
+            'products_in_multiple_categories': len([names for names in products.values() if len(names) > 1]),
+            'max_categories_per_product': max((len(names) for names in products.values()), default=0)
+        },
+        'generated_at': datetime.now(timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z'),
+        'description': CONSOLIDATED_DESCRIPTION
+    }
@@ -1,56 +1,224 @@
+import math
 import subprocess
+import sys
 import json
-import time
-import requests
+from dataclasses import dataclass
 from pathlib import Path
-from .types import ProductDimensions
+from typing import Dict, List, Optional
+from .dimension_cache import DimensionCache
+from .downloader import ImageDownloader
+from .ocr_parser import OcrDimensionExtractor
+from .parser_service import ParserService, ParseTimeout
+from .record_store import to_number
+from .tracing import Tracer
+from .types import DEFAULT_STORAGE_DIR, ProductDimensions
+
+
+def _number(value) -> Optional[float]:
+    number = to_number(value)
+    return None if math.isnan(number) else number
+
+
+@dataclass
+class DownloadedImage:
+    image_url: str
+    content_hash: str
+    path: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    # Set when the cache already holds a parse for this image
+    dimensions: Optional[ProductDimensions] = None
 
 
 class ClaudeImageParser:
-    def __init__(self):
-        self.storage_dir = Path(__file__).parent.parent / "storage"
-        self.storage_dir.mkdir(exist_ok=True)
+    def __init__(self, cache: Optional[DimensionCache] = None,
+                 local_extractor: Optional[OcrDimensionExtractor] = None,
+                 local_min_confidence: float = 0.8,
+                 downloader: Optional[ImageDownloader] = None,
+                 tracer: Optional[Tracer] = None,
+                 service: Optional[ParserService] = None,
+                 timeout: float = 60.0,
+                 storage_dir: Optional[Path] = None):
+        self.tracer = tracer or Tracer(enabled=False)
+        # Without a service each prompt starts its own claude process
+        self.service = service
+        self.timeout = timeout
+        self.storage_dir = Path(storage_dir) if storage_dir else DEFAULT_STORAGE_DIR
+        self.downloader = downloader or ImageDownloader(self.storage_dir / "dimensions")
+        self.cache = cache
+        self.local_extractor = local_extractor
+        self.local_min_confidence = local_min_confidence
+    
+    def close(self):
+        if self.service:
+            self.service.close()
+        self.downloader.close()
     
     def parse_dimensions_image(self, image_url: str) -> ProductDimensions:
         try:
-            image_path = self._download_image(image_url)
-            response = self._call_claude_cli(image_path)
-            
-            try:
-                parsed_data = json.loads(response.strip())
-                return ProductDimensions(
-                    width=parsed_data.get("width_cm"),
-                    height=parsed_data.get("height_cm"),
-                    floor_to_chair_height_cm=parsed_data.get("floor_to_chair_height_cm"),
-                    depth=parsed_data.get("depth_cm"),
-                    qty_per_box=parsed_data.get("qty_per_box"),
-                    weight=parsed_data.get("weight_kg"),
-                    box_width=parsed_data.get("box_width_cm"),
-                    box_height=parsed_data.get("box_height_cm"),
-                    box_depth=parsed_data.get("box_depth_cm"),
-                    raw_text=response.strip()
-                )
-            except json.JSONDecodeError:
-                return ProductDimensions(raw_text=response.strip())
-                
+            return self.parse_downloaded(self.download(image_url))
         except Exception as e:
             return ProductDimensions(raw_text=f"Error parsing image: {str(e)}")
     
-    def _download_image(self, image_url: str) -> str:
-        filename = f"dimensions-{int(time.time() * 1000)}.png"
-        filepath = self.storage_dir / filename
+    def download(self, image_url: str) -> DownloadedImage:
+        with self.tracer.span('image_download') as span:
+            result = self.downloader.fetch(image_url)
+            span['bytes'] = result.bytes_downloaded
+            span['notModified'] = result.not_modified
         
-        try:
-            response = requests.get(image_url, timeout=10)
-            response.raise_for_status()
+        if self.cache:
+            cached = self.cache.get_by_url(image_url)
+            if cached and cached.content_hash == result.content_hash:
+                self.cache.touch(image_url)
+                return DownloadedImage(image_url, result.content_hash, result.path,
+                                       result.etag, result.last_modified, cached.dimensions)
             
-            with open(filepath, 'wb') as f:
-                f.write(response.content)
+            # Same image already parsed under another URL
+            hit = self.cache.get_by_hash(result.content_hash)
+            if hit:
+                self.cache.put(image_url, result.content_hash, hit.dimensions, result.etag, result.last_modified)
+                return DownloadedImage(image_url, result.content_hash, result.path,
+                                       result.etag, result.last_modified, hit.dimensions)
+        
+        return DownloadedImage(image_url, result.content_hash, result.path, result.etag, result.last_modified)
+    
+    def parse_downloaded(self, image: DownloadedImage) -> ProductDimensions:
+        if image.dimensions:
+            return image.dimensions
+        
+        dimensions = self._try_local(image)
+        if dimensions:
+            return dimensions
+        
+        response = self._call_claude_cli(image.path)
+        dimensions = self._dimensions_from_response(response)
+        if dimensions is None:
+            return ProductDimensions(raw_text=response.strip())
+        
+        # Only successful parses are cached so failures get retried next run
+        if self.cache:
+            self.cache.put(image.image_url, image.content_hash, dimensions, image.etag, image.last_modified)
+        
+        return dimensions
+    
+    def parse_batch(self, images: List[DownloadedImage], retries: int = 1) -> List[ProductDimensions]:
+        """Parse several downloaded images with one Claude invocation, in input order."""
+        results: Dict[int, ProductDimensions] = {}
+        pending = []
+        for index, image in enumerate(images):
+            dimensions = image.dimensions or self._try_local(image)
+            if dimensions:
+                results[index] = dimensions
+            else:
+                pending.append(index)
+        
+        attempt = 0
+        last_error = "missing from batch response"
+        while pending and attempt <= retries:
+            attempt += 1
+            batch = [images[index] for index in pending]
+            
+            if len(batch) == 1:
+                try:
+                    results[pending[0]] = self.parse_downloaded(batch[0])
+                except Exception as e:
+                    results[pending[0]] = ProductDimensions(raw_text=f"Error parsing image: {str(e)}")
+                pending = []
+                break
             
-            return str(filepath)
+            try:
+                parsed_by_path = self._parse_batch_response(self._call_claude_cli_batch(batch))
+            except Exception as e:
+                last_error = str(e)
+                continue
             
+            # Only images without a valid entry go into the next attempt
+            still_pending = []
+            for index in pending:
+                image = images[index]
+                parsed_data = parsed_by_path.get(image.path)
+                if parsed_data is None:
+                    still_pending.append(index)
+                    continue
+                
+                dimensions = self._dimensions_from_dict(parsed_data, json.dumps(parsed_data))
+                if self.cache:
+                    self.cache.put(image.image_url, image.content_hash, dimensions, image.etag, image.last_modified)
+                results[index] = dimensions
+            pending = still_pending
+        
+        for index in pending:
+            results[index] = ProductDimensions(raw_text=f"Error parsing image: {last_error}")
+        
+        return [results[index] for index in range(len(images))]
+    
+    def _try_local(self, image: DownloadedImage) -> Optional[ProductDimensions]:
+        """Offline OCR tier; only confident results skip the Claude call."""
+        if not self.local_extractor or not image.path:
+            return None
+        
+        try:
+            with self.tracer.span('ocr') as span:
+                result = self.local_extractor.extract(image.path)
+                span['confidence'] = result.confidence
         except Exception as e:
-            raise Exception(f"Failed to download image: {str(e)}")
+            print(f"OCR extraction failed for {image.image_url}: {e}", file=sys.stderr)
+            return None
+        
+        if not result.dimensions or result.confidence < self.local_min_confidence:
+            return None
+        
+        if self.cache:
+            self.cache.put(image.image_url, image.content_hash, result.dimensions, image.etag, image.last_modified)
+        return result.dimensions
+    
+    def _parse_batch_response(self, response: str) -> Dict[str, dict]:
+        text = response.strip()
+        # Tolerate a fenced code block even though the prompt forbids it
+        if text.startswith('```'):
+            text = text.strip('`')
+            text = text[text.index('\n') + 1:] if '\n' in text else text
+        
+        try:
+            parsed = json.loads(text)
+        except json.JSONDecodeError:
+            raise Exception("batch response is not valid JSON")
+        
+        if not isinstance(parsed, list):
+            raise Exception("batch response is not a JSON array")
+        
+        return {
+            item['image_path']: item
+            for item in parsed
+            if isinstance(item, dict) and isinstance(item.get('image_path'), str)
+        }
+    
+    def _dimensions_from_response(self, response: str) -> Optional[ProductDimensions]:
+        try:
+            parsed_data = json.loads(response.strip())
+        except json.JSONDecodeError:
+            return None
+        
+        if not isinstance(parsed_data, dict):
+            return None
+        
+        return self._dimensions_from_dict(parsed_data, response.strip())
+    
+    def _dimensions_from_dict(self, parsed_data: dict, raw_text: str) -> ProductDimensions:
+        # Answers sometimes carry numbers as strings ("55", "6.5 kg")
+        qty_per_box = _number(parsed_data.get("qty_per_box"))
+        return ProductDimensions(
+            width=_number(parsed_data.get("width_cm")),
+            height=_number(parsed_data.get("height_cm")),
+            floor_to_chair_height_cm=_number(parsed_data.get("floor_to_chair_height_cm")),
+            depth=_number(parsed_data.get("depth_cm")),
+            qty_per_box=int(qty_per_box) if qty_per_box is not None else None,
+            weight=_number(parsed_data.get("weight_kg")),
+            box_width=_number(parsed_data.get("box_width_cm")),
+            box_height=_number(parsed_data.get("box_height_cm")),
+            box_depth=_number(parsed_data.get("box_depth_cm")),
+            raw_text=raw_text
+        )
     
     def _call_claude_cli(self, image_path: str) -> str:
         prompt = f"""
@@ -65,6 +233,39 @@ Example Response:
 FORBIDDEN TO RETURN ANYTHING OTHER THAN A JSON OBJECT. NO MARKDOWN, NO TEXT, NO EXPLANATIONS.
 """
         
+        with self.tracer.span('claude', images=1):
+            return self._run_claude(prompt, timeout=self.timeout)
+    
+    def _call_claude_cli_batch(self, images: List[DownloadedImage]) -> str:
+        image_paths = "\n".join(f"- {image.path}" for image in images)
+        prompt = f"""
+Analyze each of these furniture dimensions images and extract width, height, depth, weight, and box
+dimensions, including quantity per box.
+
+Image paths:
+{image_paths}
+
+Return one JSON object per image, with its exact path in "image_path".
+
+Example Response:
+[{{"image_path": "/path/to/dimensions-1.png", "width_cm": 65,"height_cm": 80,"floor_to_chair_height_cm": 40,"depth_cm": 60,"weight_kg": 10.5,"box_width_cm": 55, "box_height_cm": 84, "box_depth_cm": 64, "qty_per_box": 1}}]
+
+FORBIDDEN TO RETURN ANYTHING OTHER THAN A JSON ARRAY. NO MARKDOWN, NO TEXT, NO EXPLANATIONS.
+"""
+        
+        # Each extra image adds a Read call and its share of the answer
+        with self.tracer.span('claude', images=len(images)):
+            return self._run_claude(prompt, timeout=self.timeout + 10 * len(images))
+    
+    def _run_claude(self, prompt: str, timeout: float) -> str:
+        if self.service:
+            try:
+                return self.service.run(prompt, timeout)
+            except ParseTimeout:
+                raise Exception("Claude CLI timed out")
+            except Exception as e:
+                raise Exception(f"Error calling Claude CLI: {str(e)}")
+        
         try:
             cmd = ['claude', '--allowedTools', 'Read', '-p', prompt]
             
@@ -72,16 +273,16 @@ FORBIDDEN TO RETURN ANYTHING OTHER THAN A JSON OBJECT. NO MARKDOWN, NO TEXT, NO
                 cmd,
                 capture_output=True,
                 text=True,
-                timeout=15,
+                timeout=timeout,
                 check=False
             )
             
             if result.stderr:
-                print(f"Claude CLI stderr: {result.stderr}")
+                print(f"Claude CLI stderr: {result.stderr}", file=sys.stderr)
             
             return result.stdout.strip() or 'No response received'
             
         except subprocess.TimeoutExpired:
             raise Exception("Claude CLI timed out")
         except Exception as e:
-            raise Exception(f"Error calling Claude CLI: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Error calling Claude CLI: {str(e)}")
@@ -0,0 +1,114 @@
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Optional
+from .types import ProductDimensions
+
+
+@dataclass
+class CachedDimensions:
+    image_url: str
+    content_hash: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    dimensions: ProductDimensions
+
+
+class DimensionCache:
+    """Parsed dimension images keyed by URL and image content hash, evicted least recently used."""
+
+    def __init__(self, path: Path, max_entries: int = 5000):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS dimensions (
+                image_url TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                dimensions TEXT NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_dimensions_hash ON dimensions (content_hash)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_dimensions_used ON dimensions (last_used)")
+        self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def get_by_url(self, image_url: str) -> Optional[CachedDimensions]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT image_url, content_hash, etag, last_modified, dimensions FROM dimensions WHERE image_url = ?",
+                (image_url,)
+            ).fetchone()
+        return self._to_entry(row)
+
+    def get_by_hash(self, content_hash: str) -> Optional[CachedDimensions]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT image_url, content_hash, etag, last_modified, dimensions FROM dimensions "
+                "WHERE content_hash = ? ORDER BY last_used DESC LIMIT 1",
+                (content_hash,)
+            ).fetchone()
+        return self._to_entry(row)
+
+    def put(self, image_url: str, content_hash: str, dimensions: ProductDimensions,
+            etag: Optional[str] = None, last_modified: Optional[str] = None):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO dimensions "
+                "(image_url, content_hash, etag, last_modified, dimensions, last_used) VALUES (?, ?, ?, ?, ?, ?)",
+                (image_url, content_hash, etag, last_modified, json.dumps(asdict(dimensions)), time.time())
+            )
+            self._evict()
+            self._conn.commit()
+
+    def touch(self, image_url: str):
+        with self._lock:
+            self._conn.execute("UPDATE dimensions SET last_used = ? WHERE image_url = ?", (time.time(), image_url))
+            self._conn.commit()
+
+    def invalidate(self, image_url: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM dimensions WHERE image_url = ?", (image_url,))
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM dimensions")
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM dimensions").fetchone()[0]
+
+    def _evict(self):
+        count = self._conn.execute("SELECT COUNT(*) FROM dimensions").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM dimensions WHERE image_url IN "
+                "(SELECT image_url FROM dimensions ORDER BY last_used ASC LIMIT ?)",
+                (overflow,)
+            )
+
+    def _to_entry(self, row) -> Optional[CachedDimensions]:
+        if not row:
+            return None
+        image_url, content_hash, etag, last_modified, dimensions = row
+        return CachedDimensions(
+            image_url=image_url,
+            content_hash=content_hash,
+            etag=etag,
+            last_modified=last_modified,
+            dimensions=ProductDimensions(**json.loads(dimensions))
+        )
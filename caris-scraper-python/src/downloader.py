@@ -0,0 +1,215 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
+from .rate_limiter import RequestScheduler, TransientError, TRANSIENT_STATUSES, is_transient, parse_retry_after
+
+
+CONTENT_TYPE_EXTENSIONS = {
+    'image/png': '.png',
+    'image/jpeg': '.jpg',
+    'image/webp': '.webp',
+    'image/gif': '.gif',
+}
+
+CHUNK_SIZE = 64 * 1024
+
+
+@dataclass
+class DownloadResult:
+    url: str
+    path: str
+    content_hash: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    # True when the server answered 304 and the stored file was reused
+    not_modified: bool = False
+    bytes_downloaded: int = 0
+    error: Optional[str] = None
+
+
+class ImageDownloader:
+    """Pooled, streaming image downloads stored by content hash, revalidated with conditional GETs."""
+
+    def __init__(self, storage_dir: Path, workers: int = 8, timeout: float = 10,
+                 scheduler: Optional[RequestScheduler] = None):
+        self.storage_dir = Path(storage_dir)
+        self.scheduler = scheduler
+        self.storage_dir.mkdir(parents=True, exist_ok=True)
+        self.workers = max(1, workers)
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.workers, pool_maxsize=self.workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.storage_dir / "index.sqlite"), check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS downloads (
+                url TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                path TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                last_used REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+    def close(self):
+        self.session.close()
+        with self._lock:
+            self._conn.close()
+
+    def fetch(self, url: str) -> DownloadResult:
+        if self.scheduler:
+            return self.scheduler.call(url, lambda: self._fetch(url))
+        return self._fetch(url)
+
+    def _fetch(self, url: str) -> DownloadResult:
+        known = self._lookup(url)
+        headers = {}
+        if known and Path(known['path']).exists():
+            if known['etag']:
+                headers['If-None-Match'] = known['etag']
+            if known['last_modified']:
+                headers['If-Modified-Since'] = known['last_modified']
+        else:
+            known = None
+
+        try:
+            with self.session.get(url, headers=headers, timeout=self.timeout, stream=True) as response:
+                if response.status_code == 304 and known:
+                    self._remember(url, known['content_hash'], known['path'], known['etag'], known['last_modified'])
+                    return DownloadResult(
+                        url, known['path'], known['content_hash'],
+                        known['etag'], known['last_modified'], not_modified=True
+                    )
+
+                if response.status_code in TRANSIENT_STATUSES:
+                    raise TransientError(
+                        f"HTTP {response.status_code} for {url}",
+                        status=response.status_code,
+                        retry_after=parse_retry_after(response.headers.get('Retry-After'))
+                    )
+
+                response.raise_for_status()
+                path, content_hash, size = self._stream_to_store(url, response)
+                etag = response.headers.get('ETag')
+                last_modified = response.headers.get('Last-Modified')
+
+        except TransientError:
+            raise
+        except Exception as e:
+            if is_transient(e):
+                raise TransientError(f"Failed to download image: {str(e)}")
+            raise Exception(f"Failed to download image: {str(e)}")
+
+        self._remember(url, content_hash, path, etag, last_modified)
+        return DownloadResult(url, path, content_hash, etag, last_modified, bytes_downloaded=size)
+
+    def fetch_many(
+        self,
+        urls: List[str],
+        on_result: Optional[Callable[[DownloadResult], None]] = None
+    ) -> Dict[str, DownloadResult]:
+        unique_urls = list(dict.fromkeys(url for url in urls if url))
+        results: Dict[str, DownloadResult] = {}
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {executor.submit(self.fetch, url): url for url in unique_urls}
+
+            for future in as_completed(futures):
+                url = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = DownloadResult(url, '', '', error=str(e))
+                results[url] = result
+                if on_result:
+                    on_result(result)
+
+        return results
+
+    def prune(self, max_age_days: float) -> int:
+        """Forget URLs not fetched within max_age_days and delete files nothing refers to anymore."""
+        cutoff = time.time() - max_age_days * 86400
+
+        with self._lock:
+            self._conn.execute("DELETE FROM downloads WHERE last_used < ?", (cutoff,))
+            self._conn.commit()
+            referenced = {row[0] for row in self._conn.execute("SELECT path FROM downloads")}
+
+        removed = 0
+        for path in self.storage_dir.iterdir():
+            if path.name.startswith('index.sqlite') or str(path) in referenced:
+                continue
+            if path.is_file():
+                path.unlink()
+                removed += 1
+        return removed
+
+    def _stream_to_store(self, url: str, response: requests.Response):
+        digest = hashlib.sha256()
+        size = 0
+        temp_path = self.storage_dir / f".download-{uuid.uuid4().hex}"
+
+        try:
+            with open(temp_path, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    if not chunk:
+                        continue
+                    digest.update(chunk)
+                    size += len(chunk)
+                    f.write(chunk)
+
+            content_hash = digest.hexdigest()
+            path = self.storage_dir / (content_hash + self._extension(url, response))
+
+            # Identical images from different URLs share one file
+            if path.exists():
+                temp_path.unlink()
+            else:
+                os.replace(temp_path, path)
+
+            return str(path), content_hash, size
+        finally:
+            if temp_path.exists():
+                temp_path.unlink()
+
+    def _extension(self, url: str, response: requests.Response) -> str:
+        content_type = (response.headers.get('Content-Type') or '').split(';')[0].strip()
+        if content_type in CONTENT_TYPE_EXTENSIONS:
+            return CONTENT_TYPE_EXTENSIONS[content_type]
+        suffix = Path(urlparse(url).path).suffix.lower()
+        return suffix if suffix in CONTENT_TYPE_EXTENSIONS.values() or suffix == '.jpeg' else '.img'
+
+    def _lookup(self, url: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content_hash, path, etag, last_modified FROM downloads WHERE url = ?", (url,)
+            ).fetchone()
+        if not row:
+            return None
+        return {'content_hash': row[0], 'path': row[1], 'etag': row[2], 'last_modified': row[3]}
+
+    def _remember(self, url: str, content_hash: str, path: str,
+                  etag: Optional[str], last_modified: Optional[str]):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO downloads (url, content_hash, path, etag, last_modified, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (url, content_hash, path, etag, last_modified, time.time())
+            )
+            self._conn.commit()
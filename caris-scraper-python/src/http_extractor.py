@@ -0,0 +1,132 @@
+import time
+import requests
+from html.parser import HTMLParser
+from typing import List, Optional
+from urllib.parse import urljoin
+from requests.adapters import HTTPAdapter
+from .rate_limiter import RequestScheduler, TransientError, TRANSIENT_STATUSES, parse_retry_after
+from .types import PageStats, ProductData, ScraperConfig
+
+
+VOID_ELEMENTS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'source', 'track', 'wbr'}
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+
+class ProductPageParser(HTMLParser):
+    """Collects the same fields as the in-browser extraction scripts in scraper.py."""
+
+    def __init__(self, page_url: str):
+        super().__init__(convert_charrefs=True)
+        self.page_url = page_url
+        self.product_name: Optional[str] = None
+        self.images: List[str] = []
+        self.dimensions_image: Optional[str] = None
+        self._h1_depth = 0
+        self._h1_text: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'h1' and self.product_name is None:
+            self._h1_depth += 1
+        elif self._h1_depth and tag not in VOID_ELEMENTS:
+            self._h1_depth += 1
+
+        if tag != 'img':
+            return
+
+        attributes = dict(attrs)
+        src = attributes.get('src')
+        if not src:
+            return
+
+        src = urljoin(self.page_url, src)
+
+        if 'catalog/uruns/' in src and '550x550' in src:
+            image = src.replace('550x550', '1000x1000')
+            if image not in self.images:
+                self.images.append(image)
+
+        classes = (attributes.get('class') or '').split()
+        if 'olcthumb' in classes and self.dimensions_image is None:
+            self.dimensions_image = src
+
+    def handle_endtag(self, tag):
+        if not self._h1_depth:
+            return
+
+        self._h1_depth -= 1
+        if self._h1_depth == 0:
+            self.product_name = ''.join(self._h1_text).strip()
+
+    def handle_data(self, data):
+        if self._h1_depth:
+            self._h1_text.append(data)
+
+
+class HttpProductExtractor:
+    def __init__(self, config: ScraperConfig, scheduler: Optional[RequestScheduler] = None):
+        self.config = config
+        self.scheduler = scheduler
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': USER_AGENT,
+            'Accept-Language': 'en-US,en;q=0.9'
+        })
+
+        pool_size = max(config.workers, config.concurrency, 1)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def close(self):
+        self.session.close()
+
+    def extract(self, product_id: str, dead_letter: bool = True) -> ProductData:
+        url = self.config.base_url + product_id
+        started_at = time.monotonic()
+
+        if self.scheduler:
+            response = self.scheduler.call(url, lambda: self._get(url), dead_letter=dead_letter)
+        else:
+            response = self._get(url)
+
+        parser = ProductPageParser(response.url)
+        parser.feed(response.text)
+        parser.close()
+
+        return ProductData(
+            product_id=product_id,
+            url=url,
+            product_name=parser.product_name or '',
+            images=parser.images,
+            dimensions_image=parser.dimensions_image,
+            page_stats=PageStats(
+                elapsed_ms=int((time.monotonic() - started_at) * 1000),
+                bytes_received=len(response.content),
+                requests_completed=1
+            )
+        )
+
+    def _get(self, url: str) -> requests.Response:
+        response = self.session.get(url, timeout=self.config.timeout / 1000)
+        if response.status_code in TRANSIENT_STATUSES:
+            raise TransientError(
+                f"HTTP {response.status_code} for {url}",
+                status=response.status_code,
+                retry_after=parse_retry_after(response.headers.get('Retry-After'))
+            )
+        response.raise_for_status()
+        return response
+
+    def extract_complete(self, product_id: str) -> Optional[ProductData]:
+        """Return the HTTP result, or None when the browser path should take over."""
+        try:
+            # The browser fallback records its own dead letter if it fails as well
+            product_data = self.extract(product_id, dead_letter=False)
+        except Exception:
+            return None
+
+        if not product_data.product_name or not product_data.images:
+            return None
+
+        return product_data
@@ -0,0 +1,256 @@
+import re
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from .record_store import ProductTable
+
+
+# Words that name the kind of furniture rather than the model, on invoices (English)
+# and in the storefront's product names (Turkish); they don't tell models apart
+GENERIC_WORDS = {
+    'CHAIR', 'CHAIRS', 'BERGER', 'BERJER', 'COUCH', 'SOFA', 'SINGLE', 'DOUBLE', 'TRIPLE', 'BAR', 'STOOL',
+    'ARMCHAIR', 'TABLE', 'WITH', 'AND', 'WOODEN', 'PILLOW', 'PILLOWS', 'ROPE', 'ROPES',
+    'SANDALYE', 'KOLTUK', 'TEKLI', 'IKILI', 'UCLU', 'MASA', 'TABURE', 'KOLLU', 'KOLSUZ', 'YASTIKLI',
+}
+
+CODE_PATTERN = re.compile(r'^([A-Z]*)0*(\d*)')
+
+# Trigrams shared by more than this share of the catalog are too common to pick candidates with
+COMMON_GRAM_SHARE = 0.1
+CANDIDATES_PER_INDEX = 25
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """Upper-case ASCII words: diacritics dropped (İ, Ï, Ü -> I, I, U), punctuation to spaces."""
+    if not text:
+        return ''
+    decomposed = unicodedata.normalize('NFKD', text.replace('ı', 'i'))
+    ascii_text = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return ' '.join(re.sub(r'[^0-9A-Za-z]+', ' ', ascii_text).upper().split())
+
+
+def normalize_code(code: Optional[str]) -> str:
+    """'HMP 03', 'hmp-03' and 'HMP03' all become 'HMP03'."""
+    return normalize_text(code).replace(' ', '')
+
+
+def split_product_name(product_name: Optional[str]) -> Tuple[str, str]:
+    """'HAMPTON / HMP 03' -> ('HAMPTON', 'HMP03'); names without a ' / CODE' part have no code."""
+    if not product_name:
+        return '', ''
+    if '/' in product_name:
+        name, code = product_name.rsplit('/', 1)
+        code = normalize_code(code)
+        # Only a short letters+digits tail is a model code; 'ZUCA / ELYOS' is part of the name
+        if re.fullmatch(r'[A-Z]{1,5}\d{1,3}', code):
+            return normalize_text(name), code
+    return normalize_text(product_name), ''
+
+
+@lru_cache(maxsize=65536)
+def trigrams(text: str) -> frozenset:
+    padded = f" {text} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def token_similarity(a: str, b: str) -> float:
+    if a == b:
+        return 1.0
+    grams_a, grams_b = trigrams(a), trigrams(b)
+    return 2 * len(grams_a & grams_b) / (len(grams_a) + len(grams_b))
+
+
+def sequence_ratio(a: str, b: str) -> float:
+    """2 * longest common subsequence / total length, like difflib's ratio() but cheap on short codes."""
+    if not a and not b:
+        return 1.0
+    previous = [0] * (len(b) + 1)
+    for char_a in a:
+        current = [0]
+        for j, char_b in enumerate(b):
+            current.append(previous[j] + 1 if char_a == char_b else max(previous[j + 1], current[j]))
+        previous = current
+    return 2 * previous[-1] / (len(a) + len(b))
+
+
+@lru_cache(maxsize=65536)
+def code_similarity(a: str, b: str) -> float:
+    if not a or not b:
+        return 0.0
+    if a == b:
+        return 1.0
+    letters_a, number_a = CODE_PATTERN.match(a).groups()
+    letters_b, number_b = CODE_PATTERN.match(b).groups()
+    # Same series, different model number: HMP01 and HMP03 are different products
+    if letters_a == letters_b and number_a != number_b:
+        return 0.2
+    by_parts = 0.7 * sequence_ratio(letters_a, letters_b) + 0.3 * (number_a == number_b)
+    return max(by_parts, 0.9 * sequence_ratio(a, b))
+
+
+def name_similarity(invoice_tokens: List[str], product_tokens: List[str]) -> float:
+    """How well the invoice's model words are covered by the product name, 0..1."""
+    if not invoice_tokens or not product_tokens:
+        return 0.0
+    return sum(max(token_similarity(token, other) for other in product_tokens)
+               for token in invoice_tokens) / len(invoice_tokens)
+
+
+def distinctive_tokens(text: str) -> List[str]:
+    tokens = [token for token in text.split() if not token.isdigit()]
+    specific = [token for token in tokens if token not in GENERIC_WORDS]
+    return specific or tokens
+
+
+@dataclass
+class CatalogEntry:
+    product_id: str
+    product_name: str
+    name_tokens: List[str]
+    code: str
+
+
+@dataclass
+class InvoiceMatch:
+    line: Dict[str, Any]
+    product_id: Optional[str] = None
+    product_name: Optional[str] = None
+    confidence: float = 0.0
+    # Runner-up (productId, productName, confidence) tuples, best first
+    alternatives: List[Tuple[str, str, float]] = field(default_factory=list)
+
+
+class InvoiceMatcher:
+    """Maps invoice lines (invoiceCode, invoiceName) to catalog products. Candidates come from an
+    exact model-code index plus trigram indexes over codes and names; only those few are scored."""
+
+    def __init__(self, products: Iterable[Tuple[str, str]], min_confidence: float = 0.6,
+                 review_confidence: float = 0.8):
+        self.min_confidence = min_confidence
+        self.review_confidence = review_confidence
+        self.entries: List[CatalogEntry] = []
+        self.code_index: Dict[str, List[int]] = {}
+        self.code_grams: Dict[str, List[int]] = {}
+        self.name_grams: Dict[str, List[int]] = {}
+
+        for product_id, product_name in products:
+            if not product_name:
+                continue
+            name, code = split_product_name(product_name)
+            position = len(self.entries)
+            self.entries.append(CatalogEntry(str(product_id), product_name, distinctive_tokens(name), code))
+            if code:
+                self.code_index.setdefault(code, []).append(position)
+                for gram in trigrams(code):
+                    self.code_grams.setdefault(gram, []).append(position)
+            for gram in set().union(*(trigrams(token) for token in self.entries[-1].name_tokens)):
+                self.name_grams.setdefault(gram, []).append(position)
+
+        self._common = max(50, int(len(self.entries) * COMMON_GRAM_SHARE))
+
+    @classmethod
+    def from_dicts(cls, products: Iterable[Dict[str, Any]], **kwargs) -> 'InvoiceMatcher':
+        return cls(((p.get('productId'), p.get('productName')) for p in products), **kwargs)
+
+    @classmethod
+    def from_table(cls, table: ProductTable, **kwargs) -> 'InvoiceMatcher':
+        ids, names = table.strings['product_id'], table.strings['product_name']
+        return cls(((ids[i], names[i]) for i in range(len(table))), **kwargs)
+
+    def candidates(self, code: str, tokens: List[str]) -> List[int]:
+        found = set(self.code_index.get(code, []))
+        found.update(self._top_by_grams(self.code_grams, trigrams(code) if code else set()))
+        found.update(self._top_by_grams(self.name_grams, set().union(*(trigrams(token) for token in tokens))))
+        return list(found)
+
+    def _top_by_grams(self, index: Dict[str, List[int]], grams: set) -> List[int]:
+        counts = Counter()
+        for gram in grams:
+            postings = index.get(gram)
+            if postings and len(postings) <= self._common:
+                counts.update(postings)
+        return [position for position, _ in counts.most_common(CANDIDATES_PER_INDEX)]
+
+    def score(self, entry: CatalogEntry, code: str, tokens: List[str]) -> float:
+        name_score = name_similarity(tokens, entry.name_tokens)
+        if not code:
+            return name_score
+        if not entry.code:
+            # Products listed without a model code can only be matched on the name
+            return 0.85 * name_score
+        return 0.55 * code_similarity(code, entry.code) + 0.45 * name_score
+
+    def match(self, line: Dict[str, Any]) -> InvoiceMatch:
+        code = normalize_code(line.get('invoiceCode'))
+        tokens = distinctive_tokens(normalize_text(line.get('invoiceName')))
+
+        scored = sorted(
+            ((self.score(self.entries[position], code, tokens), position) for position in self.candidates(code, tokens)),
+            key=lambda item: (-item[0], item[1])
+        )
+        result = InvoiceMatch(line, alternatives=[
+            (self.entries[position].product_id, self.entries[position].product_name, round(score, 3))
+            for score, position in scored[1:4]
+        ])
+        if scored and scored[0][0] >= self.min_confidence:
+            best = self.entries[scored[0][1]]
+            result.product_id = best.product_id
+            result.product_name = best.product_name
+            result.confidence = round(scored[0][0], 3)
+        elif scored:
+            result.alternatives.insert(0, (
+                self.entries[scored[0][1]].product_id, self.entries[scored[0][1]].product_name, round(scored[0][0], 3)
+            ))
+        return result
+
+    def match_all(self, lines: Iterable[Dict[str, Any]]) -> List[InvoiceMatch]:
+        return [self.match(line) for line in lines]
+
+    def needs_review(self, result: InvoiceMatch) -> bool:
+        """Matched, but weakly or with a runner-up about as good."""
+        if not result.product_id:
+            return False
+        close_runner_up = result.alternatives and result.alternatives[0][2] >= result.confidence - 0.02
+        return result.confidence < self.review_confidence or bool(close_runner_up)
+
+
+def invoice_entry(result: InvoiceMatch) -> Dict[str, Any]:
+    """One invoice01.json entry: invoiceCode, productId, productName, invoiceName, then the remaining
+    invoice fields in their original order, plus the match confidence."""
+    entry = {
+        'invoiceCode': result.line.get('invoiceCode'),
+        'productId': result.product_id,
+        'productName': result.product_name,
+        'invoiceName': result.line.get('invoiceName')
+    }
+    for key, value in result.line.items():
+        if key not in entry and key != 'confidence':
+            entry[key] = value
+    entry['confidence'] = result.confidence
+    return entry
+
+
+def match_report(matcher: InvoiceMatcher, results: List[InvoiceMatch]) -> Dict[str, Any]:
+    """Match statistics plus the unmatched and to-review lines with their best candidates."""
+    def described(result: InvoiceMatch) -> Dict[str, Any]:
+        return {
+            'invoiceCode': result.line.get('invoiceCode'),
+            'invoiceName': result.line.get('invoiceName'),
+            'productId': result.product_id,
+            'confidence': result.confidence,
+            'candidates': [
+                {'productId': product_id, 'productName': name, 'confidence': score}
+                for product_id, name, score in result.alternatives
+            ]
+        }
+
+    matched = [result for result in results if result.product_id]
+    return {
+        'lines': len(results),
+        'matched': len(matched),
+        'matchRate': round(len(matched) / len(results), 3) if results else 0.0,
+        'unmatched': [described(result) for result in results if not result.product_id],
+        'review': [described(result) for result in matched if matcher.needs_review(result)]
+    }
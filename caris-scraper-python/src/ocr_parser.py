@@ -0,0 +1,176 @@
+import json
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from .types import ProductDimensions
+
+try:
+    import pytesseract
+    from PIL import Image, ImageOps
+except ImportError:
+    pytesseract = None
+
+
+NUMBER = r'(\d{1,4}(?:[.,]\d{1,2})?)'
+SEPARATOR = r'\s*[x×X*]\s*'
+
+# Label -> field, matched against one OCR line at a time
+LABEL_PATTERNS = {
+    'floor_to_chair_height_cm': re.compile(r'\b(?:SH|S\.H\.?|SEAT\s*H(?:EIGHT)?|OTURMA)\b\s*[:=]?\s*' + NUMBER, re.IGNORECASE),
+    'width_cm': re.compile(r'(?<![A-Z])(?:W|WIDTH|GEN[İI]ŞL[İI]K|EN)\b\s*[:=]?\s*' + NUMBER, re.IGNORECASE),
+    'height_cm': re.compile(r'(?<![A-Z])(?:H|HEIGHT|Y[ÜU]KSEKL[İI]K|BOY)\b\s*[:=]?\s*' + NUMBER, re.IGNORECASE),
+    'depth_cm': re.compile(r'(?<![A-Z])(?:D|DEPTH|DER[İI]NL[İI]K)\b\s*[:=]?\s*' + NUMBER, re.IGNORECASE),
+}
+WEIGHT_PATTERN = re.compile(NUMBER + r'\s*(?:kg|kgs)\b', re.IGNORECASE)
+BOX_LINE_PATTERN = re.compile(r'\b(?:BOX|KOL[İI]|PACKAGE|PACKING|CARTON)\b', re.IGNORECASE)
+TRIPLE_PATTERN = re.compile(NUMBER + SEPARATOR + NUMBER + SEPARATOR + NUMBER)
+QTY_PATTERN = re.compile(r'(?:QTY|PCS|ADET)\s*[:=]?\s*(\d{1,3})|(\d{1,3})\s*(?:PCS|ADET)\b', re.IGNORECASE)
+
+CORE_FIELDS = ['width_cm', 'height_cm', 'depth_cm']
+# Anything outside these bounds is an OCR misread rather than a chair
+PLAUSIBLE_CM = (5, 400)
+PLAUSIBLE_KG = (0.5, 300)
+# An unlabelled "A x B x C" line is assumed to be W x D x H, which is only usually right
+UNLABELLED_PENALTY = 0.7
+
+
+@dataclass
+class OcrResult:
+    dimensions: Optional[ProductDimensions]
+    confidence: float
+
+
+class OcrDimensionExtractor:
+    """Offline first pass over standard Caris dimension sheets; the AI parser only sees
+    images this tier is not confident about."""
+
+    def __init__(self, min_word_confidence: float = 50):
+        self.min_word_confidence = min_word_confidence
+
+    @staticmethod
+    def available() -> bool:
+        return pytesseract is not None
+
+    def extract(self, image_path: str) -> OcrResult:
+        if not self.available():
+            return OcrResult(None, 0.0)
+
+        lines, word_confidence = self._read_lines(image_path)
+        fields, guessed = self.extract_from_lines(lines)
+        if not fields:
+            return OcrResult(None, 0.0)
+
+        confidence = self._score(fields) * word_confidence
+        if guessed:
+            confidence *= UNLABELLED_PENALTY
+        fields['source'] = 'ocr'
+        fields['confidence'] = round(confidence, 3)
+
+        return OcrResult(
+            ProductDimensions(
+                width=fields.get('width_cm'),
+                height=fields.get('height_cm'),
+                floor_to_chair_height_cm=fields.get('floor_to_chair_height_cm'),
+                depth=fields.get('depth_cm'),
+                weight=fields.get('weight_kg'),
+                box_width=fields.get('box_width_cm'),
+                box_height=fields.get('box_height_cm'),
+                box_depth=fields.get('box_depth_cm'),
+                qty_per_box=fields.get('qty_per_box'),
+                raw_text=json.dumps(fields)
+            ),
+            confidence
+        )
+
+    def extract_from_lines(self, lines: List[str]) -> Tuple[Dict[str, float], bool]:
+        """Fields found in the OCR lines, and whether the core fields were guessed by position."""
+        fields: Dict[str, float] = {}
+
+        for line in lines:
+            # Box lines carry their own W x H x D triple, keep them out of the product fields
+            if BOX_LINE_PATTERN.search(line):
+                triple = TRIPLE_PATTERN.search(line)
+                if triple and 'box_width_cm' not in fields:
+                    width, height, depth = (self._number(value) for value in triple.groups())
+                    fields.update(box_width_cm=width, box_height_cm=height, box_depth_cm=depth)
+                self._match_quantity(line, fields)
+                self._match_weight(line, fields)
+                continue
+
+            for field_name, pattern in LABEL_PATTERNS.items():
+                if field_name in fields:
+                    continue
+                match = pattern.search(line)
+                if match:
+                    fields[field_name] = self._number(match.group(1))
+
+            self._match_weight(line, fields)
+            self._match_quantity(line, fields)
+
+        # Unlabelled "W x D x H" line as a last resort for the core fields
+        if not any(field_name in fields for field_name in CORE_FIELDS):
+            for line in lines:
+                triple = TRIPLE_PATTERN.search(line)
+                if triple and not BOX_LINE_PATTERN.search(line):
+                    width, depth, height = (self._number(value) for value in triple.groups())
+                    fields.update(width_cm=width, depth_cm=depth, height_cm=height)
+                    return fields, True
+
+        return fields, False
+
+    def _read_lines(self, image_path: str) -> Tuple[List[str], float]:
+        image = ImageOps.grayscale(Image.open(image_path))
+        data = pytesseract.image_to_data(image, output_type=pytesseract.Output.DICT)
+
+        # Regroup words by Tesseract's block/paragraph/line so labels stay next to their values
+        lines: Dict[Tuple[int, int, int], List[Tuple[int, str]]] = {}
+        confidences = []
+        for index, word in enumerate(data['text']):
+            word = word.strip()
+            confidence = float(data['conf'][index])
+            if not word or confidence < 0:
+                continue
+            confidences.append(confidence)
+            if confidence < self.min_word_confidence:
+                continue
+            key = (data['block_num'][index], data['par_num'][index], data['line_num'][index])
+            lines.setdefault(key, []).append((data['left'][index], word))
+
+        text_lines = [' '.join(word for _, word in sorted(words)) for _, words in sorted(lines.items())]
+        word_confidence = (sum(confidences) / len(confidences) / 100) if confidences else 0.0
+        return text_lines, word_confidence
+
+    def _score(self, fields: Dict[str, float]) -> float:
+        core_found = [field_name for field_name in CORE_FIELDS if field_name in fields]
+        score = len(core_found) / len(CORE_FIELDS)
+
+        for field_name, value in fields.items():
+            if field_name.endswith('_cm') and not PLAUSIBLE_CM[0] <= value <= PLAUSIBLE_CM[1]:
+                score *= 0.5
+            if field_name == 'weight_kg' and not PLAUSIBLE_KG[0] <= value <= PLAUSIBLE_KG[1]:
+                score *= 0.5
+
+        # A seat can't be higher than the chair
+        seat = fields.get('floor_to_chair_height_cm')
+        if seat and fields.get('height_cm') and seat >= fields['height_cm']:
+            score *= 0.5
+
+        return score
+
+    def _match_weight(self, line: str, fields: Dict[str, float]):
+        if 'weight_kg' in fields:
+            return
+        match = WEIGHT_PATTERN.search(line)
+        if match:
+            fields['weight_kg'] = self._number(match.group(1))
+
+    def _match_quantity(self, line: str, fields: Dict[str, float]):
+        if 'qty_per_box' in fields:
+            return
+        match = QTY_PATTERN.search(line)
+        if match:
+            fields['qty_per_box'] = int(match.group(1) or match.group(2))
+
+    def _number(self, value: str) -> float:
+        number = float(value.replace(',', '.'))
+        return int(number) if number.is_integer() else number
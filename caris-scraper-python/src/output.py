@@ -0,0 +1,183 @@
+import json
+import os
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Set
+from .types import PageStats, ProductData, ProductDimensions
+
+
+def product_to_dict(product: ProductData) -> Dict[str, Any]:
+    product_dict = {
+        'productId': product.product_id,
+        'url': product.url,
+        'productName': product.product_name,
+        'images': product.images,
+        'dimensionsImage': product.dimensions_image,
+        'error': product.error
+    }
+
+    if product.dimensions:
+        product_dict['dimensions'] = {
+            'width': product.dimensions.width,
+            'height': product.dimensions.height,
+            'floor_to_chair_height_cm': product.dimensions.floor_to_chair_height_cm,
+            'depth': product.dimensions.depth,
+            'weight': product.dimensions.weight,
+            'boxWidth': product.dimensions.box_width,
+            'boxHeight': product.dimensions.box_height,
+            'boxDepth': product.dimensions.box_depth,
+            'qtyPerBox': product.dimensions.qty_per_box,
+            'rawText': product.dimensions.raw_text
+        }
+
+    if product.page_stats:
+        product_dict['pageStats'] = {
+            'elapsedMs': product.page_stats.elapsed_ms,
+            'bytesReceived': product.page_stats.bytes_received,
+            'requestsCompleted': product.page_stats.requests_completed,
+            'requestsBlocked': product.page_stats.requests_blocked
+        }
+
+    return product_dict
+
+
+def product_from_dict(product_dict: Dict[str, Any]) -> ProductData:
+    dimensions = None
+    if product_dict.get('dimensions'):
+        raw = product_dict['dimensions']
+        dimensions = ProductDimensions(
+            width=raw.get('width'),
+            height=raw.get('height'),
+            floor_to_chair_height_cm=raw.get('floor_to_chair_height_cm'),
+            depth=raw.get('depth'),
+            weight=raw.get('weight'),
+            box_width=raw.get('boxWidth'),
+            box_height=raw.get('boxHeight'),
+            box_depth=raw.get('boxDepth'),
+            qty_per_box=raw.get('qtyPerBox'),
+            raw_text=raw.get('rawText')
+        )
+
+    page_stats = None
+    if product_dict.get('pageStats'):
+        raw = product_dict['pageStats']
+        page_stats = PageStats(
+            elapsed_ms=raw.get('elapsedMs', 0),
+            bytes_received=raw.get('bytesReceived', 0),
+            requests_completed=raw.get('requestsCompleted', 0),
+            requests_blocked=raw.get('requestsBlocked', {})
+        )
+
+    return ProductData(
+        product_id=str(product_dict.get('productId', '')),
+        url=product_dict.get('url', ''),
+        product_name=product_dict.get('productName', ''),
+        images=product_dict.get('images') or [],
+        dimensions_image=product_dict.get('dimensionsImage'),
+        dimensions=dimensions,
+        error=product_dict.get('error'),
+        page_stats=page_stats
+    )
+
+
+def summarize_page_stats(stats: List[PageStats]) -> str:
+    stats = [page_stats for page_stats in stats if page_stats]
+    if not stats:
+        return "No page stats recorded"
+
+    blocked: Dict[str, int] = {}
+    for page_stats in stats:
+        for resource_type, count in page_stats.requests_blocked.items():
+            blocked[resource_type] = blocked.get(resource_type, 0) + count
+
+    avg_ms = sum(s.elapsed_ms for s in stats) / len(stats)
+    avg_kb = sum(s.bytes_received for s in stats) / len(stats) / 1024
+    blocked_text = ', '.join(f"{t}={c}" for t, c in sorted(blocked.items())) or 'none'
+
+    return (
+        f"Page stats over {len(stats)} products: {avg_ms:.0f} ms and {avg_kb:.1f} KB per product "
+        f"on average; blocked requests: {blocked_text}"
+    )
+
+
+class NdjsonWriter:
+    """Writes one product per line as it completes, fsync'ing every `fsync_every` records. A new
+    checkpoint starts empty; with append=True (resuming) earlier runs' records are kept."""
+
+    def __init__(self, path: str, fsync_every: int = 20, append: bool = False):
+        self.path = path
+        self.fsync_every = max(1, fsync_every)
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._file = open(path, 'a' if append else 'w', encoding='utf-8')
+
+        # Start on a fresh line if a previous run died halfway through one
+        if self._file.tell() > 0:
+            with open(path, 'rb') as existing:
+                existing.seek(-1, os.SEEK_END)
+                if existing.read(1) != b'\n':
+                    self._file.write('\n')
+
+    def write(self, product: ProductData):
+        line = json.dumps(product_to_dict(product), ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + '\n')
+            self._pending += 1
+            if self._pending >= self.fsync_every:
+                self._sync()
+
+    def close(self):
+        with self._lock:
+            self._sync()
+            self._file.close()
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._pending = 0
+
+
+def read_ndjson(path: str) -> Iterator[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return
+
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                # A crash mid-write leaves at most one partial trailing line
+                continue
+
+
+def dimensions_failed(dimensions: Optional[dict]) -> bool:
+    """Whether the dimensions are the placeholder a failed parse leaves behind."""
+    return bool(dimensions) and (dimensions.get('rawText') or '').startswith('Error')
+
+
+def completed_ids(path: str) -> Set[str]:
+    """IDs with a successful record in the checkpoint; failed ones are scraped again on resume."""
+    done = set()
+    for record in read_ndjson(path):
+        product_id = str(record.get('productId', ''))
+        if record.get('error') or dimensions_failed(record.get('dimensions')):
+            done.discard(product_id)
+        else:
+            done.add(product_id)
+    return done
+
+
+def compact_ndjson(ndjson_path: str, output_path: str) -> int:
+    """Write the checkpoint as the JSON array update_browser.py expects; the last record per ID wins."""
+    records: Dict[str, Dict[str, Any]] = {}
+    for record in read_ndjson(ndjson_path):
+        records[str(record.get('productId', ''))] = record
+
+    temp_path = output_path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(list(records.values()), f, indent=2)
+    os.replace(temp_path, output_path)
+
+    return len(records)
@@ -0,0 +1,213 @@
+import queue
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional
+from .tracing import Tracer
+
+
+CLAUDE_COMMAND = ['claude', '--allowedTools', 'Read', '-p']
+
+
+class ParseTimeout(Exception):
+    pass
+
+
+class ParserWorker:
+    """One slot of a ParserService. run() must return within timeout seconds or raise ParseTimeout;
+    the service replaces a worker after a timeout or any other failure. last is set on the job
+    after which the worker will be recycled."""
+
+    def start(self):
+        pass
+
+    def run(self, prompt: str, timeout: float, last: bool = False) -> str:
+        raise NotImplementedError
+
+    def stop(self):
+        pass
+
+
+class PrewarmedClaudeWorker(ParserWorker):
+    """Keeps a `claude -p` process started and waiting for its prompt on stdin, so CLI startup
+    overlaps the previous job instead of adding to every one. Each process answers one prompt;
+    its successor is spawned as soon as it is handed one."""
+
+    def __init__(self, command: Optional[List[str]] = None):
+        self.command = command or CLAUDE_COMMAND
+        self.process: Optional[subprocess.Popen] = None
+
+    def start(self):
+        self.process = subprocess.Popen(
+            self.command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True
+        )
+
+    def run(self, prompt: str, timeout: float, last: bool = False) -> str:
+        if self.process is None or self.process.poll() is not None:
+            self.start()
+        process = self.process
+        # The next process boots while this one works on the prompt, unless the worker is recycled after it
+        self.process = None
+        if not last:
+            self.start()
+
+        try:
+            stdout, stderr = process.communicate(prompt, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.communicate()
+            raise ParseTimeout(f"Claude CLI timed out after {timeout:.0f}s")
+
+        if stderr:
+            print(f"Claude CLI stderr: {stderr}", file=sys.stderr)
+        return stdout.strip() or 'No response received'
+
+    def stop(self):
+        if self.process and self.process.poll() is None:
+            self.process.kill()
+            self.process.communicate()
+        self.process = None
+
+
+class FakeParserWorker(ParserWorker):
+    """In-process worker for tests and benchmarks: answers with respond(prompt) after latency seconds."""
+
+    def __init__(self, respond: Callable[[str], str], latency: float = 0.0):
+        self.respond = respond
+        self.latency = latency
+        self.jobs = 0
+
+    def run(self, prompt: str, timeout: float, last: bool = False) -> str:
+        if self.latency > timeout:
+            time.sleep(timeout)
+            raise ParseTimeout(f"Fake worker timed out after {timeout:.1f}s")
+        time.sleep(self.latency)
+        self.jobs += 1
+        return self.respond(prompt)
+
+
+class _Job:
+    __slots__ = ('prompt', 'timeout', 'future')
+
+    def __init__(self, prompt: str, timeout: float):
+        self.prompt = prompt
+        self.timeout = timeout
+        self.future: Future = Future()
+
+
+class ParserService:
+    """Fixed pool of parser workers fed from one job queue. Each job's deadline starts when a worker
+    picks it up, so time spent queued behind other jobs never fails it. Workers that time out or
+    fail are stopped and replaced, and every worker is replaced after max_jobs_per_worker jobs."""
+
+    def __init__(self, worker_factory: Callable[[], ParserWorker], size: int = 4, timeout: float = 60.0,
+                 max_jobs_per_worker: Optional[int] = None, tracer: Optional[Tracer] = None):
+        self.worker_factory = worker_factory
+        self.size = max(1, size)
+        self.timeout = timeout
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.tracer = tracer or Tracer(enabled=False)
+        self.stats: Dict[str, int] = {'jobs': 0, 'failed': 0, 'timeouts': 0, 'recycled': 0}
+        self._jobs: queue.Queue = queue.Queue()
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def start(self):
+        """Start the workers; called on the first submit if not called before."""
+        with self._lock:
+            if self._threads or self._closed:
+                return
+            for index in range(self.size):
+                thread = threading.Thread(target=self._serve, name=f"parser-worker-{index}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, prompt: str, timeout: Optional[float] = None) -> Future:
+        if self._closed:
+            raise Exception("Parser service is closed")
+        self.start()
+        job = _Job(prompt, timeout or self.timeout)
+        self._jobs.put(job)
+        return job.future
+
+    def run(self, prompt: str, timeout: Optional[float] = None) -> str:
+        return self.submit(prompt, timeout).result()
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            threads = self._threads
+        for _ in threads:
+            self._jobs.put(None)
+        for thread in threads:
+            thread.join()
+
+    def _serve(self):
+        worker = self._new_worker()
+        jobs_done = 0
+
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+            if not job.future.set_running_or_notify_cancel():
+                continue
+
+            if worker is None:
+                worker = self._new_worker()
+            if worker is None:
+                job.future.set_exception(Exception("Could not start a parser worker"))
+                self._count('failed')
+                continue
+
+            started_at = time.perf_counter()
+            try:
+                last = bool(self.max_jobs_per_worker) and jobs_done + 1 >= self.max_jobs_per_worker
+                result = worker.run(job.prompt, job.timeout, last=last)
+            except Exception as e:
+                self._count('timeouts' if isinstance(e, ParseTimeout) else 'failed')
+                job.future.set_exception(e)
+                # A worker that hung or broke is never trusted with another job
+                self._stop(worker)
+                self._count('recycled')
+                worker, jobs_done = None, 0
+                continue
+            finally:
+                self.tracer.record('parser_job', started_at, time.perf_counter())
+
+            job.future.set_result(result)
+            self._count('jobs')
+            jobs_done += 1
+            if self.max_jobs_per_worker and jobs_done >= self.max_jobs_per_worker:
+                self._stop(worker)
+                self._count('recycled')
+                worker, jobs_done = None, 0
+
+        if worker is not None:
+            self._stop(worker)
+
+    def _new_worker(self) -> Optional[ParserWorker]:
+        try:
+            worker = self.worker_factory()
+            worker.start()
+            return worker
+        except Exception as e:
+            print(f"Failed to start parser worker: {e}", file=sys.stderr)
+            return None
+
+    def _stop(self, worker: ParserWorker):
+        try:
+            worker.stop()
+        except Exception as e:
+            print(f"Failed to stop parser worker: {e}", file=sys.stderr)
+
+    def _count(self, name: str):
+        with self._lock:
+            self.stats[name] += 1
@@ -0,0 +1,222 @@
+import queue
+import sys
+import threading
+import time
+from typing import Callable, List, Optional
+from .claude_parser import ClaudeImageParser, DownloadedImage
+from .scraper import CarisScraper
+from .state_store import ProductStateStore
+from .types import ProductInput, ProductData, ProductDimensions
+
+
+# Tells a stage worker that its upstream stage has finished
+_DONE = object()
+
+
+class ProductPipeline:
+    """Page extraction -> image download -> AI parse -> output, each stage with its own
+    workers and a bounded queue in front of it, so parsing starts with the first page."""
+
+    def __init__(self, scraper: CarisScraper, parser: ClaudeImageParser,
+                 state_store: Optional[ProductStateStore] = None):
+        self.scraper = scraper
+        self.parser = parser
+        self.state_store = state_store
+        self.config = scraper.config
+        self.tracer = scraper.tracer
+
+    def run(
+        self,
+        product_inputs: List[ProductInput],
+        on_result: Optional[Callable[[ProductData], None]] = None,
+        collect: bool = True
+    ) -> List[ProductData]:
+        """Run every product through the stages; with collect=False results only reach on_result."""
+        def feed(download_queue: queue.Queue, started_at: dict):
+            self._page_stage(product_inputs, download_queue, started_at)
+
+        return self._run(feed, [p.product_id for p in product_inputs], on_result, collect)
+
+    def parse(
+        self,
+        products: List[ProductData],
+        on_result: Optional[Callable[[ProductData], None]] = None,
+        collect: bool = True
+    ) -> List[ProductData]:
+        """Download and parse the dimension images of products scraped earlier, without loading their pages."""
+        def feed(download_queue: queue.Queue, started_at: dict):
+            for product in products:
+                started_at[product.product_id] = time.perf_counter()
+                download_queue.put(product)
+
+        return self._run(feed, [p.product_id for p in products], on_result, collect)
+
+    def _run(
+        self,
+        feed: Callable[[queue.Queue, dict], None],
+        product_ids: List[str],
+        on_result: Optional[Callable[[ProductData], None]],
+        collect: bool
+    ) -> List[ProductData]:
+        queue_size = max(1, self.config.queue_size)
+        download_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        parse_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        output_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+
+        download_threads = [
+            threading.Thread(
+                target=self._download_worker, args=(download_queue, parse_queue, output_queue), daemon=True
+            )
+            for _ in range(max(1, self.config.download_workers))
+        ]
+        parse_threads = [
+            threading.Thread(target=self._parse_worker, args=(parse_queue, output_queue), daemon=True)
+            for _ in range(max(1, self.config.parse_workers))
+        ]
+
+        by_id = {}
+        started_at = {}
+
+        def output_stage():
+            while True:
+                product = output_queue.get()
+                if product is _DONE:
+                    return
+
+                # Time from page extraction to output: download, OCR/Claude and queueing
+                self.tracer.record(
+                    'after_page', started_at.pop(product.product_id, time.perf_counter()),
+                    time.perf_counter(), product.product_id, failed=bool(product.error)
+                )
+                # A failing save or callback must not stop this thread: the bounded queues
+                # behind it would fill and block the download and parse workers for good
+                if self.state_store:
+                    try:
+                        self.state_store.save(product)
+                    except Exception as e:
+                        print(f"Failed to save state for product {product.product_id}: {e}", file=sys.stderr)
+                if collect:
+                    by_id[product.product_id] = product
+                if on_result:
+                    try:
+                        on_result(product)
+                    except Exception as e:
+                        print(f"Result handler failed for product {product.product_id}: {e}", file=sys.stderr)
+
+        output_thread = threading.Thread(target=output_stage, daemon=True)
+
+        for thread in download_threads + parse_threads + [output_thread]:
+            thread.start()
+
+        # The page stage stays on the calling thread: a browser started by
+        # scraper.init() with the sync API can only be driven from there
+        try:
+            feed(download_queue, started_at)
+        finally:
+            for _ in download_threads:
+                download_queue.put(_DONE)
+            for thread in download_threads:
+                thread.join()
+            for _ in parse_threads:
+                parse_queue.put(_DONE)
+            for thread in parse_threads:
+                thread.join()
+            output_queue.put(_DONE)
+            output_thread.join()
+
+        return [by_id[product_id] for product_id in product_ids if product_id in by_id]
+
+    def _page_stage(self, product_inputs: List[ProductInput], download_queue: queue.Queue, started_at: dict):
+        emitted = set()
+
+        def emit(product: ProductData):
+            emitted.add(product.product_id)
+            started_at[product.product_id] = time.perf_counter()
+            download_queue.put(product)
+
+        try:
+            self.scraper.scrape_products(product_inputs, on_result=emit)
+        except Exception as e:
+            for product_input in product_inputs:
+                if product_input.product_id not in emitted:
+                    error_message = f"Error scraping product {product_input.product_id}: {str(e)}"
+                    download_queue.put(self.scraper._error_result(product_input.product_id, error_message))
+
+    def _download_worker(self, download_queue: queue.Queue, parse_queue: queue.Queue, output_queue: queue.Queue):
+        while True:
+            product = download_queue.get()
+            if product is _DONE:
+                return
+
+            if product.error or not product.dimensions_image:
+                output_queue.put(product)
+                continue
+
+            try:
+                with self.tracer.product(product.product_id):
+                    item = self._download(product)
+            except Exception as e:
+                product.dimensions = ProductDimensions(raw_text=f"Error parsing image: {str(e)}")
+                item = product
+
+            if isinstance(item, tuple):
+                parse_queue.put(item)
+            else:
+                output_queue.put(item)
+
+    def _download(self, product: ProductData):
+        """Return the finished product, or (product, image) when the image still needs parsing."""
+        # Same page as the last successful scrape: keep the dimensions we already have
+        if self.state_store:
+            dimensions = self.state_store.unchanged_dimensions(product)
+            if dimensions:
+                product.dimensions = dimensions
+                return product
+
+        image = self.parser.download(product.dimensions_image)
+        if image.dimensions:
+            product.dimensions = image.dimensions
+            return product
+
+        return product, image
+
+    def _parse_worker(self, parse_queue: queue.Queue, output_queue: queue.Queue):
+        batch_size = max(1, self.config.parse_batch_size)
+
+        while True:
+            item = parse_queue.get()
+            if item is _DONE:
+                return
+
+            batch = [item]
+            finished = False
+
+            # Top the batch up with whatever arrives within the wait window
+            while len(batch) < batch_size:
+                try:
+                    item = parse_queue.get(timeout=self.config.parse_batch_wait)
+                except queue.Empty:
+                    break
+                if item is _DONE:
+                    finished = True
+                    break
+                batch.append(item)
+
+            products = [product for product, _ in batch]
+            with self.tracer.product(','.join(product.product_id for product in products)):
+                parsed = self._parse([image for _, image in batch])
+
+            for product, dimensions in zip(products, parsed):
+                product.dimensions = dimensions
+                output_queue.put(product)
+
+            if finished:
+                return
+
+    def _parse(self, images: List[DownloadedImage]) -> List[ProductDimensions]:
+        try:
+            if len(images) == 1:
+                return [self.parser.parse_downloaded(images[0])]
+            return self.parser.parse_batch(images)
+        except Exception as e:
+            return [ProductDimensions(raw_text=f"Error parsing image: {str(e)}") for _ in images]
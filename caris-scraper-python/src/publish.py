@@ -0,0 +1,181 @@
+import gzip
+import hashlib
+import json
+import os
+import zlib
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+from .snapshot_diff import apply_change
+
+MANIFEST_NAME = "manifest.json"
+CHUNK_PREFIX = "products-"
+
+
+def _bucket(product_id: str, chunk_size: int) -> int:
+    # Numeric IDs bucket by range so a new or changed product only rewrites its own chunk
+    if str(product_id).isdigit():
+        return int(product_id) // chunk_size
+    return 100000 + zlib.crc32(str(product_id).encode()) % 1000
+
+
+def _sort_key(product: Dict[str, Any]):
+    product_id = str(product.get('productId', ''))
+    return (0, int(product_id), '') if product_id.isdigit() else (1, 0, product_id)
+
+
+def _atomic_write(path: Path, data: bytes):
+    temp_path = path.with_name(path.name + '.tmp')
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+    os.replace(temp_path, path)
+
+
+class ProductBundle:
+    """Product data published next to the browser page as compact, content-addressed chunks
+    plus a manifest holding the chunk list and a productId -> chunk index."""
+
+    def __init__(self, output_dir: Path, chunk_size: int = 200, compress: bool = False):
+        self.output_dir = Path(output_dir)
+        self.chunk_size = max(1, chunk_size)
+        self.compress = compress
+
+    def load_manifest(self) -> Optional[Dict[str, Any]]:
+        path = self.output_dir / MANIFEST_NAME
+        if not path.exists():
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def read_chunk(self, file_name: str) -> List[Dict[str, Any]]:
+        data = (self.output_dir / file_name).read_bytes()
+        if file_name.endswith('.gz'):
+            data = gzip.decompress(data)
+        return json.loads(data)
+
+    def publish(self, products: List[Dict[str, Any]], merge: bool = False,
+                remove: Iterable[str] = ()) -> Dict[str, int]:
+        """Write products; with merge=True they update the existing bundle instead of replacing it,
+        and the IDs in remove are dropped from it. Only chunks whose content changed are written.
+        Returns written/unchanged/removed counts."""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        previous = self.load_manifest()
+
+        buckets: Dict[int, Dict[str, Dict[str, Any]]] = {}
+        for product in products:
+            product_id = str(product.get('productId', ''))
+            buckets.setdefault(_bucket(product_id, self.chunk_size), {})[product_id] = product
+        removed_ids = {str(product_id) for product_id in remove}
+        for product_id in removed_ids:
+            # Chunks losing a product are rewritten like touched ones
+            buckets.setdefault(_bucket(product_id, self.chunk_size), {})
+
+        chunks: Dict[int, str] = {}
+        carried_ids: Dict[int, List[str]] = {}
+        if merge and previous and previous.get('chunkSize') != self.chunk_size:
+            # Products move between chunks at a new chunk size, so the whole catalog is re-bucketed
+            for chunk in previous['chunks']:
+                for product in self.read_chunk(chunk['file']):
+                    product_id = str(product.get('productId', ''))
+                    buckets.setdefault(_bucket(product_id, self.chunk_size), {}).setdefault(product_id, product)
+        elif merge and previous:
+            for product_id, position in previous['index'].items():
+                carried_ids.setdefault(previous['chunks'][position]['bucket'], []).append(product_id)
+
+            for chunk in previous['chunks']:
+                if chunk['bucket'] in buckets:
+                    # Untouched entries of a touched chunk are carried over
+                    existing = {str(p.get('productId')): p for p in self.read_chunk(chunk['file'])}
+                    existing.update(buckets[chunk['bucket']])
+                    buckets[chunk['bucket']] = existing
+                else:
+                    chunks[chunk['bucket']] = chunk['file']
+
+        for product_id in removed_ids:
+            buckets[_bucket(product_id, self.chunk_size)].pop(product_id, None)
+
+        counts = {'written': 0, 'unchanged': 0, 'removed': 0}
+        manifest_chunks = []
+        index: Dict[str, int] = {}
+
+        for bucket in sorted(set(buckets) | set(chunks)):
+            if bucket in buckets:
+                if not buckets[bucket]:
+                    continue
+                entries = sorted(buckets[bucket].values(), key=_sort_key)
+                file_name = self._write_chunk(bucket, entries, counts)
+                product_ids = [str(p.get('productId')) for p in entries]
+            else:
+                # Untouched chunk: its IDs come from the previous index, the file isn't read
+                file_name = chunks[bucket]
+                product_ids = carried_ids.get(bucket, [])
+                counts['unchanged'] += 1
+
+            for product_id in product_ids:
+                index[product_id] = len(manifest_chunks)
+            manifest_chunks.append({'bucket': bucket, 'file': file_name, 'count': len(product_ids)})
+
+        manifest = {
+            'version': 1,
+            'generatedAt': datetime.now(timezone.utc).isoformat(timespec='seconds').replace('+00:00', 'Z'),
+            'count': len(index),
+            'chunkSize': self.chunk_size,
+            'chunks': manifest_chunks,
+            'index': index
+        }
+
+        if counts['written'] or not previous or previous.get('chunks') != manifest_chunks:
+            _atomic_write(self.output_dir / MANIFEST_NAME, json.dumps(manifest, separators=(',', ':')).encode())
+
+        current = {chunk['file'] for chunk in manifest_chunks}
+        for path in self.output_dir.glob(CHUNK_PREFIX + '*'):
+            if path.name not in current:
+                path.unlink()
+                counts['removed'] += 1
+
+        return counts
+
+    def apply_changes(self, changelog: Dict[str, Any]) -> Dict[str, int]:
+        """Apply a snapshot_diff changelog to the published bundle, reading only the chunks that hold
+        changed products. The bundle must have been published from the changelog's previous snapshot."""
+        manifest = self.load_manifest()
+        if not manifest or manifest.get('chunkSize') != self.chunk_size:
+            raise Exception(f"No bundle with chunk size {self.chunk_size} in {self.output_dir}; publish the full snapshot first")
+
+        by_file: Dict[str, List[Dict[str, Any]]] = {}
+        missing = []
+        for change in changelog['changed']:
+            position = manifest['index'].get(change['productId'])
+            if position is None:
+                missing.append(change['productId'])
+            else:
+                by_file.setdefault(manifest['chunks'][position]['file'], []).append(change)
+        if missing:
+            raise Exception(f"{len(missing)} changed products are not in the bundle (e.g. {missing[0]}); "
+                            f"it was not published from the changelog's previous snapshot")
+
+        products = list(changelog['added'])
+        for file_name, changes in by_file.items():
+            existing = {str(p.get('productId')): p for p in self.read_chunk(file_name)}
+            products.extend(apply_change(existing[change['productId']], change) for change in changes)
+
+        return self.publish(products, merge=True, remove=changelog['removed'])
+
+    def _write_chunk(self, bucket: int, entries: List[Dict[str, Any]], counts: Dict[str, int]) -> str:
+        data = json.dumps(entries, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()[:12]
+        file_name = f"{CHUNK_PREFIX}{bucket:04d}.{digest}.json"
+        if self.compress:
+            file_name += '.gz'
+
+        path = self.output_dir / file_name
+        if path.exists():
+            counts['unchanged'] += 1
+            return file_name
+
+        if self.compress:
+            # mtime=0 keeps the output byte-identical for identical content
+            data = gzip.compress(data, compresslevel=6, mtime=0)
+        _atomic_write(path, data)
+        counts['written'] += 1
+        return file_name
@@ -0,0 +1,212 @@
+import asyncio
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, TypeVar
+from urllib.parse import urlparse
+from .types import ScraperConfig
+
+T = TypeVar('T')
+
+TRANSIENT_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+
+class TransientError(Exception):
+    def __init__(self, message: str, status: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class PermanentError(Exception):
+    pass
+
+
+def is_transient(error: Exception) -> bool:
+    if isinstance(error, TransientError):
+        return True
+    if isinstance(error, PermanentError):
+        return False
+
+    # requests and Playwright errors, matched by name to avoid importing either here
+    name = type(error).__name__
+    if name in ('Timeout', 'ConnectTimeout', 'ReadTimeout', 'ConnectionError', 'ChunkedEncodingError', 'TimeoutError'):
+        return True
+
+    status = getattr(getattr(error, 'response', None), 'status_code', None)
+    return status in TRANSIENT_STATUSES
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+@dataclass
+class DeadLetter:
+    key: str
+    error: str
+    attempts: int
+
+
+@dataclass
+class _HostState:
+    tokens: float
+    rate: float
+    limit: float
+    in_flight: int = 0
+    updated_at: float = field(default_factory=time.monotonic)
+    blocked_until: float = 0.0
+
+
+class RequestScheduler:
+    """Shared pacing for every worker: a token bucket and an AIMD concurrency limit per host,
+    jittered retries for transient failures and a dead-letter list for the rest."""
+
+    def __init__(self, rate_per_host: float = 5.0, burst: int = 10,
+                 max_concurrency: int = 8, min_concurrency: int = 1,
+                 target_latency: float = 5.0, max_retries: int = 3,
+                 base_delay: float = 1.0, max_delay: float = 30.0):
+        self.max_rate = rate_per_host
+        self.burst = burst
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.target_latency = target_latency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.dead_letters: List[DeadLetter] = []
+        self.retries = 0
+        self._hosts: Dict[str, _HostState] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: ScraperConfig) -> 'RequestScheduler':
+        return cls(
+            rate_per_host=config.rate_limit_per_host,
+            burst=config.rate_burst,
+            max_concurrency=max(config.workers, config.concurrency, config.download_workers),
+            target_latency=config.target_latency_ms / 1000,
+            max_retries=config.max_retries
+        )
+
+    def call(self, url: str, fn: Callable[[], T], dead_letter: bool = True) -> T:
+        """Run fn under the host's pacing and retry transient failures. With dead_letter=False a
+        final failure is only raised, for callers that have another way to get the result."""
+        host = urlparse(url).hostname or ''
+        attempt = 0
+
+        while True:
+            attempt += 1
+            self._acquire(host)
+            started_at = time.monotonic()
+            try:
+                result = fn()
+            except Exception as e:
+                self._release(host, time.monotonic() - started_at, e)
+                delay = self._retry_delay(url, e, attempt, dead_letter)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                continue
+
+            self._release(host, time.monotonic() - started_at, None)
+            return result
+
+    async def call_async(self, url: str, fn: Callable[[], Awaitable[T]], dead_letter: bool = True) -> T:
+        host = urlparse(url).hostname or ''
+        attempt = 0
+
+        while True:
+            attempt += 1
+            while True:
+                wait = self._try_acquire(host)
+                if wait == 0:
+                    break
+                await asyncio.sleep(wait)
+
+            started_at = time.monotonic()
+            try:
+                result = await fn()
+            except Exception as e:
+                self._release(host, time.monotonic() - started_at, e)
+                delay = self._retry_delay(url, e, attempt, dead_letter)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                continue
+
+            self._release(host, time.monotonic() - started_at, None)
+            return result
+
+    def concurrency_limit(self, host: str) -> float:
+        with self._lock:
+            state = self._hosts.get(host)
+            return state.limit if state else self.max_concurrency
+
+    def _acquire(self, host: str):
+        while True:
+            wait = self._try_acquire(host)
+            if wait == 0:
+                return
+            time.sleep(wait)
+
+    def _try_acquire(self, host: str) -> float:
+        """Take a token and a concurrency slot, or return how long to wait before asking again."""
+        with self._lock:
+            state = self._state(host)
+            now = time.monotonic()
+            state.tokens = min(self.burst, state.tokens + (now - state.updated_at) * state.rate)
+            state.updated_at = now
+
+            if now < state.blocked_until:
+                return state.blocked_until - now
+            if state.in_flight >= int(state.limit):
+                return 0.05
+            if state.tokens < 1:
+                return (1 - state.tokens) / state.rate
+
+            state.tokens -= 1
+            state.in_flight += 1
+            return 0
+
+    def _release(self, host: str, latency: float, error: Optional[Exception]):
+        with self._lock:
+            state = self._state(host)
+            state.in_flight = max(0, state.in_flight - 1)
+
+            throttled = isinstance(error, TransientError) and error.status in TRANSIENT_STATUSES
+            if throttled or (error is None and latency > self.target_latency):
+                # Multiplicative decrease on pushback or slow responses
+                state.limit = max(self.min_concurrency, state.limit / 2)
+                state.rate = max(self.max_rate / 16, state.rate / 2)
+                if isinstance(error, TransientError) and error.retry_after:
+                    state.blocked_until = time.monotonic() + error.retry_after
+            elif error is None:
+                # Additive increase: about one extra slot per window of successful requests
+                state.limit = min(self.max_concurrency, state.limit + 1 / state.limit)
+                state.rate = min(self.max_rate, state.rate + self.max_rate / 20)
+
+    def _retry_delay(self, key: str, error: Exception, attempt: int, dead_letter: bool = True) -> Optional[float]:
+        if is_transient(error) and attempt <= self.max_retries:
+            with self._lock:
+                self.retries += 1
+            # Full jitter keeps workers that failed together from retrying together
+            delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+            retry_after = getattr(error, 'retry_after', None)
+            return max(delay, retry_after or 0)
+
+        if dead_letter:
+            with self._lock:
+                self.dead_letters.append(DeadLetter(key, str(error), attempt))
+        return None
+
+    def _state(self, host: str) -> _HostState:
+        state = self._hosts.get(host)
+        if state is None:
+            state = _HostState(tokens=self.burst, rate=self.max_rate, limit=self.max_concurrency)
+            self._hosts[host] = state
+        return state
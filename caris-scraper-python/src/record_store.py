@@ -0,0 +1,396 @@
+import json
+import math
+import mmap
+import re
+import struct
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+from .output import product_to_dict
+from .types import ProductData
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+MAGIC = b'CARISREC'
+VERSION = 2
+ALIGNMENT = 8
+
+# (column, product_to_dict key) for the numeric dimension fields
+DIMENSION_COLUMNS = [
+    ('width', 'width'),
+    ('height', 'height'),
+    ('floor_to_chair_height_cm', 'floor_to_chair_height_cm'),
+    ('depth', 'depth'),
+    ('weight', 'weight'),
+    ('box_width', 'boxWidth'),
+    ('box_height', 'boxHeight'),
+    ('box_depth', 'boxDepth'),
+    ('qty_per_box', 'qtyPerBox'),
+]
+
+# (column, product_to_dict key) for the single-valued text fields; None is kept apart from ''.
+# 'extra' holds any other top-level fields (pageStats, thumbnails...) as a JSON object
+STRING_COLUMNS = [
+    ('product_id', 'productId'),
+    ('url', 'url'),
+    ('product_name', 'productName'),
+    ('dimensions_image', 'dimensionsImage'),
+    ('error', 'error'),
+    ('raw_text', 'rawText'),
+    ('extra', None),
+]
+
+KNOWN_KEYS = {'productId', 'url', 'productName', 'images', 'dimensionsImage', 'error', 'dimensions'}
+
+NUMBER_PATTERN = re.compile(r'-?\d+(?:[.,]\d+)?')
+
+
+def to_number(value: Any) -> float:
+    """Numeric value of a dimension field; NaN when missing or unreadable."""
+    if value is None or isinstance(value, bool):
+        return math.nan
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = NUMBER_PATTERN.search(str(value))
+    return float(match.group().replace(',', '.')) if match else math.nan
+
+
+def from_number(value: float):
+    """JSON form of a numeric column value: None for NaN, int when it is whole."""
+    if math.isnan(value):
+        return None
+    return int(value) if value.is_integer() else value
+
+
+class StringColumn:
+    """UTF-8 strings packed into one buffer and addressed by an offsets array."""
+
+    __slots__ = ('offsets', 'data', 'nulls')
+
+    def __init__(self, offsets: Sequence[int], data, nulls: Optional[Sequence[int]] = None):
+        self.offsets = offsets
+        self.data = data
+        self.nulls = nulls
+
+    @classmethod
+    def build(cls, values: Iterable[Optional[str]], nullable: bool = True) -> 'StringColumn':
+        offsets = array('q', [0])
+        nulls = array('B') if nullable else None
+        parts = []
+        position = 0
+        for value in values:
+            encoded = value.encode('utf-8') if value is not None else b''
+            parts.append(encoded)
+            position += len(encoded)
+            offsets.append(position)
+            if nulls is not None:
+                nulls.append(1 if value is None else 0)
+        return cls(offsets, b''.join(parts), nulls)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> Optional[str]:
+        if self.nulls is not None and self.nulls[index]:
+            return None
+        return bytes(self.data[self.offsets[index]:self.offsets[index + 1]]).decode('utf-8')
+
+
+class ProductRecord:
+    """One row of a ProductTable: the flattened ProductData fields with numeric dimensions."""
+
+    __slots__ = ('product_id', 'url', 'product_name', 'images', 'dimensions_image', 'error', 'has_dimensions',
+                 'raw_text', 'extra') + tuple(column for column, _ in DIMENSION_COLUMNS)
+
+    def __init__(self, **values):
+        for name in self.__slots__:
+            setattr(self, name, values.get(name))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The product_to_dict JSON shape, with extra fields after the known ones."""
+        product_dict = {
+            'productId': self.product_id,
+            'url': self.url,
+            'productName': self.product_name,
+            'images': list(self.images),
+            'dimensionsImage': self.dimensions_image,
+            'error': self.error
+        }
+        if self.has_dimensions:
+            dimensions = {key: from_number(getattr(self, column)) for column, key in DIMENSION_COLUMNS}
+            dimensions['rawText'] = self.raw_text
+            product_dict['dimensions'] = dimensions
+        if self.extra:
+            product_dict.update(json.loads(self.extra))
+        return product_dict
+
+    def __repr__(self) -> str:
+        return f"ProductRecord(product_id={self.product_id!r}, product_name={self.product_name!r})"
+
+
+class ProductTable:
+    """Scraped products held column by column: one float64 array per dimension field and packed
+    UTF-8 buffers for the text. Saved files are memory-mapped on load, so opening the catalog
+    costs a header read and only the rows and columns actually touched are paged in."""
+
+    def __init__(self, count: int, strings: Dict[str, StringColumn], numbers: Dict[str, Sequence[float]],
+                 has_dimensions: Sequence[int], image_offsets: Sequence[int], images: StringColumn, source=None):
+        self.count = count
+        self.strings = strings
+        self.numbers = numbers
+        self.has_dimensions = has_dimensions
+        self.image_offsets = image_offsets
+        self.images = images
+        # Keeps the mapped file alive while columns point into it
+        self._source = source
+
+    @classmethod
+    def from_dicts(cls, products: Iterable[Dict[str, Any]]) -> 'ProductTable':
+        """Build from product_to_dict-shaped dicts, e.g. a loaded result.json."""
+        string_values: Dict[str, List[Optional[str]]] = {column: [] for column, _ in STRING_COLUMNS}
+        numbers = {column: array('d') for column, _ in DIMENSION_COLUMNS}
+        has_dimensions = array('B')
+        image_offsets = array('q', [0])
+        image_values: List[str] = []
+
+        for product in products:
+            dimensions = product.get('dimensions') or None
+            for column, key in STRING_COLUMNS:
+                if column == 'extra':
+                    extra = {name: value for name, value in product.items() if name not in KNOWN_KEYS}
+                    value = json.dumps(extra, ensure_ascii=False) if extra else None
+                else:
+                    value = (dimensions or {}).get(key) if column == 'raw_text' else product.get(key)
+                string_values[column].append(None if value is None else str(value))
+            for column, key in DIMENSION_COLUMNS:
+                numbers[column].append(to_number((dimensions or {}).get(key)))
+            has_dimensions.append(1 if dimensions else 0)
+            image_values.extend(product.get('images') or [])
+            image_offsets.append(len(image_values))
+
+        strings = {column: StringColumn.build(values) for column, values in string_values.items()}
+        return cls(len(has_dimensions), strings, numbers, has_dimensions, image_offsets,
+                   StringColumn.build(image_values, nullable=False))
+
+    @classmethod
+    def from_products(cls, products: Iterable[ProductData]) -> 'ProductTable':
+        return cls.from_dicts(product_to_dict(product) for product in products)
+
+    @classmethod
+    def read_json(cls, path: str) -> 'ProductTable':
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_dicts(json.load(f))
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self) -> Iterator[ProductRecord]:
+        for index in range(self.count):
+            yield self.record(index)
+
+    def column(self, name: str) -> Sequence:
+        """A numeric column as a float64 sequence (NaN where missing), or a string column."""
+        if name in self.numbers:
+            return self.numbers[name]
+        if name in self.strings:
+            return self.strings[name]
+        raise Exception(f"Unknown column: {name}")
+
+    def record(self, index: int) -> ProductRecord:
+        values = {column: self.strings[column][index] for column, _ in STRING_COLUMNS}
+        values.update({column: self.numbers[column][index] for column, _ in DIMENSION_COLUMNS})
+        values['has_dimensions'] = bool(self.has_dimensions[index])
+        values['images'] = tuple(self.record_images(index))
+        return ProductRecord(**values)
+
+    def record_images(self, index: int) -> Iterator[str]:
+        for position in range(self.image_offsets[index], self.image_offsets[index + 1]):
+            yield self.images[position]
+
+    def where(self, column: str, min_value: Optional[float] = None, max_value: Optional[float] = None,
+              rows: Optional[Iterable[int]] = None) -> List[int]:
+        """Row indices whose numeric column lies within [min_value, max_value]; missing values never match."""
+        values = self.numbers.get(column)
+        if values is None:
+            raise Exception(f"Not a numeric column: {column}")
+        low = -math.inf if min_value is None else min_value
+        high = math.inf if max_value is None else max_value
+        candidates = range(self.count) if rows is None else rows
+        # NaN fails both comparisons, so rows without the value drop out here
+        return [index for index in candidates if low <= values[index] <= high]
+
+    def contains(self, column: str, text: str, rows: Optional[Iterable[int]] = None) -> List[int]:
+        """Row indices whose string column contains text, case-insensitively."""
+        values = self.strings.get(column)
+        if values is None:
+            raise Exception(f"Not a string column: {column}")
+        needle = text.casefold()
+        candidates = range(self.count) if rows is None else rows
+        return [index for index in candidates if needle in (values[index] or '').casefold()]
+
+    def take(self, rows: Iterable[int]) -> 'ProductTable':
+        """A new in-memory table holding only the given rows."""
+        return ProductTable.from_dicts(self.record(index).to_dict() for index in rows)
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """The JSON view: the product_to_dict shape used by result.json and the product browser."""
+        return [record.to_dict() for record in self]
+
+    def write_json(self, path: str):
+        with open(path, 'w') as f:
+            json.dump(self.to_dicts(), f, indent=2)
+
+    def save(self, path: str):
+        """Write the binary columnar format read back by ProductTable.load."""
+        buffers = []
+        for column, _ in STRING_COLUMNS:
+            string_column = self.strings[column]
+            buffers.append((f"{column}.offsets", 'q', string_column.offsets))
+            buffers.append((f"{column}.nulls", 'B', string_column.nulls))
+            buffers.append((f"{column}.data", 'B', string_column.data))
+        for column, _ in DIMENSION_COLUMNS:
+            buffers.append((column, 'd', self.numbers[column]))
+        buffers.append(('has_dimensions', 'B', self.has_dimensions))
+        buffers.append(('image_offsets', 'q', self.image_offsets))
+        buffers.append(('images.offsets', 'q', self.images.offsets))
+        buffers.append(('images.data', 'B', self.images.data))
+
+        layout = []
+        payloads = []
+        position = 0
+        for name, type_code, values in buffers:
+            payload = _as_bytes(values, type_code)
+            layout.append({'name': name, 'type': type_code, 'offset': position, 'length': len(payload)})
+            payloads.append(payload)
+            position += len(payload)
+            padding = -position % ALIGNMENT
+            payloads.append(b'\0' * padding)
+            position += padding
+
+        header = json.dumps({'version': VERSION, 'count': self.count, 'buffers': layout}).encode('utf-8')
+        header += b' ' * (-(len(MAGIC) + 8 + len(header)) % ALIGNMENT)
+
+        temp_path = Path(str(path) + '.tmp')
+        with open(temp_path, 'wb') as f:
+            f.write(MAGIC)
+            f.write(struct.pack('<II', VERSION, len(header)))
+            f.write(header)
+            for payload in payloads:
+                f.write(payload)
+        temp_path.replace(path)
+
+    @classmethod
+    def load(cls, path: str) -> 'ProductTable':
+        """Memory-map a file written by save(); columns are views into the mapping, not copies."""
+        with open(path, 'rb') as f:
+            size = f.seek(0, 2)
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+
+        view = memoryview(mapping)
+        if bytes(view[:len(MAGIC)]) != MAGIC:
+            raise Exception(f"Not a product record file: {path}")
+        version, header_length = struct.unpack_from('<II', view, len(MAGIC))
+        if version not in (1, VERSION):
+            raise Exception(f"Unsupported product record file version {version}: {path}")
+
+        body_start = len(MAGIC) + 8 + header_length
+        header = json.loads(bytes(view[len(MAGIC) + 8:body_start]))
+        buffers = {}
+        for entry in header['buffers']:
+            start = body_start + entry['offset']
+            buffer = view[start:start + entry['length']]
+            buffers[entry['name']] = buffer.cast(entry['type']) if entry['type'] != 'B' else buffer
+
+        strings = {
+            column: StringColumn(buffers[f"{column}.offsets"], buffers[f"{column}.data"], buffers[f"{column}.nulls"])
+            for column, _ in STRING_COLUMNS if f"{column}.offsets" in buffers
+        }
+        # Version 1 files predate the extra column
+        strings.setdefault('extra', StringColumn.build([None] * header['count']))
+        numbers = {column: buffers[column] for column, _ in DIMENSION_COLUMNS}
+        images = StringColumn(buffers['images.offsets'], buffers['images.data'])
+        return cls(header['count'], strings, numbers, buffers['has_dimensions'], buffers['image_offsets'],
+                   images, source=mapping)
+
+    def to_arrow(self):
+        """A pyarrow Table with the same columns; needs the 'columnar' extra."""
+        _require_pyarrow()
+        columns = {column: pyarrow.array([self.strings[column][i] for i in range(self.count)], pyarrow.string())
+                   for column, _ in STRING_COLUMNS}
+        for column, _ in DIMENSION_COLUMNS:
+            columns[column] = pyarrow.array(list(self.numbers[column]), pyarrow.float64(), from_pandas=True)
+        columns['has_dimensions'] = pyarrow.array([bool(flag) for flag in self.has_dimensions], pyarrow.bool_())
+        columns['images'] = pyarrow.array(
+            [list(self.record_images(i)) for i in range(self.count)], pyarrow.list_(pyarrow.string())
+        )
+        return pyarrow.table(columns)
+
+    @classmethod
+    def from_arrow(cls, table) -> 'ProductTable':
+        _require_pyarrow()
+        data = table.to_pydict()
+        count = table.num_rows
+        strings = {column: StringColumn.build(data.get(column) or [None] * count) for column, _ in STRING_COLUMNS}
+        numbers = {
+            column: array('d', (math.nan if value is None else value for value in data[column]))
+            for column, _ in DIMENSION_COLUMNS
+        }
+        has_dimensions = array('B', (1 if flag else 0 for flag in data['has_dimensions']))
+        image_offsets = array('q', [0])
+        image_values: List[str] = []
+        for images in data['images']:
+            image_values.extend(images or [])
+            image_offsets.append(len(image_values))
+        return cls(count, strings, numbers, has_dimensions, image_offsets,
+                   StringColumn.build(image_values, nullable=False))
+
+    def write_parquet(self, path: str):
+        pyarrow.parquet.write_table(self.to_arrow(), path)
+
+    @classmethod
+    def read_parquet(cls, path: str) -> 'ProductTable':
+        _require_pyarrow()
+        return cls.from_arrow(pyarrow.parquet.read_table(path))
+
+
+def open_table(path: str) -> ProductTable:
+    """Load a product table by file extension: .parquet, .json, anything else as the binary format."""
+    suffix = Path(path).suffix.lower()
+    if suffix == '.parquet':
+        return ProductTable.read_parquet(path)
+    if suffix == '.json':
+        return ProductTable.read_json(path)
+    return ProductTable.load(path)
+
+
+def save_table(table: ProductTable, path: str):
+    suffix = Path(path).suffix.lower()
+    if suffix == '.parquet':
+        _require_pyarrow()
+        table.write_parquet(path)
+    elif suffix == '.json':
+        table.write_json(path)
+    else:
+        table.save(path)
+
+
+def _as_bytes(values, type_code: str) -> bytes:
+    if values is None:
+        return b''
+    if isinstance(values, (bytes, bytearray)):
+        return bytes(values)
+    if isinstance(values, memoryview):
+        return values.cast('B').tobytes() if values.format != 'B' else values.tobytes()
+    if isinstance(values, array) and values.typecode == type_code:
+        return values.tobytes()
+    return array(type_code, values).tobytes()
+
+
+def _require_pyarrow():
+    if pyarrow is None:
+        raise Exception("Parquet/Arrow support needs pyarrow: pip install 'caris-scraper-python[columnar]'")
@@ -0,0 +1,99 @@
+import time
+from typing import Optional
+from urllib.parse import urlparse
+from .types import PageStats, ScraperConfig
+
+
+class ResourceFilter:
+    def __init__(self, config: ScraperConfig):
+        self.config = config
+        self.first_party_host = self._site_host(config.base_url)
+    
+    def should_block(self, resource_type: str, url: str) -> bool:
+        if not self.config.block_resources:
+            return False
+        
+        # The product page itself is what we extract from
+        if resource_type == 'document':
+            return False
+        
+        if resource_type in self.config.blocked_resource_types:
+            return True
+        
+        if any(pattern in url for pattern in self.config.blocked_url_patterns):
+            return True
+        
+        if resource_type == 'script' and self.config.block_third_party_scripts:
+            return self._site_host(url) != self.first_party_host
+        
+        return False
+    
+    def _site_host(self, url: str) -> str:
+        host = urlparse(url).hostname or ''
+        return host[4:] if host.startswith('www.') else host
+
+
+class PageStatsCollector:
+    """Per-page request accounting, reset before each product navigation."""
+    
+    def __init__(self):
+        self.stats = PageStats()
+        self.started_at = time.monotonic()
+    
+    def reset(self):
+        self.stats = PageStats()
+        self.started_at = time.monotonic()
+    
+    def record_blocked(self, resource_type: str):
+        blocked = self.stats.requests_blocked
+        blocked[resource_type] = blocked.get(resource_type, 0) + 1
+    
+    def record_finished(self, body_size: Optional[int], headers_size: Optional[int] = None):
+        self.stats.requests_completed += 1
+        self.stats.bytes_received += max(body_size or 0, 0) + max(headers_size or 0, 0)
+    
+    def finish(self) -> PageStats:
+        self.stats.elapsed_ms = int((time.monotonic() - self.started_at) * 1000)
+        return self.stats
+
+
+def install_sync(page, resource_filter: ResourceFilter, collector: PageStatsCollector):
+    def handle_route(route):
+        request = route.request
+        if resource_filter.should_block(request.resource_type, request.url):
+            collector.record_blocked(request.resource_type)
+            route.abort()
+        else:
+            route.continue_()
+    
+    def handle_finished(request):
+        try:
+            sizes = request.sizes()
+            collector.record_finished(sizes.get('responseBodySize'), sizes.get('responseHeadersSize'))
+        except Exception:
+            collector.record_finished(None)
+    
+    if resource_filter.config.block_resources:
+        page.route('**/*', handle_route)
+    page.on('requestfinished', handle_finished)
+
+
+async def install_async(page, resource_filter: ResourceFilter, collector: PageStatsCollector):
+    async def handle_route(route):
+        request = route.request
+        if resource_filter.should_block(request.resource_type, request.url):
+            collector.record_blocked(request.resource_type)
+            await route.abort()
+        else:
+            await route.continue_()
+    
+    async def handle_finished(request):
+        try:
+            sizes = await request.sizes()
+            collector.record_finished(sizes.get('responseBodySize'), sizes.get('responseHeadersSize'))
+        except Exception:
+            collector.record_finished(None)
+    
+    if resource_filter.config.block_resources:
+        await page.route('**/*', handle_route)
+    page.on('requestfinished', handle_finished)
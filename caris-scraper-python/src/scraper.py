@@ -1,101 +1,310 @@
-from playwright.sync_api import sync_playwright, Browser, Page
-from typing import List, Optional
+import queue
+import sys
+import threading
+from playwright.sync_api import Page
+from typing import Callable, Dict, List, Optional
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from .browser_session import BrowserSession
+from .http_extractor import HttpProductExtractor
+from .rate_limiter import RequestScheduler, TransientError, TRANSIENT_STATUSES, parse_retry_after
+from .resources import ResourceFilter, PageStatsCollector
+from .tracing import Tracer
 from .types import ProductInput, ProductData, ScraperConfig, ScraperResult
 
 
+# Extract product name
+PRODUCT_NAME_SCRIPT = """
+    () => {
+        const h1 = document.querySelector('h1');
+        return h1?.textContent?.trim() || '';
+    }
+"""
+
+# Extract images
+IMAGES_SCRIPT = """
+    () => {
+        const productImages = Array.from(document.querySelectorAll('img'))
+            .filter(img => img.src.includes('catalog/uruns/') && img.src.includes('550x550'))
+            .map(img => img.src.replace('550x550', '1000x1000'));
+
+        return [...new Set(productImages)];
+    }
+"""
+
+# Extract dimensions image
+DIMENSIONS_IMAGE_SCRIPT = """
+    () => {
+        const dimensionsImg = document.querySelector('img.olcthumb');
+        return dimensionsImg ? dimensionsImg.src : undefined;
+    }
+"""
+
+
+class _SessionLost(Exception):
+    """A worker's browser crashed more often than browser_max_relaunches allows."""
+
+
 class CarisScraper:
-    def __init__(self, config: Optional[ScraperConfig] = None):
+    def __init__(self, config: Optional[ScraperConfig] = None, tracer: Optional[Tracer] = None):
         self.config = config or ScraperConfig()
-        self.browser: Optional[Browser] = None
-        self.playwright = None
-    
+        self.tracer = tracer or Tracer(enabled=False)
+        self.session: Optional[BrowserSession] = None
+        self.session_stats: Dict[str, int] = {}
+        self._stats_lock = threading.Lock()
+        self.resource_filter = ResourceFilter(self.config)
+        self.scheduler = RequestScheduler.from_config(self.config)
+        self.http_extractor = None
+        if self.config.engine == 'http':
+            self.http_extractor = HttpProductExtractor(self.config, self.scheduler)
+
     def init(self):
-        self.playwright = sync_playwright().start()
-        self.browser = self.playwright.chromium.launch(
-            headless=self.config.headless,
-            args=['--no-sandbox', '--disable-setuid-sandbox']
-        )
-    
+        # Parallel mode launches one long-lived browser per worker thread instead,
+        # and the HTTP engine only launches one when a page needs the fallback
+        if self.config.workers > 1 or self.http_extractor:
+            return
+
+        self.session = BrowserSession(self.config, self.resource_filter, self.tracer).start()
+
     def close(self):
-        if self.browser:
-            self.browser.close()
-        if self.playwright:
-            self.playwright.stop()
-    
-    def scrape_products(self, product_inputs: List[ProductInput]) -> ScraperResult:
-        if not self.browser:
+        if self.session:
+            self._close_session(self.session)
+            self.session = None
+        if self.http_extractor:
+            self.http_extractor.close()
+
+    def session_summary(self) -> str:
+        stats = self.session_stats
+        if not stats.get('pages'):
+            return "No browser pages loaded"
+        return (f"Browser sessions: {stats['pages']} pages in {stats['contexts']} contexts, "
+                f"{stats['recycled']} recycled, {stats['restarted']} restarted for memory, "
+                f"{stats['relaunched']} relaunched after crashes")
+
+    def _close_session(self, session: BrowserSession):
+        session.close()
+        with self._stats_lock:
+            for name, count in session.stats.items():
+                self.session_stats[name] = self.session_stats.get(name, 0) + count
+
+    def scrape_products(
+        self,
+        product_inputs: List[ProductInput],
+        on_result: Optional[Callable[[ProductData], None]] = None
+    ) -> ScraperResult:
+        if self.config.workers > 1:
+            return self.scrape_products_parallel(product_inputs, on_result)
+
+        if not self.session and not self.http_extractor:
             raise Exception("Browser not initialized. Call init() first.")
-        
+
         results = []
         errors = []
-        
+
         for product_input in product_inputs:
             try:
-                product_data = self._scrape_product(product_input.product_id)
-                results.append(product_data)
+                with self.tracer.product(product_input.product_id), self.tracer.span('page_total'):
+                    product_data = self._scrape_product(product_input.product_id)
             except Exception as e:
                 error_message = f"Error scraping product {product_input.product_id}: {str(e)}"
                 errors.append(error_message)
-                
-                results.append(ProductData(
-                    product_id=product_input.product_id,
-                    url=self.config.base_url + product_input.product_id,
-                    product_name='',
-                    images=[],
-                    error=error_message
-                ))
-        
+                product_data = self._error_result(product_input.product_id, error_message)
+
+            results.append(product_data)
+            if on_result:
+                on_result(product_data)
+
+        return ScraperResult(
+            success=len(errors) == 0,
+            data=results,
+            errors=errors
+        )
+
+    def scrape_products_parallel(
+        self,
+        product_inputs: List[ProductInput],
+        on_result: Optional[Callable[[ProductData], None]] = None
+    ) -> ScraperResult:
+        # Playwright's sync API is bound to the thread that started it, so each worker
+        # thread owns one long-lived browser session and reuses a page per context
+        work_queue: queue.Queue = queue.Queue()
+        for index, product_input in enumerate(product_inputs):
+            work_queue.put((index, product_input))
+
+        results: List[Optional[ProductData]] = [None] * len(product_inputs)
+        errors: List[str] = []
+        lock = threading.Lock()
+
+        def record(index: int, product_data: ProductData):
+            with lock:
+                results[index] = product_data
+                if product_data.error:
+                    errors.append(product_data.error)
+                if on_result:
+                    on_result(product_data)
+
+        def run_workers(count: int):
+            with ThreadPoolExecutor(max_workers=count) as executor:
+                futures = [
+                    executor.submit(self._run_worker, work_queue, record)
+                    for _ in range(count)
+                ]
+
+                for future in as_completed(futures):
+                    try:
+                        future.result()
+                    except Exception as e:
+                        with lock:
+                            errors.append(f"Worker failed: {str(e)}")
+
+        run_workers(max(1, min(self.config.workers, len(product_inputs))))
+
+        # A worker that lost its browser requeues its product, possibly after the others ran out of work
+        if not work_queue.empty():
+            run_workers(1)
+
+        # Products left behind by workers whose browser failed to launch
+        for index, product_data in enumerate(results):
+            if product_data is None:
+                product_id = product_inputs[index].product_id
+                error_message = f"Error scraping product {product_id}: no worker available"
+                errors.append(error_message)
+                results[index] = self._error_result(product_id, error_message)
+                if on_result:
+                    on_result(results[index])
+
         return ScraperResult(
             success=len(errors) == 0,
             data=results,
             errors=errors
         )
-    
+
+    def _run_worker(self, work_queue: queue.Queue, record: Callable[[int, ProductData], None]):
+        # The browser is only started once a product actually needs it
+        session = BrowserSession(self.config, self.resource_filter, self.tracer)
+
+        try:
+            while True:
+                try:
+                    index, product_input = work_queue.get_nowait()
+                except queue.Empty:
+                    return
+
+                product_id = product_input.product_id
+                with self.tracer.product(product_id), self.tracer.span('page_total'):
+                    product_data = self._try_http(product_id)
+
+                    if product_data is None:
+                        try:
+                            product_data = self._extract_in_session(session, product_id)
+                        except _SessionLost:
+                            # This worker's browser is beyond relaunching; the product goes to the others
+                            work_queue.put((index, product_input))
+                            raise
+                        except Exception as e:
+                            error_message = f"Error scraping product {product_id}: {str(e)}"
+                            product_data = self._error_result(product_id, error_message)
+
+                record(index, product_data)
+        finally:
+            self._close_session(session)
+
+    def _try_http(self, product_id: str) -> Optional[ProductData]:
+        if not self.http_extractor:
+            return None
+        with self.tracer.span('http_extract', product_id) as span:
+            product_data = self.http_extractor.extract_complete(product_id)
+            span['complete'] = product_data is not None
+            if product_data and product_data.page_stats:
+                span['bytes'] = product_data.page_stats.bytes_received
+        return product_data
+
+    def _extract_in_session(self, session: BrowserSession, product_id: str) -> ProductData:
+        """Load the product in the session's current context. A product whose browser or page
+        crashed under it is retried once in a relaunched browser instead of being failed."""
+        for attempt in range(2):
+            try:
+                page, collector = session.page()
+            except Exception as e:
+                raise _SessionLost(str(e)) from e
+
+            try:
+                product_data = self._extract_product(page, product_id, collector)
+            except Exception:
+                crashed = session.crashed()
+                # A failed navigation can leave the page unusable
+                session.discard_page()
+                if crashed and attempt == 0:
+                    print(f"Browser crashed while loading product {product_id}, retrying it", file=sys.stderr)
+                    continue
+                raise
+
+            session.page_done()
+            return product_data
+
+    def _error_result(self, product_id: str, error_message: str) -> ProductData:
+        return ProductData(
+            product_id=product_id,
+            url=self.config.base_url + product_id,
+            product_name='',
+            images=[],
+            error=error_message
+        )
+
     def _scrape_product(self, product_id: str) -> ProductData:
-        if not self.browser:
+        product_data = self._try_http(product_id)
+        if product_data:
+            return product_data
+
+        if self.http_extractor and not self.session:
+            self.session = BrowserSession(self.config, self.resource_filter, self.tracer).start()
+
+        if not self.session:
             raise Exception("Browser not initialized")
-        
-        page = self.browser.new_page()
-        url = self.config.base_url + product_id
-        
-        try:
-            page.goto(url, wait_until='networkidle', timeout=self.config.timeout)
-            
-            # Extract product name
-            product_name = page.evaluate("""
-                () => {
-                    const h1 = document.querySelector('h1');
-                    return h1?.textContent?.trim() || '';
-                }
-            """)
-            
-            # Extract images
-            images = page.evaluate("""
-                () => {
-                    const productImages = Array.from(document.querySelectorAll('img'))
-                        .filter(img => img.src.includes('catalog/uruns/') && img.src.includes('550x550'))
-                        .map(img => img.src.replace('550x550', '1000x1000'));
-                    
-                    return [...new Set(productImages)];
-                }
-            """)
-            
-            # Extract dimensions image
-            dimensions_image = page.evaluate("""
-                () => {
-                    const dimensionsImg = document.querySelector('img.olcthumb');
-                    return dimensionsImg ? dimensionsImg.src : undefined;
-                }
-            """)
-            
-            return ProductData(
-                product_id=product_id,
-                url=url,
-                product_name=product_name,
-                images=images,
-                dimensions_image=dimensions_image
+
+        return self._extract_in_session(self.session, product_id)
+
+    def _navigate(self, page: Page, url: str):
+        response = page.goto(url, wait_until=self.config.wait_until, timeout=self.config.timeout)
+        if response and response.status in TRANSIENT_STATUSES:
+            raise TransientError(
+                f"HTTP {response.status} for {url}",
+                status=response.status,
+                retry_after=parse_retry_after(response.headers.get('retry-after'))
             )
-            
-        finally:
-            page.close()
\ No newline at end of file
+
+        if self.config.wait_for_selector:
+            page.wait_for_selector(self.config.wait_for_selector, state='attached', timeout=self.config.timeout)
+
+    def _extract_product(self, page: Page, product_id: str, collector: PageStatsCollector) -> ProductData:
+        url = self.config.base_url + product_id
+        collector.reset()
+        attempts = 0
+
+        def navigate():
+            nonlocal attempts
+            attempts += 1
+            self._navigate(page, url)
+
+        with self.tracer.span('goto', product_id) as span:
+            try:
+                self.scheduler.call(url, navigate)
+            finally:
+                span['retries'] = max(0, attempts - 1)
+                span['bytes'] = collector.stats.bytes_received
+                span['requests'] = collector.stats.requests_completed
+
+        with self.tracer.span('evaluate_name', product_id):
+            product_name = page.evaluate(PRODUCT_NAME_SCRIPT)
+        with self.tracer.span('evaluate_images', product_id):
+            images = page.evaluate(IMAGES_SCRIPT)
+        with self.tracer.span('evaluate_dimensions_image', product_id):
+            dimensions_image = page.evaluate(DIMENSIONS_IMAGE_SCRIPT)
+
+        return ProductData(
+            product_id=product_id,
+            url=url,
+            product_name=product_name,
+            images=images,
+            dimensions_image=dimensions_image,
+            page_stats=collector.finish()
+        )
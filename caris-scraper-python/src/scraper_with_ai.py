@@ -1,23 +1,115 @@
-from typing import List
+import sys
+from typing import Callable, List, Optional
 from .scraper import CarisScraper
 from .claude_parser import ClaudeImageParser
+from .dimension_cache import DimensionCache
+from .downloader import ImageDownloader
+from .ocr_parser import OcrDimensionExtractor
+from .parser_service import ParserService, PrewarmedClaudeWorker
+from .pipeline import ProductPipeline
+from .state_store import ProductStateStore
+from .tracing import Tracer
 from .types import ProductInput, ProductData, ScraperConfig
 
 
 class CarisScraperWithAI(CarisScraper):
-    def __init__(self, config: ScraperConfig = None):
-        super().__init__(config)
-        self.claude_parser = ClaudeImageParser()
+    def __init__(self, config: ScraperConfig = None, state_store: Optional[ProductStateStore] = None,
+                 tracer: Optional[Tracer] = None):
+        super().__init__(config, tracer)
+        self.state_store = state_store
+        storage_dir = self.config.storage_path
+        self.dimension_cache = None
+        if self.config.dimension_cache:
+            self.dimension_cache = DimensionCache(
+                storage_dir / "dimension-cache.sqlite",
+                max_entries=self.config.dimension_cache_size
+            )
+        local_extractor = None
+        if self.config.ocr_tier:
+            if OcrDimensionExtractor.available():
+                local_extractor = OcrDimensionExtractor()
+            else:
+                print("OCR tier disabled: install the 'ocr' extra (pytesseract, Pillow) and tesseract", file=sys.stderr)
+        downloader = ImageDownloader(
+            storage_dir / "dimensions",
+            workers=self.config.download_workers,
+            scheduler=self.scheduler
+        )
+        service = None
+        if self.config.parser_workers > 0:
+            # Workers only start once the first prompt arrives, so fully cached runs spawn nothing
+            service = ParserService(
+                PrewarmedClaudeWorker,
+                size=self.config.parser_workers,
+                timeout=self.config.parse_timeout,
+                max_jobs_per_worker=self.config.parser_max_jobs or None,
+                tracer=self.tracer
+            )
+        self.claude_parser = ClaudeImageParser(
+            cache=self.dimension_cache,
+            downloader=downloader,
+            local_extractor=local_extractor,
+            local_min_confidence=self.config.ocr_min_confidence,
+            tracer=self.tracer,
+            service=service,
+            timeout=self.config.parse_timeout,
+            storage_dir=storage_dir
+        )
     
-    def scrape_products_with_ai(self, product_inputs: List[ProductInput]) -> List[ProductData]:
-        result = self.scrape_products(product_inputs)
+    def close(self):
+        super().close()
+        self.claude_parser.close()
+        if self.dimension_cache:
+            self.dimension_cache.close()
+        if self.state_store:
+            self.state_store.close()
+    
+    def scrape_products_with_ai(
+        self,
+        product_inputs: List[ProductInput],
+        on_result: Optional[Callable[[ProductData], None]] = None,
+        collect: bool = True
+    ) -> List[ProductData]:
+        pipeline = ProductPipeline(self, self.claude_parser, self.state_store)
+        return pipeline.run(product_inputs, on_result, collect)
+    
+    def parse_products(
+        self,
+        products: List[ProductData],
+        on_result: Optional[Callable[[ProductData], None]] = None,
+        collect: bool = True
+    ) -> List[ProductData]:
+        """Parse the dimension images of already scraped products; no browser is needed."""
+        pipeline = ProductPipeline(self, self.claude_parser, self.state_store)
+        return pipeline.parse(products, on_result, collect)
+    
+    def scrape_products_incremental(
+        self,
+        product_inputs: List[ProductInput],
+        ttl_seconds: float,
+        on_result: Optional[Callable[[ProductData], None]] = None,
+        collect: bool = True
+    ) -> List[ProductData]:
+        if not self.state_store:
+            raise Exception("Incremental scraping needs a state store")
+        
+        product_ids = [product_input.product_id for product_input in product_inputs]
+        to_scrape, fresh = self.state_store.plan(product_ids, ttl_seconds)
+        
+        if on_result:
+            for product in fresh:
+                on_result(product)
+        
+        scraped = []
+        if to_scrape:
+            scraped = self.scrape_products_with_ai(
+                [ProductInput(product_id=product_id) for product_id in to_scrape],
+                on_result,
+                collect
+            )
         
-        # Parse dimensions images with Claude AI
-        for product in result.data:
-            if product.dimensions_image and not product.error:
-                try:
-                    product.dimensions = self.claude_parser.parse_dimensions_image(product.dimensions_image)
-                except Exception as e:
-                    print(f"Error parsing dimensions for product {product.product_id}: {e}")
+        if not collect:
+            return []
         
-        return result.data
\ No newline at end of file
+        by_id = {product.product_id: product for product in fresh + scraped}
+        return [by_id[product_id] for product_id in product_ids if product_id in by_id]
@@ -0,0 +1,241 @@
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from .output import read_ndjson
+
+
+# Timings and byte counts differ on every run; they say nothing about the product
+VOLATILE_FIELDS = {'pageStats'}
+
+CHANGELOG_VERSION = 1
+INDEX_VERSION = 1
+READ_CHUNK = 1 << 16
+
+
+def _digest(value: Any) -> str:
+    data = json.dumps(value, sort_keys=True, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+
+def record_digests(record: Dict[str, Any]) -> Tuple[str, Dict[str, str]]:
+    """(record hash, {field: hash}) over the record's fields, images list included, minus volatile ones."""
+    fields = {
+        name: _digest(value) for name, value in record.items()
+        if name != 'productId' and name not in VOLATILE_FIELDS
+    }
+    return _digest(sorted(fields.items())), fields
+
+
+def iter_json_array(path: str) -> Iterator[Dict[str, Any]]:
+    """Records of a JSON array file, decoded one element at a time instead of loading the whole file."""
+    decoder = json.JSONDecoder()
+    with open(path, 'r', encoding='utf-8') as f:
+        buffer = f.read(READ_CHUNK).lstrip()
+        if not buffer.startswith('['):
+            raise Exception(f"{path} is not a JSON array")
+        buffer = buffer[1:]
+        exhausted = False
+
+        while True:
+            buffer = buffer.lstrip().lstrip(',').lstrip()
+            if buffer.startswith(']'):
+                return
+            try:
+                record, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                if exhausted:
+                    raise Exception(f"{path} ends in the middle of a record")
+                # The element continues past what has been read so far
+                more = f.read(READ_CHUNK)
+                exhausted = not more
+                buffer += more
+                continue
+            yield record
+            buffer = buffer[end:]
+            if len(buffer) < READ_CHUNK and not exhausted:
+                more = f.read(READ_CHUNK)
+                exhausted = not more
+                buffer += more
+
+
+def iter_snapshot(path: str) -> Iterator[Dict[str, Any]]:
+    """Product records from a result.json array or an NDJSON checkpoint (.ndjson/.jsonl)."""
+    if not os.path.exists(path):
+        raise Exception(f"Snapshot '{path}' not found")
+    if Path(path).suffix.lower() in ('.ndjson', '.jsonl'):
+        return read_ndjson(path)
+    return iter_json_array(path)
+
+
+class SnapshotIndex:
+    """Per-product record and field hashes of one snapshot. Saved next to a changelog, it stands in
+    for the previous snapshot on the next diff, so that snapshot never has to be read again."""
+
+    def __init__(self, records: Optional[Dict[str, Tuple[str, Dict[str, str]]]] = None):
+        self.records: Dict[str, Tuple[str, Dict[str, str]]] = records or {}
+
+    @classmethod
+    def build(cls, records: Iterable[Dict[str, Any]]) -> 'SnapshotIndex':
+        index = cls()
+        for record in records:
+            index.records[str(record.get('productId', ''))] = record_digests(record)
+        return index
+
+    @classmethod
+    def load(cls, path: str) -> 'SnapshotIndex':
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != INDEX_VERSION:
+            raise Exception(f"Unsupported snapshot index version in {path}: {data.get('version')}")
+        return cls({product_id: (entry['hash'], entry['fields']) for product_id, entry in data['records'].items()})
+
+    def save(self, path: str):
+        data = {
+            'version': INDEX_VERSION,
+            'records': {
+                product_id: {'hash': record_hash, 'fields': fields}
+                for product_id, (record_hash, fields) in self.records.items()
+            }
+        }
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(temp_path, path)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+
+def load_baseline(path: str) -> SnapshotIndex:
+    """The previous side of a diff: a saved SnapshotIndex, or any snapshot, which is hashed as it streams."""
+    if path.endswith('.index.json'):
+        return SnapshotIndex.load(path)
+    return SnapshotIndex.build(iter_snapshot(path))
+
+
+class SnapshotDiff:
+    """Compares a snapshot against the previous one's index in a single pass over its records.
+    Only the deltas are kept in memory: added records, changed fields and removed IDs. The new
+    snapshot's index is built along the way for the next run."""
+
+    def __init__(self, baseline: SnapshotIndex):
+        self.baseline = baseline
+        self.index = SnapshotIndex()
+        self.added: Dict[str, Dict[str, Any]] = {}
+        self.changed: Dict[str, Dict[str, Any]] = {}
+        self.field_counts: Dict[str, int] = {}
+
+    def feed(self, record: Dict[str, Any]):
+        product_id = str(record.get('productId', ''))
+        record_hash, fields = record_digests(record)
+        # A later record for the same ID (NDJSON retries) replaces the earlier one
+        self.index.records[product_id] = (record_hash, fields)
+        self.added.pop(product_id, None)
+        self.changed.pop(product_id, None)
+
+        previous = self.baseline.records.get(product_id)
+        if previous is None:
+            self.added[product_id] = record
+            return
+        previous_hash, previous_fields = previous
+        if previous_hash == record_hash:
+            return
+
+        change: Dict[str, Any] = {
+            'productId': product_id,
+            'fields': {name: record[name] for name, digest in fields.items() if previous_fields.get(name) != digest}
+        }
+        dropped = sorted(name for name in previous_fields if name not in fields)
+        if dropped:
+            change['removedFields'] = dropped
+        self.changed[product_id] = change
+
+    def feed_all(self, records: Iterable[Dict[str, Any]]) -> 'SnapshotDiff':
+        for record in records:
+            self.feed(record)
+        return self
+
+    def removed(self) -> List[str]:
+        return sorted((product_id for product_id in self.baseline.records if product_id not in self.index.records),
+                      key=_id_order)
+
+    def changelog(self, source: Optional[str] = None, target: Optional[str] = None) -> Dict[str, Any]:
+        removed = self.removed()
+        changed = [self.changed[product_id] for product_id in sorted(self.changed, key=_id_order)]
+
+        field_counts: Dict[str, int] = {}
+        for change in changed:
+            for name in list(change['fields']) + change.get('removedFields', []):
+                field_counts[name] = field_counts.get(name, 0) + 1
+
+        return {
+            'version': CHANGELOG_VERSION,
+            'from': source,
+            'to': target,
+            'generatedAt': datetime.now(timezone.utc).isoformat(timespec='seconds').replace('+00:00', 'Z'),
+            'summary': {
+                'added': len(self.added),
+                'changed': len(changed),
+                'removed': len(removed),
+                'unchanged': len(self.index) - len(self.added) - len(changed),
+                'fields': dict(sorted(field_counts.items()))
+            },
+            'added': [self.added[product_id] for product_id in sorted(self.added, key=_id_order)],
+            'changed': changed,
+            'removed': removed
+        }
+
+
+def _id_order(product_id: str):
+    return (0, int(product_id), '') if product_id.isdigit() else (1, 0, product_id)
+
+
+def diff_snapshots(previous: str, current: str, index_path: Optional[str] = None) -> Dict[str, Any]:
+    """Changelog from the previous snapshot (or its saved index) to the current one."""
+    diff = SnapshotDiff(load_baseline(previous)).feed_all(iter_snapshot(current))
+    if index_path:
+        diff.index.save(index_path)
+    return diff.changelog(source=os.path.basename(previous), target=os.path.basename(current))
+
+
+def load_changelog(path: str) -> Dict[str, Any]:
+    with open(path, 'r', encoding='utf-8') as f:
+        changelog = json.load(f)
+    if changelog.get('version') != CHANGELOG_VERSION:
+        raise Exception(f"Unsupported changelog version in {path}: {changelog.get('version')}")
+    return changelog
+
+
+def apply_change(record: Dict[str, Any], change: Dict[str, Any]) -> Dict[str, Any]:
+    updated = dict(record)
+    updated.update(change['fields'])
+    for name in change.get('removedFields', []):
+        updated.pop(name, None)
+    return updated
+
+
+def apply_changelog(records: Iterable[Dict[str, Any]], changelog: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """The previous snapshot's records with the changelog applied; added products go at the end."""
+    changed = {change['productId']: change for change in changelog['changed']}
+    removed = set(changelog['removed'])
+    result = []
+    for record in records:
+        product_id = str(record.get('productId', ''))
+        if product_id in removed:
+            continue
+        result.append(apply_change(record, changed[product_id]) if product_id in changed else record)
+    result.extend(changelog['added'])
+    return result
+
+
+def touched_ids(changelog: Dict[str, Any], fields: Optional[Set[str]] = None) -> Set[str]:
+    """Removed products plus changed ones; with fields, only changes touching one of those fields."""
+    touched = set(changelog['removed'])
+    for change in changelog['changed']:
+        names = set(change['fields']) | set(change.get('removedFields', []))
+        if fields is None or names & fields:
+            touched.add(change['productId'])
+    return touched
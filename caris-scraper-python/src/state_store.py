@@ -0,0 +1,115 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+from .output import dimensions_failed, product_from_dict, product_to_dict
+from .types import ProductData, ScraperConfig
+
+
+def default_state_path(config: ScraperConfig) -> Path:
+    return config.storage_path / "product-state.sqlite"
+
+
+def page_fingerprint(product: ProductData) -> str:
+    """Hash of everything the page scrape produces, so unchanged pages can skip re-parsing."""
+    payload = json.dumps([product.product_name, product.images, product.dimensions_image])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ProductStateStore:
+    """Last known scrape of every product, used to re-scrape only what is new, stale or broken."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS products (
+                product_id TEXT PRIMARY KEY,
+                last_scraped REAL NOT NULL,
+                fingerprint TEXT,
+                images TEXT,
+                dimensions TEXT,
+                error TEXT,
+                record TEXT NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def plan(self, product_ids: List[str], ttl_seconds: float) -> Tuple[List[str], List[ProductData]]:
+        """Split IDs into those to scrape and stored products that are still fresh."""
+        now = time.time()
+        to_scrape = []
+        fresh = []
+
+        for product_id in product_ids:
+            row = self._get_row(product_id)
+            if row is None:
+                to_scrape.append(product_id)
+                continue
+
+            last_scraped, error, record = row
+            record = json.loads(record)
+            if error or dimensions_failed(record.get('dimensions')) or now - last_scraped > ttl_seconds:
+                to_scrape.append(product_id)
+            else:
+                fresh.append(product_from_dict(record))
+
+        return to_scrape, fresh
+
+    def get(self, product_id: str) -> Optional[ProductData]:
+        row = self._get_row(product_id)
+        return product_from_dict(json.loads(row[2])) if row else None
+
+    def unchanged_dimensions(self, product: ProductData):
+        """Stored dimensions when the page fingerprint matches the last successful scrape."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fingerprint, error, dimensions FROM products WHERE product_id = ?",
+                (product.product_id,)
+            ).fetchone()
+
+        if not row or row[1] or not row[2] or row[0] != page_fingerprint(product):
+            return None
+
+        if dimensions_failed(json.loads(row[2])):
+            return None
+
+        stored = self.get(product.product_id)
+        return stored.dimensions if stored else None
+
+    def save(self, product: ProductData):
+        record = product_to_dict(product)
+        dimensions = record.get('dimensions')
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO products "
+                "(product_id, last_scraped, fingerprint, images, dimensions, error, record) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    product.product_id,
+                    time.time(),
+                    None if product.error else page_fingerprint(product),
+                    json.dumps(product.images),
+                    json.dumps(dimensions) if dimensions else None,
+                    product.error,
+                    json.dumps(record, ensure_ascii=False)
+                )
+            )
+            self._conn.commit()
+
+    def _get_row(self, product_id: str):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT last_scraped, error, record FROM products WHERE product_id = ?",
+                (product_id,)
+            ).fetchone()
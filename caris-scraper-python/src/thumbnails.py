@@ -0,0 +1,220 @@
+import json
+import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+try:
+    # Registers AVIF support on Pillow builds that don't ship it
+    import pillow_avif  # noqa: F401
+except ImportError:
+    pass
+
+
+DEFAULT_SIZES = (160, 320, 640)
+DEFAULT_FORMATS = ('webp', 'avif')
+
+# AVIF at the same quality setting comes out noticeably sharper, so it can go lower
+FORMAT_OPTIONS = {
+    'webp': lambda quality: {'quality': quality, 'method': 4},
+    'avif': lambda quality: {'quality': max(quality - 20, 1), 'speed': 6},
+}
+
+
+@dataclass
+class Derivative:
+    path: str
+    format: str
+    width: int
+    height: int
+
+
+@dataclass
+class ImageDerivatives:
+    content_hash: str
+    width: int = 0
+    height: int = 0
+    variants: List[Derivative] = field(default_factory=list)
+    # True when every variant was already on disk from an earlier run
+    reused: bool = False
+    error: Optional[str] = None
+
+
+def supported_formats() -> List[str]:
+    if Image is None:
+        return []
+    Image.init()
+    return [name for name in DEFAULT_FORMATS if name.upper() in Image.SAVE]
+
+
+def _sidecar_path(output_dir: Path, content_hash: str) -> Path:
+    return output_dir / content_hash[:2] / f"{content_hash}.json"
+
+
+def _target_widths(width: int, sizes: Sequence[int]) -> List[int]:
+    # Never upscale: sizes wider than the source collapse into one full-width variant
+    widths = sorted({min(size, width) for size in sizes if size > 0})
+    return widths or [width]
+
+
+def _render(source_path: str, content_hash: str, output_dir: str, sizes: Sequence[int],
+            formats: Sequence[str], quality: int) -> dict:
+    """Decode once, write every size/format variant and the sidecar; runs in a worker process."""
+    base_dir = Path(output_dir) / content_hash[:2]
+    base_dir.mkdir(parents=True, exist_ok=True)
+
+    with Image.open(source_path) as image:
+        source_width, source_height = image.size
+        # JPEG can decode straight at a reduced scale, far cheaper than a full decode
+        image.draft('RGB', (max(sizes) * 2, max(sizes) * 2))
+        drafted_size = image.size
+        image = ImageOps.exif_transpose(image)
+        if image.size != drafted_size:
+            source_width, source_height = source_height, source_width
+
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'transparency' in image.info or image.mode in ('LA', 'PA') else 'RGB')
+
+        variants = []
+        for width in sorted(_target_widths(source_width, sizes), reverse=True):
+            height = max(1, round(source_height * width / source_width))
+            # Each size is resized from the previous (larger) one, which is already close
+            if image.size != (width, height):
+                image = image.resize((width, height), Image.Resampling.LANCZOS)
+
+            for image_format in formats:
+                path = base_dir / f"{content_hash}-{width}.{image_format}"
+                temp_path = base_dir / f".render-{uuid.uuid4().hex}"
+                try:
+                    image.save(temp_path, image_format.upper(), **FORMAT_OPTIONS[image_format](quality))
+                    os.replace(temp_path, path)
+                finally:
+                    if temp_path.exists():
+                        temp_path.unlink()
+                variants.append({'path': str(path), 'format': image_format, 'width': width, 'height': height})
+
+    metadata = {
+        'content_hash': content_hash,
+        'width': source_width,
+        'height': source_height,
+        'sizes': sorted(sizes),
+        'formats': list(formats),
+        'quality': quality,
+        'variants': sorted(variants, key=lambda v: (v['format'], v['width']))
+    }
+    sidecar = _sidecar_path(Path(output_dir), content_hash)
+    temp_sidecar = sidecar.with_name(sidecar.name + '.tmp')
+    temp_sidecar.write_text(json.dumps(metadata), encoding='utf-8')
+    os.replace(temp_sidecar, sidecar)
+    return metadata
+
+
+class ThumbnailGenerator:
+    """Resized WebP/AVIF derivatives of downloaded images, rendered in a process pool and stored
+    by source content hash; a sidecar per source lets re-runs skip images already processed."""
+
+    def __init__(self, output_dir: Path, sizes: Sequence[int] = DEFAULT_SIZES,
+                 formats: Sequence[str] = DEFAULT_FORMATS, quality: int = 75, processes: Optional[int] = None):
+        if Image is None:
+            raise Exception("Thumbnails need Pillow: pip install 'caris-scraper-python[thumbnails]'")
+
+        available = supported_formats()
+        unsupported = [name for name in formats if name not in available]
+        self.formats = [name for name in formats if name in available]
+        if not self.formats:
+            raise Exception(f"None of the requested formats are supported by this Pillow build: {', '.join(formats)}")
+
+        self.skipped_formats = unsupported
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.sizes = sorted(set(sizes))
+        self.quality = quality
+        self.processes = processes or os.cpu_count() or 1
+
+    def load(self, content_hash: str) -> Optional[ImageDerivatives]:
+        """Stored derivatives covering the configured sizes and formats, if every file is still there."""
+        sidecar = _sidecar_path(self.output_dir, content_hash)
+        if not sidecar.exists():
+            return None
+        try:
+            metadata = json.loads(sidecar.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+
+        if (metadata.get('quality') != self.quality
+                or not set(self.sizes) <= set(metadata.get('sizes', []))
+                or not set(self.formats) <= set(metadata.get('formats', []))):
+            return None
+
+        wanted = set(_target_widths(metadata['width'], self.sizes))
+        variants = [
+            Derivative(**variant) for variant in metadata['variants']
+            if variant['format'] in self.formats and variant['width'] in wanted
+        ]
+        if not all(Path(variant.path).exists() for variant in variants):
+            return None
+        return ImageDerivatives(content_hash, metadata['width'], metadata['height'], variants, reused=True)
+
+    def generate_many(
+        self,
+        sources: Dict[str, str],
+        on_result: Optional[Callable[[ImageDerivatives], None]] = None
+    ) -> Dict[str, ImageDerivatives]:
+        """Render derivatives for {content_hash: source path}; already processed hashes are skipped."""
+        results: Dict[str, ImageDerivatives] = {}
+        pending = {}
+
+        for content_hash, source_path in sources.items():
+            stored = self.load(content_hash)
+            if stored:
+                results[content_hash] = stored
+                if on_result:
+                    on_result(stored)
+            else:
+                pending[content_hash] = source_path
+
+        if not pending:
+            return results
+
+        with ProcessPoolExecutor(max_workers=min(self.processes, len(pending))) as executor:
+            futures = {
+                executor.submit(
+                    _render, source_path, content_hash, str(self.output_dir), self.sizes, self.formats, self.quality
+                ): content_hash
+                for content_hash, source_path in pending.items()
+            }
+
+            for future in as_completed(futures):
+                content_hash = futures[future]
+                try:
+                    metadata = future.result()
+                    result = ImageDerivatives(
+                        content_hash, metadata['width'], metadata['height'],
+                        [Derivative(**variant) for variant in metadata['variants']]
+                    )
+                except Exception as e:
+                    result = ImageDerivatives(content_hash, error=f"Failed to render thumbnails: {str(e)}")
+                results[content_hash] = result
+                if on_result:
+                    on_result(result)
+
+        return results
+
+
+def derivative_record(derivatives: ImageDerivatives, url_for: Callable[[str], str]) -> dict:
+    """JSON form of a source image's derivatives, with paths mapped to URLs for the page."""
+    return {
+        'width': derivatives.width,
+        'height': derivatives.height,
+        'variants': [
+            dict(asdict(variant), path=url_for(variant.path))
+            for variant in sorted(derivatives.variants, key=lambda v: (v.format, v.width))
+        ]
+    }
@@ -0,0 +1,155 @@
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+@dataclass
+class Span:
+    stage: str
+    product_id: Optional[str]
+    # Seconds since the tracer was created
+    start: float
+    duration: float
+    thread: int
+    args: Dict[str, Any] = field(default_factory=dict)
+
+
+def peak_rss_kb(children: bool = False) -> int:
+    """Peak resident set size of this process, or of the largest finished child (e.g. claude)."""
+    if resource is None:
+        return 0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF)
+    # Linux reports kilobytes, macOS bytes
+    return usage.ru_maxrss // 1024 if os.uname().sysname == 'Darwin' else usage.ru_maxrss
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    # Nearest rank
+    rank = math.ceil(p / 100 * len(sorted_values)) - 1
+    return sorted_values[max(0, min(len(sorted_values) - 1, rank))]
+
+
+class Tracer:
+    """Per-product, per-stage timings for one run, written as JSON lines or a Chrome trace.
+    A disabled tracer records nothing, so instrumented code never has to check for one."""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.spans: List[Span] = []
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @contextmanager
+    def product(self, product_id: str) -> Iterator[None]:
+        """Attribute spans opened on this thread to product_id."""
+        previous = getattr(self._local, 'product_id', None)
+        self._local.product_id = product_id
+        try:
+            yield
+        finally:
+            self._local.product_id = previous
+
+    @contextmanager
+    def span(self, stage: str, product_id: Optional[str] = None, **args) -> Iterator[Dict[str, Any]]:
+        """Time the block; the yielded dict can be filled with extra fields (bytes, retries...)."""
+        if not self.enabled:
+            yield args
+            return
+
+        started_at = time.perf_counter()
+        try:
+            yield args
+        except Exception as e:
+            args['error'] = str(e)
+            raise
+        finally:
+            self.record(stage, started_at, time.perf_counter(), product_id, **args)
+
+    def record(self, stage: str, started_at: float, ended_at: float,
+               product_id: Optional[str] = None, **args):
+        """Add a span measured elsewhere, with perf_counter() timestamps."""
+        if not self.enabled:
+            return
+
+        args['peakRssKb'] = peak_rss_kb()
+        span = Span(
+            stage=stage,
+            product_id=product_id or getattr(self._local, 'product_id', None),
+            start=started_at - self._origin,
+            duration=ended_at - started_at,
+            thread=threading.get_ident(),
+            args=args
+        )
+        with self._lock:
+            self.spans.append(span)
+
+    def write(self, path: str):
+        """Chrome trace (chrome://tracing, Perfetto) for .json paths, JSON lines otherwise."""
+        with self._lock:
+            spans = list(self.spans)
+
+        with open(path, 'w') as f:
+            if path.endswith('.json'):
+                events = [
+                    {
+                        'name': span.stage,
+                        'cat': 'scraper',
+                        'ph': 'X',
+                        'ts': round(span.start * 1_000_000),
+                        'dur': round(span.duration * 1_000_000),
+                        'pid': os.getpid(),
+                        'tid': span.thread,
+                        'args': dict(span.args, productId=span.product_id)
+                    }
+                    for span in spans
+                ]
+                json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+                return
+
+            for span in spans:
+                f.write(json.dumps({
+                    'stage': span.stage,
+                    'productId': span.product_id,
+                    'startMs': round(span.start * 1000, 3),
+                    'durationMs': round(span.duration * 1000, 3),
+                    'thread': span.thread,
+                    **span.args
+                }) + '\n')
+
+    def summary(self) -> str:
+        with self._lock:
+            spans = list(self.spans)
+
+        by_stage: Dict[str, List[Span]] = {}
+        for span in spans:
+            by_stage.setdefault(span.stage, []).append(span)
+
+        lines = [f"{'stage':<26}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'total s':>10}{'MB':>9}{'retries':>9}"]
+        for stage, stage_spans in by_stage.items():
+            durations = sorted(span.duration * 1000 for span in stage_spans)
+            transferred = sum(span.args.get('bytes', 0) for span in stage_spans)
+            retries = sum(span.args.get('retries', 0) for span in stage_spans)
+            lines.append(
+                f"{stage:<26}{len(durations):>7}"
+                f"{percentile(durations, 50):>10.0f}{percentile(durations, 95):>10.0f}{percentile(durations, 99):>10.0f}"
+                f"{sum(durations) / 1000:>10.1f}{transferred / 1024 / 1024:>9.1f}{retries:>9}"
+            )
+
+        lines.append(
+            f"Peak RSS: {peak_rss_kb() / 1024:.0f} MB (scraper), "
+            f"{peak_rss_kb(children=True) / 1024:.0f} MB (largest finished child process)"
+        )
+        return "\n".join(lines)
@@ -1,5 +1,14 @@
-from dataclasses import dataclass
-from typing import Optional, List
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Optional, List
+
+
+DEFAULT_STORAGE_DIR = Path(__file__).parent.parent / "storage"
+
+
+def resolve_storage_dir(storage_dir: Optional[str] = None) -> Path:
+    """storage_dir, or storage/ next to src/ wherever the scripts are run from."""
+    return Path(storage_dir) if storage_dir else DEFAULT_STORAGE_DIR
 
 
 @dataclass
@@ -9,18 +18,27 @@ class ProductInput:
 
 @dataclass
 class ProductDimensions:
-    width: Optional[str] = None
-    height: Optional[str] = None
-    floor_to_chair_height_cm: Optional[str] = None
-    depth: Optional[str] = None
-    weight: Optional[str] = None
-    box_width: Optional[str] = None
-    box_height: Optional[str] = None
-    box_depth: Optional[str] = None
-    qty_per_box: Optional[str] = None
+    # Centimetres and kilograms, as parsed from the dimensions image
+    width: Optional[float] = None
+    height: Optional[float] = None
+    floor_to_chair_height_cm: Optional[float] = None
+    depth: Optional[float] = None
+    weight: Optional[float] = None
+    box_width: Optional[float] = None
+    box_height: Optional[float] = None
+    box_depth: Optional[float] = None
+    qty_per_box: Optional[int] = None
     raw_text: Optional[str] = None
 
 
+@dataclass
+class PageStats:
+    elapsed_ms: int = 0
+    bytes_received: int = 0
+    requests_completed: int = 0
+    requests_blocked: Dict[str, int] = field(default_factory=dict)
+
+
 @dataclass
 class ProductData:
     product_id: str
@@ -30,13 +48,83 @@ class ProductData:
     dimensions_image: Optional[str] = None
     dimensions: Optional[ProductDimensions] = None
     error: Optional[str] = None
+    page_stats: Optional[PageStats] = None
+
+
+@dataclass
+class CategoryProducts:
+    category_name: str
+    url: str
+    product_ids: List[int]
+    pages: int = 0
+    error: Optional[str] = None
 
 
 @dataclass
 class ScraperConfig:
     base_url: str = "https://www.caris.com.tr/index.php?route=product/product&path=38&product_id="
+    # Category pages are base + path, fetched with OpenCart's page/limit parameters
+    category_url: str = "https://www.caris.com.tr/index.php?route=product/category&path="
+    category_page_limit: int = 100
     headless: bool = True
     timeout: int = 30000
+    workers: int = 1
+    concurrency: int = 8
+    # 'browser' renders every page; 'http' parses the server HTML and only
+    # falls back to the browser when the name or gallery is missing
+    engine: str = 'browser'
+    # Request interception: drop everything the extraction doesn't read from the DOM
+    block_resources: bool = False
+    blocked_resource_types: List[str] = field(
+        default_factory=lambda: ['image', 'media', 'font', 'stylesheet']
+    )
+    blocked_url_patterns: List[str] = field(
+        default_factory=lambda: [
+            'google-analytics.com', 'googletagmanager.com', 'doubleclick.net',
+            'facebook.net', 'connect.facebook', 'hotjar.com', 'yandex.ru'
+        ]
+    )
+    block_third_party_scripts: bool = True
+    # 'networkidle', 'load' or 'domcontentloaded'
+    wait_until: str = 'networkidle'
+    wait_for_selector: Optional[str] = None
+    # Streaming pipeline: workers per stage and the bound on each queue between stages
+    download_workers: int = 4
+    parse_workers: int = 4
+    queue_size: int = 32
+    # Dimension images sent to one Claude invocation, and how long to wait to fill a batch
+    parse_batch_size: int = 1
+    parse_batch_wait: float = 2.0
+    # Pre-warmed claude processes serving parse jobs (0 starts one per prompt), the deadline
+    # each job gets once a worker picks it up, and jobs after which a worker is replaced
+    parser_workers: int = 4
+    parse_timeout: float = 60.0
+    parser_max_jobs: int = 0
+    # Local OCR tier ahead of Claude; needs the 'ocr' extra and a tesseract binary
+    ocr_tier: bool = False
+    ocr_min_confidence: float = 0.8
+    # Pacing shared by every worker, per host: requests/second, burst size, retries for
+    # transient failures and the latency above which concurrency is backed off
+    rate_limit_per_host: float = 5.0
+    rate_burst: int = 10
+    max_retries: int = 3
+    target_latency_ms: int = 10000
+    # Parsed dimension images are reused across runs unless the image changes
+    dimension_cache: bool = True
+    dimension_cache_size: int = 5000
+    # Browser memory guardrails: each worker's pages live in an isolated context replaced after
+    # context_max_pages products, or when its browser's processes pass browser_max_rss_mb (0 turns
+    # either off). A crashed browser is relaunched at most browser_max_relaunches times per worker
+    context_max_pages: int = 100
+    browser_max_rss_mb: int = 1536
+    browser_max_relaunches: int = 5
+    prewarm_contexts: bool = True
+    # Downloaded images and caches; defaults to storage/ next to src/
+    storage_dir: Optional[str] = None
+
+    @property
+    def storage_path(self) -> Path:
+        return resolve_storage_dir(self.storage_dir)
 
 
 @dataclass
@@ -0,0 +1,257 @@
+import json
+import os
+import socket
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+from .output import product_to_dict
+from .types import ProductData
+
+
+PENDING = 'pending'
+LEASED = 'leased'
+DONE = 'done'
+FAILED = 'failed'
+
+
+@dataclass
+class Lease:
+    product_id: str
+    token: str
+    attempts: int
+    expires_at: float
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+
+class WorkQueue:
+    """Product scrape jobs in a SQLite file shared by a coordinator and any number of worker
+    processes. Workers lease jobs for lease_seconds and keep them with heartbeats; a lease that
+    runs out (crashed or partitioned worker) puts the job back in the queue for someone else."""
+
+    def __init__(self, path: Path, lease_seconds: float = 300, max_attempts: int = 3):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max(1, max_attempts)
+        self._lock = threading.Lock()
+        # Autocommit mode: claim() takes the write lock itself with BEGIN IMMEDIATE
+        self._conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None, check_same_thread=False)
+        # Rollback journal rather than WAL: WAL's shared-memory index only works for processes on
+        # one host, and workers on other machines open this file over a shared filesystem
+        self._conn.execute("PRAGMA journal_mode=DELETE")
+        self._conn.execute("PRAGMA busy_timeout=30000")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                product_id TEXT NOT NULL UNIQUE,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                worker TEXT,
+                lease_token TEXT,
+                lease_expires REAL,
+                enqueued_at REAL NOT NULL,
+                finished_at REAL,
+                error TEXT,
+                result TEXT
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, seq)")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def enqueue(self, product_ids: List[str], reset: bool = False) -> int:
+        """Add jobs; IDs already queued are left alone unless reset, which queues them again."""
+        now = time.time()
+        with self._transaction() as conn:
+            before = conn.total_changes
+            if reset:
+                conn.executemany(
+                    "INSERT INTO jobs (product_id, status, enqueued_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT (product_id) DO UPDATE SET status = excluded.status, attempts = 0, "
+                    "worker = NULL, lease_token = NULL, lease_expires = NULL, finished_at = NULL, "
+                    "error = NULL, enqueued_at = excluded.enqueued_at",
+                    [(str(product_id), PENDING, now) for product_id in product_ids]
+                )
+            else:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO jobs (product_id, status, enqueued_at) VALUES (?, ?, ?)",
+                    [(str(product_id), PENDING, now) for product_id in product_ids]
+                )
+            return conn.total_changes - before
+
+    def requeue_failed(self) -> int:
+        with self._transaction() as conn:
+            return conn.execute(
+                "UPDATE jobs SET status = ?, attempts = 0, error = NULL, worker = NULL WHERE status = ?",
+                (PENDING, FAILED)
+            ).rowcount
+
+    def claim(self, worker_id: str, limit: int = 1) -> List[Lease]:
+        """Lease up to limit pending jobs, oldest first, after reclaiming expired leases."""
+        now = time.time()
+        with self._transaction() as conn:
+            self._expire_leases(conn, now)
+            rows = conn.execute(
+                "SELECT seq, product_id, attempts FROM jobs WHERE status = ? ORDER BY seq LIMIT ?",
+                (PENDING, limit)
+            ).fetchall()
+
+            leases = []
+            for seq, product_id, attempts in rows:
+                lease = Lease(product_id, uuid.uuid4().hex, attempts + 1, now + self.lease_seconds)
+                conn.execute(
+                    "UPDATE jobs SET status = ?, attempts = ?, worker = ?, lease_token = ?, lease_expires = ? "
+                    "WHERE seq = ?",
+                    (LEASED, lease.attempts, worker_id, lease.token, lease.expires_at, seq)
+                )
+                leases.append(lease)
+            return leases
+
+    def heartbeat(self, leases: List[Lease]) -> List[Lease]:
+        """Extend the given leases; returns the ones that were lost to expiry in the meantime."""
+        expires_at = time.time() + self.lease_seconds
+        lost = []
+        with self._transaction() as conn:
+            for lease in leases:
+                updated = conn.execute(
+                    "UPDATE jobs SET lease_expires = ? WHERE product_id = ? AND status = ? AND lease_token = ?",
+                    (expires_at, lease.product_id, LEASED, lease.token)
+                ).rowcount
+                if updated:
+                    lease.expires_at = expires_at
+                else:
+                    lost.append(lease)
+        return lost
+
+    def complete(self, lease: Lease, product: ProductData) -> bool:
+        """Store the scraped product. A product with an error goes back to the queue until its
+        attempts run out. Returns False when the lease had already been lost to another worker."""
+        record = json.dumps(product_to_dict(product), ensure_ascii=False)
+        retry = bool(product.error) and lease.attempts < self.max_attempts
+        status = PENDING if retry else (FAILED if product.error else DONE)
+
+        with self._transaction() as conn:
+            return conn.execute(
+                "UPDATE jobs SET status = ?, worker = NULL, lease_token = NULL, lease_expires = NULL, "
+                "finished_at = ?, error = ?, result = ? WHERE product_id = ? AND status = ? AND lease_token = ?",
+                (status, time.time(), product.error, record, lease.product_id, LEASED, lease.token)
+            ).rowcount == 1
+
+    def release(self, leases: List[Lease]) -> int:
+        """Hand unfinished jobs back without counting the attempt, e.g. on a clean shutdown."""
+        with self._transaction() as conn:
+            return sum(
+                conn.execute(
+                    "UPDATE jobs SET status = ?, attempts = attempts - 1, worker = NULL, lease_token = NULL, "
+                    "lease_expires = NULL WHERE product_id = ? AND status = ? AND lease_token = ?",
+                    (PENDING, lease.product_id, LEASED, lease.token)
+                ).rowcount
+                for lease in leases
+            )
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        counts = {PENDING: 0, LEASED: 0, DONE: 0, FAILED: 0}
+        counts.update(dict(rows))
+        return counts
+
+    def workers(self) -> Dict[str, int]:
+        """Jobs currently leased per worker."""
+        with self._lock:
+            return dict(self._conn.execute(
+                "SELECT worker, COUNT(*) FROM jobs WHERE status = ? GROUP BY worker", (LEASED,)
+            ).fetchall())
+
+    def results(self) -> Iterator[Dict[str, Any]]:
+        """Finished product records (including those that failed for good) in enqueue order."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT result FROM jobs WHERE status IN (?, ?) AND result IS NOT NULL ORDER BY seq", (DONE, FAILED)
+            ).fetchall()
+        for (record,) in rows:
+            yield json.loads(record)
+
+    def _expire_leases(self, conn: sqlite3.Connection, now: float):
+        # A job whose last lease ran out after its final attempt is not handed out again
+        conn.execute(
+            "UPDATE jobs SET status = ?, worker = NULL, lease_token = NULL, lease_expires = NULL, "
+            "error = COALESCE(error, 'lease expired') WHERE status = ? AND lease_expires < ? AND attempts >= ?",
+            (FAILED, LEASED, now, self.max_attempts)
+        )
+        conn.execute(
+            "UPDATE jobs SET status = ?, worker = NULL, lease_token = NULL, lease_expires = NULL "
+            "WHERE status = ? AND lease_expires < ?",
+            (PENDING, LEASED, now)
+        )
+
+
+class LeaseKeeper:
+    """Background heartbeat for the leases a worker currently holds."""
+
+    def __init__(self, work_queue: WorkQueue, interval: Optional[float] = None):
+        self.queue = work_queue
+        self.interval = interval or max(1.0, work_queue.lease_seconds / 3)
+        self.leases: Dict[str, Lease] = {}
+        self.lost: List[Lease] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='lease-heartbeat', daemon=True)
+
+    def start(self) -> 'LeaseKeeper':
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def add(self, leases: List[Lease]):
+        with self._lock:
+            for lease in leases:
+                self.leases[lease.product_id] = lease
+
+    def pop(self, product_id: str) -> Optional[Lease]:
+        with self._lock:
+            return self.leases.pop(product_id, None)
+
+    def held(self) -> List[Lease]:
+        with self._lock:
+            return list(self.leases.values())
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            held = self.held()
+            if not held:
+                continue
+            try:
+                lost = self.queue.heartbeat(held)
+            except Exception as e:
+                print(f"Heartbeat failed: {e}", file=sys.stderr)
+                continue
+            for lease in lost:
+                print(f"Lost lease on {lease.product_id}; another worker will retry it", file=sys.stderr)
+                self.pop(lease.product_id)
+                self.lost.append(lease)
@@ -0,0 +1,13 @@
+import pytest
+
+from src.types import ProductData, ProductDimensions
+
+
+@pytest.fixture
+def product():
+    """Factory for scraped products; raw_text adds parsed dimensions, e.g. a failed parse's 'Error ...'."""
+    def make(product_id, error=None, raw_text=None):
+        dimensions = ProductDimensions(width=10.0, raw_text=raw_text) if raw_text is not None else None
+        return ProductData(product_id=product_id, url=f"https://example.test/{product_id}",
+                           product_name=f"Product {product_id}", images=[], dimensions=dimensions, error=error)
+    return make
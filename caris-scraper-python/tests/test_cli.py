@@ -0,0 +1,50 @@
+import json
+import sys
+
+import cli
+from src.types import ProductData
+
+
+class FakeScraper:
+    def __init__(self, config):
+        self.dimension_cache = None
+
+    def init(self):
+        pass
+
+    def close(self):
+        pass
+
+    def scrape_products_with_ai(self, product_inputs, on_result=None, collect=True):
+        products = [ProductData(product_id=item.product_id, url=f"https://example.test/{item.product_id}",
+                                product_name=f"Product {item.product_id}", images=[])
+                    for item in product_inputs]
+        for product in products:
+            on_result(product)
+        return products if collect else []
+
+
+def run_cli(monkeypatch, *args):
+    monkeypatch.setattr(cli, 'CarisScraperWithAI', FakeScraper)
+    monkeypatch.setattr(sys, 'argv', ['cli.py', *args])
+    cli.main()
+
+
+def output_ids(path):
+    return [record['productId'] for record in json.loads(path.read_text(encoding='utf-8'))]
+
+
+def test_stream_run_starts_a_new_checkpoint(tmp_path, monkeypatch):
+    output = tmp_path / 'result.json'
+    run_cli(monkeypatch, '--stream', '--output', str(output), 'A', 'B')
+    run_cli(monkeypatch, '--stream', '--output', str(output), 'C')
+
+    assert output_ids(output) == ['C']
+
+
+def test_resume_keeps_the_checkpoint(tmp_path, monkeypatch):
+    output = tmp_path / 'result.json'
+    run_cli(monkeypatch, '--stream', '--output', str(output), 'A', 'B')
+    run_cli(monkeypatch, '--resume', '--output', str(output), 'A', 'B', 'C')
+
+    assert output_ids(output) == ['A', 'B', 'C']
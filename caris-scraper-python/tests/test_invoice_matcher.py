@@ -0,0 +1,104 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from src.invoice_matcher import (InvoiceMatcher, code_similarity, invoice_entry, match_report, normalize_code,
+                                 normalize_text, split_product_name)
+
+
+PROJECT_DIR = Path(__file__).parent.parent
+INVOICE = PROJECT_DIR / 'invoice01.json'
+CATALOG = PROJECT_DIR.parent / 'categories' / 'productsraw.json'
+
+PRODUCTS = [
+    {'productId': '821', 'productName': 'HAMPTON / HMP 03'},
+    {'productId': '822', 'productName': 'HAMPTON / HMP 01'},
+    {'productId': '818', 'productName': 'NORTON / NRT 01'},
+    {'productId': '61', 'productName': 'LİV / LIV 01'},
+    {'productId': '692', 'productName': 'LİV CAPITONE / LIV 02'},
+    {'productId': '1139', 'productName': 'MATİZ / MTZ 02'},
+    {'productId': '1140', 'productName': 'MATIZ / MTZ 02'},
+    {'productId': '900', 'productName': 'ZUCA / ELYOS'},
+    {'productId': '901', 'productName': None},
+]
+
+
+def line(code, name, **fields):
+    return {'invoiceCode': code, 'invoiceName': name, **fields}
+
+
+def test_normalization():
+    assert normalize_text('Lïv  capitone-Berjer') == 'LIV CAPITONE BERJER'
+    assert normalize_text('MATİZ ılık') == 'MATIZ ILIK'
+    assert normalize_code('hmp-03') == normalize_code('HMP 03') == 'HMP03'
+    assert split_product_name('HAMPTON / HMP 03') == ('HAMPTON', 'HMP03')
+    assert split_product_name('ZUCA / ELYOS') == ('ZUCA ELYOS', '')
+    assert split_product_name(None) == ('', '')
+
+
+def test_code_similarity_keeps_model_numbers_apart():
+    assert code_similarity('HMP03', 'HMP03') == 1.0
+    assert code_similarity('HMP01', 'HMP03') < 0.5
+    # Invoices and the storefront abbreviate series differently
+    assert code_similarity('RST01', 'RUS01') > code_similarity('RST01', 'HMP01')
+
+
+def test_matches_by_code_and_name():
+    matcher = InvoiceMatcher.from_dicts(PRODUCTS)
+
+    assert matcher.match(line('HMP01', 'HAMPTON CHAIR')).product_id == '822'
+    assert matcher.match(line('HMP03', 'HAMPTON BERGER')).product_id == '821'
+    assert matcher.match(line('LIV02', 'LIV BERGER')).product_id == '692'
+    assert matcher.match(line(None, 'ZUCA ELYOS CHAIR')).product_id == '900'
+
+
+def test_weak_and_ambiguous_matches_are_reported():
+    matcher = InvoiceMatcher.from_dicts(PRODUCTS)
+    results = matcher.match_all([
+        line('XYZ99', 'QWERTY TABLE'),
+        line('MTZ02', 'MATIZ DOUBLE COUCH'),
+        line('NRT01', 'NORTON CHAIR'),
+    ])
+
+    unmatched, ambiguous, exact = results
+    assert unmatched.product_id is None
+    # Two catalog products share the name and code; either is right but a person should check
+    assert ambiguous.product_id in ('1139', '1140') and matcher.needs_review(ambiguous)
+    assert exact.product_id == '818' and not matcher.needs_review(exact)
+
+    report = match_report(matcher, results)
+    assert (report['lines'], report['matched']) == (3, 2)
+    assert [entry['invoiceCode'] for entry in report['unmatched']] == ['XYZ99']
+    assert [entry['invoiceCode'] for entry in report['review']] == ['MTZ02']
+
+
+def test_invoice_entry_keeps_the_invoice01_layout():
+    matcher = InvoiceMatcher.from_dicts(PRODUCTS)
+    entry = invoice_entry(matcher.match(line('HMP03', 'HAMPTON BERGER', listPrice=470, productId=None,
+                                             confidence=0.1, notes='')))
+
+    assert list(entry) == ['invoiceCode', 'productId', 'productName', 'invoiceName', 'listPrice', 'notes',
+                           'confidence']
+    assert (entry['productId'], entry['productName'], entry['confidence']) == ('821', 'HAMPTON / HMP 03', 1.0)
+
+
+@pytest.mark.skipif(not CATALOG.exists(), reason='needs the scraped catalog in categories/productsraw.json')
+def test_invoice01_against_the_scraped_catalog():
+    with open(INVOICE, 'r', encoding='utf-8') as f:
+        lines = json.load(f)
+    with open(CATALOG, 'r', encoding='utf-8') as f:
+        products = json.load(f)
+    names = {str(product['productId']): product.get('productName') for product in products}
+    matcher = InvoiceMatcher.from_dicts(products)
+    results = matcher.match_all(lines)
+
+    assert match_report(matcher, results)['matched'] == len(lines)
+    # Where the hand-made mapping points at a product carrying the invoice's own code, the matcher agrees
+    checked = 0
+    for invoice_line, result in zip(lines, results):
+        expected = str(invoice_line['productId']) if invoice_line.get('productId') else None
+        if expected and split_product_name(names.get(expected))[1] == normalize_code(invoice_line['invoiceCode']):
+            assert result.product_id == expected or matcher.needs_review(result), invoice_line['invoiceCode']
+            checked += 1
+    assert checked >= 25
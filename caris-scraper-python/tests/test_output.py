@@ -0,0 +1,65 @@
+import json
+
+from src.output import NdjsonWriter, compact_ndjson, completed_ids, read_ndjson
+
+
+def write_checkpoint(path, products, append=False):
+    writer = NdjsonWriter(str(path), append=append)
+    for item in products:
+        writer.write(item)
+    writer.close()
+
+
+def test_completed_ids_skips_errors_and_failed_dimension_parses(tmp_path, product):
+    path = tmp_path / 'checkpoint.ndjson'
+    write_checkpoint(path, [
+        product('1'),
+        product('2', error='Timeout'),
+        product('3', raw_text='Error: Claude CLI timed out'),
+        product('4', raw_text='W 10 x H 20'),
+    ])
+
+    assert completed_ids(str(path)) == {'1', '4'}
+
+
+def test_completed_ids_takes_the_last_record_per_id(tmp_path, product):
+    path = tmp_path / 'checkpoint.ndjson'
+    write_checkpoint(path, [
+        product('1', raw_text='Error: no image'),
+        product('1', raw_text='W 10 x H 20'),
+        product('2'),
+        product('2', error='Browser crashed'),
+    ])
+
+    assert completed_ids(str(path)) == {'1'}
+
+
+def test_partial_trailing_line_is_ignored_and_not_appended_to(tmp_path, product):
+    path = tmp_path / 'checkpoint.ndjson'
+    write_checkpoint(path, [product('1')])
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"productId": "2", "url"')
+
+    assert [record['productId'] for record in read_ndjson(str(path))] == ['1']
+
+    write_checkpoint(path, [product('3')], append=True)
+    assert [record['productId'] for record in read_ndjson(str(path))] == ['1', '3']
+
+
+def test_new_checkpoint_replaces_the_previous_one(tmp_path, product):
+    path = tmp_path / 'checkpoint.ndjson'
+    write_checkpoint(path, [product('1'), product('2')])
+    write_checkpoint(path, [product('3')])
+
+    assert [record['productId'] for record in read_ndjson(str(path))] == ['3']
+
+
+def test_compact_ndjson_keeps_the_last_record_per_id(tmp_path, product):
+    path = tmp_path / 'checkpoint.ndjson'
+    output_path = tmp_path / 'result.json'
+    write_checkpoint(path, [product('1', error='Timeout'), product('2'), product('1')])
+
+    assert compact_ndjson(str(path), str(output_path)) == 2
+    records = json.loads(output_path.read_text(encoding='utf-8'))
+    assert [record['productId'] for record in records] == ['1', '2']
+    assert [record['error'] for record in records] == [None, None]
@@ -0,0 +1,98 @@
+import pytest
+
+from src.parser_service import FakeParserWorker, ParserService, ParseTimeout, PrewarmedClaudeWorker
+
+
+class TrackingWorker(FakeParserWorker):
+    def __init__(self, respond, latency=0.0):
+        super().__init__(respond, latency)
+        self.stopped = False
+
+    def stop(self):
+        self.stopped = True
+
+
+def factory(latencies, respond=str.upper):
+    """Worker factory handing out workers with the given latencies in turn, the last one repeating."""
+    workers = []
+
+    def create():
+        worker = TrackingWorker(respond, latencies[min(len(workers), len(latencies) - 1)])
+        workers.append(worker)
+        return worker
+    return create, workers
+
+
+def test_deadline_starts_when_a_worker_picks_the_job_up():
+    create, workers = factory([0.2])
+    service = ParserService(create, size=1, timeout=0.3)
+    # Queued together, the last job waits 0.4s before it runs: longer than the timeout
+    futures = [service.submit(f"job {index}") for index in range(3)]
+
+    assert [future.result(timeout=5) for future in futures] == ['JOB 0', 'JOB 1', 'JOB 2']
+    service.close()
+    assert service.stats == {'jobs': 3, 'failed': 0, 'timeouts': 0, 'recycled': 0}
+    assert len(workers) == 1
+
+
+def test_timed_out_worker_is_stopped_and_replaced():
+    create, workers = factory([1.0, 0.0])
+    service = ParserService(create, size=1, timeout=0.1)
+
+    with pytest.raises(ParseTimeout):
+        service.run('slow')
+    assert service.run('fast') == 'FAST'
+    service.close()
+
+    assert service.stats == {'jobs': 1, 'failed': 0, 'timeouts': 1, 'recycled': 1}
+    assert len(workers) == 2
+    assert workers[0].stopped and workers[0].jobs == 0
+    assert workers[1].jobs == 1
+
+
+def test_failing_worker_is_replaced():
+    def respond(prompt):
+        if prompt == 'bad':
+            raise ValueError('broken pipe')
+        return prompt
+
+    create, workers = factory([0.0], respond)
+    service = ParserService(create, size=1)
+
+    with pytest.raises(ValueError):
+        service.run('bad')
+    assert service.run('good') == 'good'
+    service.close()
+
+    assert service.stats['failed'] == 1 and service.stats['recycled'] == 1
+    assert len(workers) == 2 and workers[0].stopped
+
+
+def test_workers_are_recycled_after_max_jobs():
+    create, workers = factory([0.0])
+    service = ParserService(create, size=1, max_jobs_per_worker=2)
+
+    assert [service.run(f"job {index}") for index in range(5)] == [f"JOB {index}" for index in range(5)]
+    service.close()
+
+    assert service.stats == {'jobs': 5, 'failed': 0, 'timeouts': 0, 'recycled': 2}
+    assert [worker.jobs for worker in workers] == [2, 2, 1]
+    assert all(worker.stopped for worker in workers)
+
+
+def test_prewarmed_worker_skips_the_spare_process_on_its_last_job():
+    started = []
+
+    class CountingWorker(PrewarmedClaudeWorker):
+        def start(self):
+            super().start()
+            started.append(self.process)
+
+    service = ParserService(lambda: CountingWorker(['cat']), size=1, max_jobs_per_worker=2)
+
+    assert [service.run('first'), service.run('second')] == ['first', 'second']
+    service.close()
+
+    # One process at startup and one spare booted during the first job; none after the second
+    assert len(started) == 2
+    assert all(process.poll() is not None for process in started)
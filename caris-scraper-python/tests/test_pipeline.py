@@ -0,0 +1,86 @@
+import threading
+from src.pipeline import ProductPipeline
+from src.tracing import Tracer
+from src.types import ProductData, ProductDimensions, ProductInput, ScraperConfig
+
+
+class FakeScraper:
+    def __init__(self, config):
+        self.config = config
+        self.tracer = Tracer(enabled=False)
+
+    def scrape_products(self, product_inputs, on_result=None):
+        for product_input in product_inputs:
+            on_result(ProductData(product_id=product_input.product_id, url='', product_name='',
+                                  images=[], dimensions_image=f"dims-{product_input.product_id}.jpg"))
+
+
+class FakeImage:
+    dimensions = None
+
+
+class FakeParser:
+    def download(self, url):
+        return FakeImage()
+
+    def parse_downloaded(self, image):
+        return ProductDimensions(width=50.0)
+
+
+class FailingStateStore:
+    def unchanged_dimensions(self, product):
+        return None
+
+    def save(self, product):
+        if product.product_id == '3':
+            raise Exception('database is locked')
+
+
+def run_with_timeout(pipeline, product_inputs, **kwargs):
+    outcome = {}
+    thread = threading.Thread(target=lambda: outcome.update(results=pipeline.run(product_inputs, **kwargs)),
+                              daemon=True)
+    thread.start()
+    thread.join(timeout=10)
+    assert not thread.is_alive(), 'pipeline deadlocked'
+    return outcome['results']
+
+
+def test_failing_handlers_do_not_stall_the_pipeline(capsys):
+    config = ScraperConfig(queue_size=1, download_workers=1, parse_workers=1, parse_batch_wait=0.01)
+    pipeline = ProductPipeline(FakeScraper(config), FakeParser(), state_store=FailingStateStore())
+    delivered = []
+
+    def on_result(product):
+        if product.product_id == '5':
+            raise Exception('disk full')
+        delivered.append(product.product_id)
+
+    product_inputs = [ProductInput(str(i)) for i in range(20)]
+    results = run_with_timeout(pipeline, product_inputs, on_result=on_result)
+
+    assert [product.product_id for product in results] == [str(i) for i in range(20)]
+    assert all(product.dimensions.width == 50.0 for product in results)
+    assert sorted(delivered, key=int) == [str(i) for i in range(20) if i != 5]
+    errors = capsys.readouterr().err
+    assert 'product 3: database is locked' in errors
+    assert 'product 5: disk full' in errors
+
+
+def test_parse_skips_the_page_stage():
+    class NoPages(FakeScraper):
+        def scrape_products(self, product_inputs, on_result=None):
+            raise AssertionError('pages must not be loaded')
+
+    config = ScraperConfig(download_workers=1, parse_workers=1, parse_batch_wait=0.01)
+    pipeline = ProductPipeline(NoPages(config), FakeParser())
+    products = [
+        ProductData(product_id='1', url='', product_name='', images=[], dimensions_image='dims-1.jpg'),
+        ProductData(product_id='2', url='', product_name='', images=[], error='Timeout'),
+    ]
+
+    results = pipeline.parse(products)
+
+    assert [product.product_id for product in results] == ['1', '2']
+    assert results[0].dimensions.width == 50.0
+    assert results[1].dimensions is None
@@ -0,0 +1,111 @@
+import json
+import pytest
+from src.publish import MANIFEST_NAME, ProductBundle
+from src.snapshot_diff import SnapshotDiff, SnapshotIndex
+
+
+def catalog(count, name='Product'):
+    return [{'productId': str(i), 'productName': f"{name} {i}", 'images': [f"img-{i}.jpg"]} for i in range(1, count + 1)]
+
+
+def published(output_dir):
+    bundle = ProductBundle(output_dir)
+    manifest = bundle.load_manifest()
+    products = {}
+    for chunk in manifest['chunks']:
+        for product in bundle.read_chunk(chunk['file']):
+            products[product['productId']] = product
+    assert set(manifest['index']) == set(products)
+    return products
+
+
+def chunk_files(output_dir):
+    return sorted(path.name for path in output_dir.iterdir() if path.name != MANIFEST_NAME)
+
+
+def test_publish_replaces_bundle_and_skips_unchanged_chunks(tmp_path):
+    bundle = ProductBundle(tmp_path, chunk_size=10)
+    assert bundle.publish(catalog(25)) == {'written': 3, 'unchanged': 0, 'removed': 0}
+    assert bundle.publish(catalog(25)) == {'written': 0, 'unchanged': 3, 'removed': 0}
+
+    # Bucket 0 loses products 6-9 and is rewritten; the other two buckets are gone
+    assert bundle.publish(catalog(5)) == {'written': 1, 'unchanged': 0, 'removed': 3}
+    assert sorted(published(tmp_path), key=int) == [str(i) for i in range(1, 6)]
+
+
+def test_merge_updates_only_touched_chunks(tmp_path):
+    bundle = ProductBundle(tmp_path, chunk_size=10)
+    bundle.publish(catalog(25))
+    before = chunk_files(tmp_path)
+
+    counts = bundle.publish([{'productId': '12', 'productName': 'Renamed', 'images': []}], merge=True)
+
+    assert counts == {'written': 1, 'unchanged': 2, 'removed': 1}
+    products = published(tmp_path)
+    assert len(products) == 25
+    assert products['12']['productName'] == 'Renamed'
+    assert len(set(before) & set(chunk_files(tmp_path))) == 2
+
+
+def test_merge_with_new_chunk_size_keeps_the_catalog(tmp_path):
+    ProductBundle(tmp_path, chunk_size=10).publish(catalog(25))
+
+    ProductBundle(tmp_path, chunk_size=4).publish([{'productId': '3', 'productName': 'Renamed', 'images': []}], merge=True)
+
+    products = published(tmp_path)
+    assert len(products) == 25
+    assert products['3']['productName'] == 'Renamed'
+    manifest = json.loads((tmp_path / MANIFEST_NAME).read_text())
+    assert manifest['chunkSize'] == 4
+    assert len(manifest['chunks']) == 7
+
+
+def test_merge_removes_ids_and_drops_emptied_chunks(tmp_path):
+    bundle = ProductBundle(tmp_path, chunk_size=10)
+    bundle.publish(catalog(25))
+
+    bundle.publish([], merge=True, remove=['5'] + [str(i) for i in range(20, 26)])
+
+    products = published(tmp_path)
+    assert '5' not in products and '21' not in products
+    assert len(products) == 18
+    assert len(chunk_files(tmp_path)) == 2
+
+
+def test_gzip_chunks_are_reproducible(tmp_path):
+    first, second = tmp_path / 'a', tmp_path / 'b'
+    ProductBundle(first, compress=True).publish(catalog(30))
+    ProductBundle(second, compress=True).publish(catalog(30))
+    assert chunk_files(first) == chunk_files(second)
+    assert all(name.endswith('.json.gz') for name in chunk_files(first))
+    assert (first / chunk_files(first)[0]).read_bytes() == (second / chunk_files(second)[0]).read_bytes()
+
+
+def test_apply_changes_matches_a_full_publish(tmp_path):
+    previous = catalog(25)
+    current = [dict(p, productName='Renamed') if p['productId'] == '12' else p for p in previous if p['productId'] != '3']
+    current.append({'productId': '31', 'productName': 'New', 'images': []})
+    changelog = SnapshotDiff(SnapshotIndex.build(previous)).feed_all(current).changelog()
+
+    incremental, full = tmp_path / 'incremental', tmp_path / 'full'
+    bundle = ProductBundle(incremental, chunk_size=10)
+    bundle.publish(previous)
+    counts = bundle.apply_changes(changelog)
+    ProductBundle(full, chunk_size=10).publish(current)
+
+    # Buckets 0 and 1 change and bucket 3 is new; bucket 2 is left alone
+    assert counts == {'written': 3, 'unchanged': 1, 'removed': 2}
+    assert chunk_files(incremental) == chunk_files(full)
+    assert published(incremental) == published(full)
+
+
+def test_apply_changes_needs_the_previous_bundle(tmp_path):
+    changelog = SnapshotDiff(SnapshotIndex.build(catalog(3))).feed_all(
+        [{'productId': '2', 'productName': 'Renamed', 'images': ['img-2.jpg']}]).changelog()
+
+    with pytest.raises(Exception, match='publish the full snapshot first'):
+        ProductBundle(tmp_path).apply_changes(changelog)
+
+    ProductBundle(tmp_path).publish(catalog(1))
+    with pytest.raises(Exception, match='not in the bundle'):
+        ProductBundle(tmp_path).apply_changes(changelog)
@@ -0,0 +1,90 @@
+import pytest
+from src.http_extractor import HttpProductExtractor
+from src.rate_limiter import PermanentError, RequestScheduler, TransientError
+from src.types import ScraperConfig
+
+
+def test_token_bucket_allows_a_burst_then_paces():
+    scheduler = RequestScheduler(rate_per_host=10, burst=2, max_concurrency=8)
+    assert scheduler._try_acquire('host') == 0
+    assert scheduler._try_acquire('host') == 0
+    assert scheduler._try_acquire('host') == pytest.approx(0.1, abs=0.01)
+
+
+def test_concurrency_limit_holds_requests_back():
+    scheduler = RequestScheduler(rate_per_host=100, burst=10, max_concurrency=1)
+    assert scheduler._try_acquire('host') == 0
+    assert scheduler._try_acquire('host') > 0
+    scheduler._release('host', 0.01, None)
+    assert scheduler._try_acquire('host') == 0
+
+
+def test_throttling_halves_limits_and_successes_recover_them():
+    scheduler = RequestScheduler(rate_per_host=8, burst=10, max_concurrency=8, target_latency=1.0)
+    scheduler._try_acquire('host')
+    scheduler._release('host', 0.1, TransientError('HTTP 429', status=429, retry_after=30))
+    assert scheduler.concurrency_limit('host') == 4
+    assert scheduler._hosts['host'].rate == 4
+    assert scheduler._try_acquire('host') > 25
+
+    state = scheduler._hosts['host']
+    state.blocked_until = 0
+    for _ in range(40):
+        scheduler._release('host', 0.1, None)
+    assert scheduler.concurrency_limit('host') == 8
+    assert state.rate == 8
+
+
+def test_slow_responses_back_off_too():
+    scheduler = RequestScheduler(max_concurrency=8, target_latency=1.0)
+    scheduler._release('host', 2.5, None)
+    assert scheduler.concurrency_limit('host') == 4
+
+
+def test_transient_failures_are_retried_without_a_dead_letter():
+    scheduler = RequestScheduler(max_retries=3, base_delay=0)
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise TransientError('HTTP 503', status=503)
+        return 'ok'
+
+    assert scheduler.call('https://example.test/1', flaky) == 'ok'
+    assert scheduler.retries == 2
+    assert scheduler.dead_letters == []
+
+
+def test_final_failures_are_dead_lettered_unless_the_caller_has_a_fallback():
+    scheduler = RequestScheduler(max_retries=1, base_delay=0)
+
+    def broken():
+        raise PermanentError('HTTP 404')
+
+    with pytest.raises(PermanentError):
+        scheduler.call('https://example.test/1', broken, dead_letter=False)
+    assert scheduler.dead_letters == []
+
+    with pytest.raises(PermanentError):
+        scheduler.call('https://example.test/2', broken)
+    assert [letter.key for letter in scheduler.dead_letters] == ['https://example.test/2']
+
+
+def test_http_fast_path_failure_leaves_no_dead_letter(monkeypatch):
+    config = ScraperConfig(base_url='https://example.test/product=', engine='http')
+    scheduler = RequestScheduler(max_retries=1, base_delay=0)
+    extractor = HttpProductExtractor(config, scheduler)
+
+    def unavailable(url):
+        raise TransientError(f"HTTP 503 for {url}", status=503)
+    monkeypatch.setattr(extractor, '_get', unavailable)
+
+    # The browser fallback takes over; only its own failure would be a dead letter
+    assert extractor.extract_complete('822') is None
+    assert scheduler.dead_letters == []
+
+    with pytest.raises(TransientError):
+        extractor.extract('822')
+    assert len(scheduler.dead_letters) == 1
+    extractor.close()
@@ -0,0 +1,90 @@
+import json
+import math
+import pytest
+from src.claude_parser import ClaudeImageParser
+from src.record_store import ProductTable, open_table, save_table, to_number
+
+
+PRODUCTS = [
+    {
+        'productId': '821',
+        'url': 'https://example.test/821',
+        'productName': 'HAMPTON / HMP 03',
+        'images': ['a.jpg', 'b.jpg'],
+        'dimensionsImage': 'dims.jpg',
+        'error': None,
+        'dimensions': {
+            'width': 55, 'height': 82.5, 'floor_to_chair_height_cm': 47, 'depth': 60, 'weight': 6.5,
+            'boxWidth': None, 'boxHeight': None, 'boxDepth': None, 'qtyPerBox': 2, 'rawText': '{"width_cm": 55}'
+        },
+        'pageStats': {'elapsedMs': 812, 'bytesReceived': 120331, 'requestsCompleted': 14, 'requestsBlocked': {}},
+        'thumbnails': [{'width': 1000, 'height': 1000, 'derivatives': []}, None]
+    },
+    {
+        'productId': '822',
+        'url': 'https://example.test/822',
+        'productName': 'ÇAĞLA',
+        'images': [],
+        'dimensionsImage': None,
+        'error': 'Error scraping product 822: timeout'
+    },
+    {
+        'productId': '823',
+        'url': 'https://example.test/823',
+        'productName': '',
+        'images': ['c.jpg'],
+        'dimensionsImage': 'dims.jpg',
+        'error': None,
+        'dimensions': {
+            'width': None, 'height': None, 'floor_to_chair_height_cm': None, 'depth': None, 'weight': None,
+            'boxWidth': None, 'boxHeight': None, 'boxDepth': None, 'qtyPerBox': None,
+            'rawText': 'Error parsing image: timeout'
+        }
+    },
+]
+
+
+@pytest.mark.parametrize('file_name', ['catalog.rec', 'catalog.json'])
+def test_round_trip_keeps_every_field(tmp_path, file_name):
+    path = str(tmp_path / file_name)
+    save_table(ProductTable.from_dicts(PRODUCTS), path)
+    assert open_table(path).to_dicts() == PRODUCTS
+
+
+def test_parquet_round_trip(tmp_path):
+    pytest.importorskip('pyarrow')
+    path = str(tmp_path / 'catalog.parquet')
+    save_table(ProductTable.from_dicts(PRODUCTS), path)
+    assert open_table(path).to_dicts() == PRODUCTS
+
+
+def test_filters_on_mapped_columns(tmp_path):
+    path = str(tmp_path / 'catalog.rec')
+    ProductTable.from_dicts(PRODUCTS).save(path)
+    table = ProductTable.load(path)
+
+    assert table.where('width', 50, 60) == [0]
+    assert table.where('width') == [0]
+    assert table.contains('product_name', 'çağ') == [1]
+    assert table.record(0).images == ('a.jpg', 'b.jpg')
+    assert [record['productId'] for record in table.take([2, 0]).to_dicts()] == ['823', '821']
+
+
+def test_to_number_reads_strings_and_units():
+    assert to_number('55') == 55.0
+    assert to_number('6,5 kg') == 6.5
+    assert to_number(3) == 3.0
+    assert math.isnan(to_number('n/a'))
+    assert math.isnan(to_number(None))
+
+
+def test_parsed_answers_are_stored_as_numbers():
+    parser = ClaudeImageParser(downloader=object())
+    answer = json.dumps({'width_cm': '55', 'height_cm': 82, 'weight_kg': '6.5 kg', 'qty_per_box': '2',
+                         'depth_cm': None, 'box_width_cm': 'unknown'})
+
+    dimensions = parser._dimensions_from_response(answer)
+
+    assert (dimensions.width, dimensions.height, dimensions.weight) == (55.0, 82.0, 6.5)
+    assert dimensions.qty_per_box == 2 and isinstance(dimensions.qty_per_box, int)
+    assert dimensions.depth is None and dimensions.box_width is None
@@ -0,0 +1,59 @@
+import json
+import sys
+
+import refresh
+from src.types import ProductDimensions
+
+
+class FakeScraper:
+    parsed = []
+
+    def __init__(self, config, state_store=None, tracer=None):
+        pass
+
+    def init(self):
+        raise AssertionError('the parse stage needs no browser')
+
+    def close(self):
+        pass
+
+    def parse_products(self, products, on_result=None):
+        for product in products:
+            product.dimensions = ProductDimensions(width=50.0, raw_text='{"width_cm": 50}')
+            on_result(product)
+        FakeScraper.parsed = [product.product_id for product in products]
+        return products
+
+
+def record(product_id, **fields):
+    return {'productId': product_id, 'url': f"https://example.test/{product_id}", 'productName': f"P {product_id}",
+            'images': [], 'dimensionsImage': f"dims-{product_id}.jpg", 'error': None, **fields}
+
+
+def test_parse_stage_reparses_missing_and_failed_dimensions(tmp_path, monkeypatch):
+    output = tmp_path / 'result.json'
+    changelog = tmp_path / 'changes.json'
+    good = {'width': 40.0, 'rawText': '{"width_cm": 40}'}
+    output.write_text(json.dumps([
+        record('1', dimensions=good),
+        record('2', thumbnails=[{'width': 100}]),
+        record('3', dimensions={'rawText': 'Error parsing image: timed out'}),
+        record('4', error='Timeout'),
+    ]), encoding='utf-8')
+
+    monkeypatch.setattr(refresh, 'CarisScraperWithAI', FakeScraper)
+    monkeypatch.setattr(sys, 'argv', ['refresh.py', '--stages', 'parse', '--output', str(output),
+                                      '--changelog', str(changelog)])
+    refresh.main()
+
+    assert FakeScraper.parsed == ['2', '3']
+    records = {item['productId']: item for item in json.loads(output.read_text(encoding='utf-8'))}
+    assert records['1']['dimensions'] == good
+    assert records['2']['dimensions']['width'] == 50.0
+    assert records['2']['thumbnails'] == [{'width': 100}]
+    assert records['3']['dimensions']['width'] == 50.0
+    assert 'dimensions' not in records['4']
+
+    changes = json.loads(changelog.read_text(encoding='utf-8'))
+    assert (changes['from'], changes['to']) == ('result.json', 'result.json')
+    assert [change['productId'] for change in changes['changed']] == ['2', '3']
@@ -0,0 +1,36 @@
+import threading
+
+from src import scraper as scraper_module
+from src.scraper import CarisScraper, _SessionLost
+from src.types import ProductInput, ScraperConfig
+
+
+class FakeSession:
+    closed = threading.Event()
+
+    def __init__(self, config, resource_filter, tracer):
+        self.stats = {}
+
+    def close(self):
+        FakeSession.closed.set()
+
+
+def test_product_requeued_after_other_workers_exit_is_still_scraped(monkeypatch, product):
+    monkeypatch.setattr(scraper_module, 'BrowserSession', FakeSession)
+    monkeypatch.setattr(FakeSession, 'closed', threading.Event())
+    lost = []
+
+    def extract_in_session(self, session, product_id):
+        if product_id == '1' and not lost:
+            lost.append(session)
+            # Give up only once another worker has run out of work and shut down
+            assert FakeSession.closed.wait(5)
+            raise _SessionLost('Browser crashed 6 times')
+        return product(product_id)
+
+    monkeypatch.setattr(CarisScraper, '_extract_in_session', extract_in_session)
+    result = CarisScraper(ScraperConfig(workers=2)).scrape_products([ProductInput('1'), ProductInput('2')])
+
+    assert [product.product_name for product in result.data] == ['Product 1', 'Product 2']
+    assert [product.error for product in result.data] == [None, None]
+    assert result.errors == ['Worker failed: Browser crashed 6 times']
@@ -0,0 +1,116 @@
+import json
+
+import pytest
+
+from src import snapshot_diff
+from src.snapshot_diff import (SnapshotDiff, SnapshotIndex, apply_changelog, diff_snapshots, iter_json_array,
+                               touched_ids)
+
+
+def product(product_id, name=None, images=None, **fields):
+    record = {'productId': product_id, 'productName': name or f"Product {product_id}",
+              'images': images if images is not None else [f"{product_id}.jpg"]}
+    record.update(fields)
+    return record
+
+
+PREVIOUS = [
+    product('1', pageStats={'elapsedMs': 800}),
+    product('2'),
+    product('3', dimensions={'width': 50}),
+    product('10'),
+]
+CURRENT = [
+    product('1', pageStats={'elapsedMs': 1200}),
+    product('2', name='Renamed 2'),
+    product('3'),
+    product('4', images=[]),
+]
+
+
+def write_json(path, records):
+    path.write_text(json.dumps(records, indent=2, ensure_ascii=False), encoding='utf-8')
+    return str(path)
+
+
+def write_ndjson(path, records):
+    path.write_text(''.join(json.dumps(record) + '\n' for record in records), encoding='utf-8')
+    return str(path)
+
+
+def test_changelog_lists_added_changed_and_removed_products(tmp_path):
+    changelog = diff_snapshots(write_json(tmp_path / 'old.json', PREVIOUS), write_json(tmp_path / 'new.json', CURRENT))
+
+    assert changelog['summary'] == {
+        'added': 1, 'changed': 2, 'removed': 1, 'unchanged': 1,
+        'fields': {'dimensions': 1, 'productName': 1}
+    }
+    assert changelog['added'] == [product('4', images=[])]
+    assert changelog['changed'] == [
+        {'productId': '2', 'fields': {'productName': 'Renamed 2'}},
+        {'productId': '3', 'fields': {}, 'removedFields': ['dimensions']},
+    ]
+    assert changelog['removed'] == ['10']
+    assert (changelog['from'], changelog['to']) == ('old.json', 'new.json')
+
+
+def test_later_ndjson_records_replace_earlier_ones(tmp_path):
+    retried = [product('2', error='Timeout'), product('4')] + CURRENT
+    changelog = diff_snapshots(write_json(tmp_path / 'old.json', PREVIOUS), write_ndjson(tmp_path / 'new.ndjson', retried))
+
+    assert changelog['summary']['added'] == 1 and changelog['summary']['changed'] == 2
+    assert changelog['changed'][0] == {'productId': '2', 'fields': {'productName': 'Renamed 2'}}
+
+
+def test_saved_index_stands_in_for_the_previous_snapshot(tmp_path):
+    previous = write_json(tmp_path / 'old.json', PREVIOUS)
+    index_path = str(tmp_path / 'old.index.json')
+    diff_snapshots(write_json(tmp_path / 'empty.json', []), previous, index_path=index_path)
+
+    from_index = diff_snapshots(index_path, write_json(tmp_path / 'new.json', CURRENT))
+    from_snapshot = diff_snapshots(previous, str(tmp_path / 'new.json'))
+    for key in ('summary', 'added', 'changed', 'removed'):
+        assert from_index[key] == from_snapshot[key]
+    assert len(SnapshotIndex.load(index_path)) == len(PREVIOUS)
+
+
+def test_index_with_another_version_is_rejected(tmp_path):
+    path = tmp_path / 'old.index.json'
+    path.write_text(json.dumps({'version': 99, 'records': {}}), encoding='utf-8')
+    with pytest.raises(Exception, match='Unsupported snapshot index version'):
+        SnapshotIndex.load(str(path))
+
+
+def test_json_array_is_streamed_across_read_chunks(tmp_path, monkeypatch):
+    records = [product(str(i), name=f"ÇAĞLA [{i}], {{x}}", notes='] , [' * i) for i in range(30)]
+    path = write_json(tmp_path / 'result.json', records)
+    monkeypatch.setattr(snapshot_diff, 'READ_CHUNK', 16)
+
+    assert list(iter_json_array(path)) == records
+
+
+def test_truncated_json_array_raises(tmp_path, monkeypatch):
+    path = tmp_path / 'result.json'
+    path.write_text(json.dumps([product('1'), product('2')])[:-20], encoding='utf-8')
+    monkeypatch.setattr(snapshot_diff, 'READ_CHUNK', 16)
+
+    with pytest.raises(Exception, match='ends in the middle of a record'):
+        list(iter_json_array(str(path)))
+
+
+def test_applying_the_changelog_rebuilds_the_current_snapshot():
+    diff = SnapshotDiff(SnapshotIndex.build(PREVIOUS)).feed_all(CURRENT)
+    changelog = diff.changelog()
+    rebuilt = apply_changelog(PREVIOUS, changelog)
+
+    assert [record['productId'] for record in rebuilt] == ['1', '2', '3', '4']
+    # pageStats is volatile, so product 1 keeps the previous run's
+    assert rebuilt[0] == PREVIOUS[0]
+    assert rebuilt[1:] == CURRENT[1:]
+
+
+def test_touched_ids_filters_by_field():
+    changelog = SnapshotDiff(SnapshotIndex.build(PREVIOUS)).feed_all(CURRENT).changelog()
+
+    assert touched_ids(changelog) == {'2', '3', '10'}
+    assert touched_ids(changelog, {'productName'}) == {'2', '10'}
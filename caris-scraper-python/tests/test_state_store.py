@@ -0,0 +1,35 @@
+from src.claude_parser import ClaudeImageParser
+from src.state_store import ProductStateStore, default_state_path
+from src.types import DEFAULT_STORAGE_DIR, ScraperConfig, resolve_storage_dir
+
+
+def test_state_and_images_follow_the_configured_storage_dir(tmp_path):
+    storage_dir = tmp_path / 'nested' / 'storage'
+    config = ScraperConfig(storage_dir=str(storage_dir))
+    assert default_state_path(config) == storage_dir / 'product-state.sqlite'
+
+    parser = ClaudeImageParser(storage_dir=config.storage_path)
+    parser.close()
+    assert (storage_dir / 'dimensions').is_dir()
+
+
+def test_default_storage_dir_does_not_depend_on_the_working_directory(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert resolve_storage_dir() == DEFAULT_STORAGE_DIR == ScraperConfig().storage_path
+    assert (DEFAULT_STORAGE_DIR.parent / 'src' / 'types.py').exists()
+    assert resolve_storage_dir(str(tmp_path)) == tmp_path
+
+
+def test_plan_rescrapes_new_stale_and_failed_products(tmp_path, product):
+    store = ProductStateStore(default_state_path(ScraperConfig(storage_dir=str(tmp_path))))
+    store.save(product('1', raw_text='W 10'))
+    store.save(product('2', error='Timeout'))
+    store.save(product('3', raw_text='Error parsing image: timed out'))
+
+    to_scrape, fresh = store.plan(['1', '2', '3', '4'], ttl_seconds=3600)
+    assert to_scrape == ['2', '3', '4']
+    assert [item.product_id for item in fresh] == ['1']
+
+    to_scrape, fresh = store.plan(['1'], ttl_seconds=-1)
+    assert to_scrape == ['1'] and fresh == []
+    store.close()
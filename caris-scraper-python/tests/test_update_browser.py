@@ -0,0 +1,60 @@
+import json
+import re
+
+from update_browser import DATA_PATTERN, publish_external, update_html_with_data
+
+TEMPLATE = """<script>
+        // JSON_DATA_PLACEHOLDER - This will be replaced by the Python script
+        const productData = {data};
+
+        // PRODUCT_DATA_SOURCE - Set by update_browser.py --external to the data manifest URL
+        const productDataSource = null;
+</script>
+"""
+
+PRODUCTS = [
+    {'productId': '1', 'productName': 'A; B', 'notes': 'ends the comment */ and the script </script>; oops'},
+    {'productId': '2', 'productName': 'C', 'dimensions': {'rawText': '{"width_cm": 50;}\n'}},
+]
+
+
+def page_data(html):
+    match = re.search(r'/\* PRODUCT_DATA_START \*/(.*?)/\* PRODUCT_DATA_END \*/;', html, re.DOTALL)
+    assert match.group(1).count('*/') == 0 and '</script>' not in match.group(1)
+    return json.loads(match.group(1))
+
+
+def test_inline_data_with_semicolons_survives_repeated_updates(tmp_path):
+    html_path = tmp_path / 'page.html'
+    html_path.write_text(TEMPLATE.format(data='[]'), encoding='utf-8')
+
+    assert update_html_with_data(str(html_path), PRODUCTS)
+    assert page_data(html_path.read_text(encoding='utf-8')) == PRODUCTS
+
+    assert update_html_with_data(str(html_path), PRODUCTS[1:])
+    html = html_path.read_text(encoding='utf-8')
+    assert page_data(html) == PRODUCTS[1:]
+    assert html.count('PRODUCT_DATA_START') == 1 and html.endswith('null;\n</script>\n')
+
+
+def test_legacy_page_with_semicolons_in_its_data_is_migrated(tmp_path):
+    html_path = tmp_path / 'page.html'
+    legacy = json.dumps(PRODUCTS[1:], indent=8).replace('</', '<\\/')
+    html_path.write_text(TEMPLATE.format(data=legacy), encoding='utf-8')
+
+    assert update_html_with_data(str(html_path), PRODUCTS)
+    html = html_path.read_text(encoding='utf-8')
+    assert DATA_PATTERN.search(html)
+    assert page_data(html) == PRODUCTS
+    assert html.count('productDataSource') == 1
+
+
+def test_external_publish_empties_the_inline_data(tmp_path):
+    html_path = tmp_path / 'page.html'
+    html_path.write_text(TEMPLATE.format(data='[]'), encoding='utf-8')
+    update_html_with_data(str(html_path), PRODUCTS)
+
+    assert publish_external(str(html_path), PRODUCTS, str(tmp_path / 'data'))
+    html = html_path.read_text(encoding='utf-8')
+    assert page_data(html) == []
+    assert 'const productDataSource = "data/manifest.json";' in html
@@ -0,0 +1,96 @@
+from src.work_queue import DONE, FAILED, LEASED, PENDING, WorkQueue
+
+
+def open_queue(tmp_path, **kwargs):
+    return WorkQueue(tmp_path / 'queue.sqlite', **kwargs)
+
+
+def test_enqueue_ignores_known_ids_unless_reset(tmp_path, product):
+    work_queue = open_queue(tmp_path)
+    assert work_queue.enqueue(['1', '2', '2']) == 2
+    assert work_queue.enqueue(['2', '3']) == 1
+
+    lease = work_queue.claim('w1', 1)[0]
+    work_queue.complete(lease, product(lease.product_id))
+    assert work_queue.enqueue([lease.product_id], reset=True) == 1
+    assert work_queue.counts() == {PENDING: 3, LEASED: 0, DONE: 0, FAILED: 0}
+
+
+def test_claims_are_exclusive_and_in_enqueue_order(tmp_path):
+    work_queue = open_queue(tmp_path)
+    work_queue.enqueue(['5', '3', '9', '1'])
+    other = open_queue(tmp_path)
+
+    first = work_queue.claim('w1', 2)
+    second = other.claim('w2', 5)
+
+    assert [lease.product_id for lease in first] == ['5', '3']
+    assert [lease.product_id for lease in second] == ['9', '1']
+    assert work_queue.claim('w3', 5) == []
+    assert work_queue.workers() == {'w1': 2, 'w2': 2}
+
+
+def test_expired_lease_goes_back_and_the_late_result_is_rejected(tmp_path, product):
+    work_queue = open_queue(tmp_path, lease_seconds=0)
+    work_queue.enqueue(['1'])
+    stale = work_queue.claim('crashed', 1)[0]
+
+    fresh = work_queue.claim('w2', 1)[0]
+    assert fresh.product_id == '1' and fresh.attempts == 2
+    assert work_queue.heartbeat([stale]) == [stale]
+
+    assert not work_queue.complete(stale, product('1'))
+    assert work_queue.complete(fresh, product('1'))
+    assert [record['productId'] for record in work_queue.results()] == ['1']
+
+
+def test_heartbeat_keeps_the_lease(tmp_path):
+    work_queue = open_queue(tmp_path, lease_seconds=60)
+    work_queue.enqueue(['1'])
+    lease = work_queue.claim('w1', 1)[0]
+    expires_at = lease.expires_at
+
+    assert work_queue.heartbeat([lease]) == []
+    assert lease.expires_at >= expires_at
+    assert work_queue.claim('w2', 1) == []
+
+
+def test_errors_are_retried_until_max_attempts(tmp_path, product):
+    work_queue = open_queue(tmp_path, max_attempts=2)
+    work_queue.enqueue(['1'])
+
+    lease = work_queue.claim('w1', 1)[0]
+    assert work_queue.complete(lease, product('1', error='timeout'))
+    assert work_queue.counts()[PENDING] == 1
+
+    lease = work_queue.claim('w1', 1)[0]
+    assert lease.attempts == 2
+    work_queue.complete(lease, product('1', error='timeout'))
+    assert work_queue.counts()[FAILED] == 1
+    assert work_queue.claim('w1', 1) == []
+
+    assert work_queue.requeue_failed() == 1
+    assert work_queue.claim('w1', 1)[0].attempts == 1
+
+
+def test_lease_expiring_on_the_last_attempt_fails_the_job(tmp_path):
+    work_queue = open_queue(tmp_path, lease_seconds=0, max_attempts=1)
+    work_queue.enqueue(['1'])
+    work_queue.claim('crashed', 1)
+
+    assert work_queue.claim('w2', 1) == []
+    assert work_queue.counts()[FAILED] == 1
+
+
+def test_release_hands_jobs_back_without_using_an_attempt(tmp_path):
+    work_queue = open_queue(tmp_path)
+    work_queue.enqueue(['1', '2'])
+    leases = work_queue.claim('w1', 2)
+
+    assert work_queue.release(leases) == 2
+    assert [lease.attempts for lease in work_queue.claim('w2', 2)] == [1, 1]
+
+
+def test_queue_uses_the_rollback_journal(tmp_path):
+    work_queue = open_queue(tmp_path)
+    assert work_queue._conn.execute("PRAGMA journal_mode").fetchone()[0] == 'delete'
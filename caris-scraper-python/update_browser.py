@@ -2,9 +2,41 @@
 """Update the product browser HTML with new JSON data"""
 
 import json
+import os
+import re
 import sys
 import argparse
 from pathlib import Path
+from src.publish import MANIFEST_NAME, ProductBundle
+
+# The inline product array sits between these markers, so finding it never depends on its content
+DATA_START = '/* PRODUCT_DATA_START */'
+DATA_END = '/* PRODUCT_DATA_END */'
+DATA_PATTERN = re.compile(
+    r'(// JSON_DATA_PLACEHOLDER[^\n]*\n\s*const productData = )/\* PRODUCT_DATA_START \*/.*?/\* PRODUCT_DATA_END \*/;',
+    re.DOTALL
+)
+# Pages written before the markers: the array ends right before the PRODUCT_DATA_SOURCE block
+LEGACY_DATA_PATTERN = re.compile(
+    r'(// JSON_DATA_PLACEHOLDER[^\n]*\n\s*const productData = ).*?;(?=\s*// PRODUCT_DATA_SOURCE)',
+    re.DOTALL
+)
+SOURCE_PATTERN = r'(// PRODUCT_DATA_SOURCE[^\n]*\n\s*const productDataSource = )([^;]*);'
+
+
+def inline_json(json_data) -> str:
+    """JSON for the page's script block. '*/' and '</' can only occur inside JSON strings, where
+    '\\/' means the same, so escaping them keeps the end marker and </script> out of the data."""
+    return json.dumps(json_data, indent=8, ensure_ascii=False).replace('*/', '*\\/').replace('</', '<\\/')
+
+
+def embed_data(html_content: str, js_data: str):
+    """html_content with the inline product array replaced, or None if it has no data placeholder."""
+    for pattern in (DATA_PATTERN, LEGACY_DATA_PATTERN):
+        if pattern.search(html_content):
+            # A function replacement keeps backslashes in the JSON (e.g. \n inside rawText) from being read as escapes
+            return pattern.sub(lambda match: f'{match.group(1)}{DATA_START}{js_data}{DATA_END};', html_content, count=1)
+    return None
 
 
 def update_html_with_json(html_path: str, json_path: str, output_path: str = None):
@@ -21,6 +53,12 @@ def update_html_with_json(html_path: str, json_path: str, output_path: str = Non
         print(f"Error: Invalid JSON in '{json_path}': {e}", file=sys.stderr)
         return False
     
+    return update_html_with_data(html_path, json_data, output_path)
+
+
+def update_html_with_data(html_path: str, json_data: list, output_path: str = None):
+    """Update HTML file with product data already in memory"""
+    
     # Read HTML template
     try:
         with open(html_path, 'r', encoding='utf-8') as f:
@@ -29,28 +67,19 @@ def update_html_with_json(html_path: str, json_path: str, output_path: str = Non
         print(f"Error: HTML file '{html_path}' not found", file=sys.stderr)
         return False
     
-    # Find and replace the JSON data using regex to handle existing data
-    import re
-    
-    # Pattern to match the productData assignment, whether it's empty or has data
-    pattern = r'(// JSON_DATA_PLACEHOLDER - This will be replaced by the Python script\s*\n\s*const productData = )([^;]*);'
-    
-    if not re.search(pattern, html_content):
+    # Replace the existing productData assignment
+    updated_html = embed_data(html_content, inline_json(json_data))
+    if updated_html is None:
         print("Error: JSON placeholder not found in HTML file", file=sys.stderr)
         return False
-    
-    # Create the JavaScript data assignment
-    js_data = json.dumps(json_data, indent=8, ensure_ascii=False)
-    
-    # Replace the existing productData assignment
-    updated_html = re.sub(pattern, rf'\1{js_data};', html_content)
+    updated_html = re.sub(SOURCE_PATTERN, lambda match: f'{match.group(1)}null;', updated_html)
     
     # Write updated HTML
     output_file = output_path or html_path
     try:
         with open(output_file, 'w', encoding='utf-8') as f:
             f.write(updated_html)
-        print(f"Successfully updated '{output_file}' with data from '{json_path}'")
+        print(f"Successfully updated '{output_file}'")
         print(f"Found {len(json_data)} products in the data")
         return True
     except Exception as e:
@@ -58,11 +87,72 @@ def update_html_with_json(html_path: str, json_path: str, output_path: str = Non
         return False
 
 
+def publish_external(html_path: str, json_data, data_dir: str, output_path: str = None,
+                     chunk_size: int = 200, compress: bool = False, merge: bool = False, changes: bool = False):
+    """Write product data as chunk files next to the page and point the page at their manifest;
+    with changes=True, json_data is a diff_snapshots.py changelog applied to the existing chunks"""
+    
+    bundle = ProductBundle(Path(data_dir), chunk_size=chunk_size, compress=compress)
+    if changes:
+        try:
+            counts = bundle.apply_changes(json_data)
+        except Exception as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return False
+        summary = json_data['summary']
+        print(f"Applied {summary['added']} added, {summary['changed']} changed and {summary['removed']} removed "
+              f"products to '{data_dir}': {counts['written']} chunks written, {counts['unchanged']} unchanged, "
+              f"{counts['removed']} removed")
+    else:
+        counts = bundle.publish(json_data, merge=merge)
+        print(f"Published {len(json_data)} products to '{data_dir}': {counts['written']} chunks written, "
+              f"{counts['unchanged']} unchanged, {counts['removed']} removed")
+    
+    try:
+        with open(html_path, 'r', encoding='utf-8') as f:
+            html_content = f.read()
+    except FileNotFoundError:
+        print(f"Error: HTML file '{html_path}' not found", file=sys.stderr)
+        return False
+    
+    updated_html = embed_data(html_content, '[]')
+    if updated_html is None or not re.search(SOURCE_PATTERN, html_content):
+        print("Error: data placeholders not found in HTML file", file=sys.stderr)
+        return False
+    
+    output_file = output_path or html_path
+    manifest_url = Path(os.path.relpath(Path(data_dir).resolve() / MANIFEST_NAME, Path(output_file).resolve().parent)).as_posix()
+    
+    updated_html = re.sub(SOURCE_PATTERN, lambda match: f'{match.group(1)}{json.dumps(manifest_url)};', updated_html)
+    
+    # Once the page points at the manifest, data updates leave the HTML alone
+    if updated_html == html_content and output_file == html_path:
+        return True
+    
+    try:
+        with open(output_file, 'w', encoding='utf-8') as f:
+            f.write(updated_html)
+        print(f"Pointed '{output_file}' at '{manifest_url}'")
+        return True
+    except Exception as e:
+        print(f"Error writing output file: {e}", file=sys.stderr)
+        return False
+
+
 def main():
     parser = argparse.ArgumentParser(description='Update product browser HTML with JSON data')
     parser.add_argument('json_file', help='Path to JSON file with product data')
     parser.add_argument('--html', default='product_browser.html', help='HTML template file (default: product_browser.html)')
     parser.add_argument('--output', '-o', help='Output HTML file (default: updates the template in place)')
+    parser.add_argument('--external', metavar='DATA_DIR',
+                        help='Write the data as chunk files in DATA_DIR and load them from the page instead of inlining it')
+    parser.add_argument('--chunk-size', type=int, default=200,
+                        help='Product ID range per chunk file in --external mode (default: 200)')
+    parser.add_argument('--gzip', action='store_true', help='Gzip chunk files in --external mode')
+    parser.add_argument('--merge', action='store_true',
+                        help='In --external mode, update the products in the JSON file and keep all others')
+    parser.add_argument('--changes', action='store_true',
+                        help='In --external mode, treat the JSON file as a diff_snapshots.py changelog and apply only its changes')
     
     args = parser.parse_args()
     
@@ -79,7 +169,23 @@ def main():
         print(f"Error: JSON file '{json_path}' not found", file=sys.stderr)
         sys.exit(1)
     
-    success = update_html_with_json(str(html_path), str(json_path), str(output_path) if output_path else None)
+    if args.changes and not args.external:
+        print("Error: --changes needs --external; an inlined page is rebuilt from the full result.json", file=sys.stderr)
+        sys.exit(1)
+    
+    if args.external:
+        with open(json_path, 'r', encoding='utf-8') as f:
+            json_data = json.load(f)
+        if isinstance(json_data, dict) != args.changes:
+            expected = 'a diff_snapshots.py changelog' if args.changes else 'a product array; pass --changes for a changelog'
+            print(f"Error: '{json_path}' is not {expected}", file=sys.stderr)
+            sys.exit(1)
+        success = publish_external(
+            str(html_path), json_data, args.external, str(output_path) if output_path else None,
+            chunk_size=args.chunk_size, compress=args.gzip, merge=args.merge, changes=args.changes
+        )
+    else:
+        success = update_html_with_json(str(html_path), str(json_path), str(output_path) if output_path else None)
     
     if success:
         print(f"Open the updated HTML file in your browser to view the products!")
@@ -9,6 +9,7 @@ class ProductScraperRunner {
     this.pythonScript = options.pythonScript || './parallel_scraper.py';
     this.batchSize = options.batchSize || null; // null means all at once
     this.dryRun = options.dryRun || false;
+    this.incremental = options.incremental || false;
   }
 
   async loadProductIds() {
@@ -44,6 +45,7 @@ class ProductScraperRunner {
       this.pythonScript,
       '--output',
       outputFile,
+      ...(this.incremental ? ['--incremental'] : []),
       ...productIds.map(id => id.toString())
     ];
     
@@ -187,6 +189,10 @@ async function main() {
       case '-d':
         options.dryRun = true;
         break;
+      case '--incremental':
+      case '-i':
+        options.incremental = true;
+        break;
       case '--help':
       case '-h':
         console.log('Usage: node run-product-scraper.js [options]');
@@ -197,6 +203,7 @@ async function main() {
         console.log('  -p, --python-script <file>   Python scraper script path (default: ./parallel_scraper.py)');
         console.log('  -b, --batch-size <num>       Run in batches of N products (default: all at once)');
         console.log('  -d, --dry-run               Show command without executing');
+        console.log('  -i, --incremental           Only re-scrape new, stale, failed or changed products');
         console.log('  -h, --help                  Show this help message');
         console.log('');
         console.log('Examples:');